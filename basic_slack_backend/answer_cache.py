@@ -0,0 +1,284 @@
+"""
+Answer cache for Genexus RAG results.
+Exact lookups use the normalized query text; near-duplicate phrasings are
+matched with MinHash signatures over character trigrams, bucketed with LSH
+so a lookup never scans the whole cache. A near-duplicate must also share
+the query's question words and negation ("when" is not "what", "is not" is
+not "is").
+"""
+
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Words that change the phrasing but not the meaning of a question
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did",
+    "what", "whats", "what's",
+    "can", "could", "would", "should", "will", "i", "me", "my", "you", "your",
+    "please", "explain", "tell", "about", "of", "on", "in", "to", "for", "and",
+    "it", "its", "this", "that", "there", "define", "meaning", "mean",
+}
+
+# Words that do change the meaning: a near-duplicate must ask the same kind of question
+QUESTION_WORDS = {"how", "why", "who", "which", "when", "where"}
+NEGATIONS = {"not", "no", "without", "never", "cannot"}
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+_WHITESPACE = re.compile(r"\s+")
+_SLACK_MARKUP = re.compile(r"<[@#!][^>]*>")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop Slack mentions and punctuation, collapse whitespace."""
+    text = _SLACK_MARKUP.sub(" ", query.lower())
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _content_terms(normalized: str) -> str:
+    """Strip stopwords and plural endings so 'what is staking' ~ 'explain staking'."""
+    terms = []
+    for word in normalized.split():
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return " ".join(terms) or normalized
+
+
+def _intent(normalized: str) -> Tuple[str, ...]:
+    """Question words and negation in the query ('what' is the default question)."""
+    words = set(normalized.split())
+    intent = sorted(words & QUESTION_WORDS)
+    if words & NEGATIONS or any(word.endswith("n't") for word in words):
+        intent.append("not")
+    return tuple(intent)
+
+
+def _shingles(text: str, size: int = 3) -> Set[str]:
+    padded = f" {text} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+class MinHasher:
+    """Fixed-permutation MinHash signatures (deterministic across restarts)."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        self._perms: List[Tuple[int, int]] = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], "little") % _MERSENNE_PRIME or 1
+            b = int.from_bytes(digest[8:], "little") % _MERSENNE_PRIME
+            self._perms.append((a, b))
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little")
+            for s in _shingles(text)
+        ]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of the underlying shingle sets."""
+        matches = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return matches / len(sig_a)
+
+
+@dataclass
+class CacheEntry:
+    """One cached answer."""
+    key: str
+    value: Dict[str, Any]
+    created_at: float
+    signature: Optional[Tuple[int, ...]] = None
+    intent: Tuple[str, ...] = ()
+    bands: List[Tuple[int, Tuple[int, ...]]] = field(default_factory=list)
+
+
+class AnswerCache:
+    """TTL + LRU cache of RAG answers with optional MinHash near-duplicate matching."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400,
+        near_duplicates: bool = True,
+        similarity_threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.near_duplicates = near_duplicates
+        self.similarity_threshold = similarity_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm) if near_duplicates else None
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lsh: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+
+        self.stats = {
+            'hits': 0,
+            'near_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expired': 0,
+            'invalidations': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band_key in entry.bands:
+            bucket = self._lsh.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._lsh[band_key]
+
+    def _is_expired(self, entry: CacheEntry, now: float) -> bool:
+        return now - entry.created_at > self.ttl_seconds
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return a cached answer for the query (or a near-duplicate of it), else None."""
+        key = normalize_query(query)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_expired(entry, now):
+                    self._remove(key)
+                    self.stats['expired'] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry.value
+
+            if self.hasher is not None:
+                match = self._near_duplicate(key, now)
+                if match is not None:
+                    self._entries.move_to_end(match.key)
+                    self.stats['near_hits'] += 1
+                    logger.info(f"Answer cache near-duplicate hit: '{key}' ~ '{match.key}'")
+                    return match.value
+
+            self.stats['misses'] += 1
+            return None
+
+    def _near_duplicate(self, key: str, now: float) -> Optional[CacheEntry]:
+        signature = self.hasher.signature(_content_terms(key))
+        intent = _intent(key)
+        candidates: Set[str] = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._lsh.get(band_key, ()))
+
+        best: Optional[CacheEntry] = None
+        best_score = self.similarity_threshold
+        for candidate in list(candidates):
+            entry = self._entries.get(candidate)
+            if entry is None:
+                continue
+            if self._is_expired(entry, now):
+                self._remove(candidate)
+                self.stats['expired'] += 1
+                continue
+            if entry.intent != intent:
+                continue
+            score = MinHasher.similarity(signature, entry.signature)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def put(self, query: str, value: Dict[str, Any]):
+        """Store an answer, evicting the least recently used entries if full."""
+        key = normalize_query(query)
+        if not key:
+            return
+
+        entry = CacheEntry(key=key, value=value, created_at=time.monotonic())
+        if self.hasher is not None:
+            entry.signature = self.hasher.signature(_content_terms(key))
+            entry.bands = self._band_keys(entry.signature)
+            entry.intent = _intent(key)
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            for band_key in entry.bands:
+                self._lsh.setdefault(band_key, set()).add(key)
+            self.stats['stores'] += 1
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def invalidate(self) -> int:
+        """Drop every entry (e.g. after the knowledge base datasets are re-uploaded)."""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._lsh.clear()
+            self.generation += 1
+            self.stats['invalidations'] += 1
+        logger.info(f"Answer cache invalidated ({dropped} entries dropped)")
+        return dropped
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and size, for /health."""
+        lookups = self.stats['hits'] + self.stats['near_hits'] + self.stats['misses']
+        hit_rate = (self.stats['hits'] + self.stats['near_hits']) / lookups if lookups else 0.0
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'generation': self.generation,
+            'hit_rate': round(hit_rate, 3),
+            **self.stats
+        }
+
+
+def is_cacheable(results: Any) -> bool:
+    """Only cache real Genexus answers, never error strings, empty content or local fallbacks."""
+    return (
+        isinstance(results, dict)
+        and bool(results.get('content'))
+        and results.get('meta', {}).get('engine') != 'local'
+    )
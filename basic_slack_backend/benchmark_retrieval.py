@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Query latency benchmark for local retrieval: pure-Python BM25 vs. NumPy BM25,
+dense LSA and the hybrid (RRF) scorer, at several corpus sizes.
+Corpora larger than the real datasets are padded with perturbed copies of
+real passages (20% of words swapped from other passages) so term statistics
+stay realistic.
+Usage: python benchmark_retrieval.py [--sizes 2000 20000 200000] [--data-dir ..]
+"""
+
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+from typing import List, Callable
+
+import numpy as np
+
+from local_retrieval import LocalIndex, Passage, find_dataset_dirs, load_pages, split_passages
+from hybrid_retrieval import HybridSearch, fit_lsa, _top
+
+QUERIES = [
+    "How does stake delegation work?",
+    "What is Hydra?",
+    "what is mithril",
+    "Plutus V3",
+    "Ouroboros Praos",
+    "CIP-30 wallet connector",
+    "how do I earn rewards from my ada",
+    "layer 2 scaling state channels",
+    "register a stake pool with metadata",
+    "native tokens minting policy",
+    "what is the eUTXO model",
+    "Voltaire governance DReps",
+    "how to build a transaction with cardano-cli",
+    "Marlowe financial contracts",
+    "Aiken smart contract language",
+    "stake pool pledge and saturation",
+    "Cardano treasury and Project Catalyst",
+    "Ouroboros Genesis bootstrapping",
+    "sidechains and Partner chains",
+    "hard fork combinator",
+]
+
+
+def build_corpus(real: List[Passage], size: int, seed: int = 7) -> List[Passage]:
+    """size passages: the real ones first, then perturbed copies."""
+    rng = random.Random(seed)
+    corpus = list(real[:size])
+    words = [p.text.split() for p in real]
+    while len(corpus) < size:
+        i = rng.randrange(len(real))
+        text = list(words[i])
+        donor = words[rng.randrange(len(real))]
+        for j in rng.sample(range(len(text)), len(text) // 5):
+            text[j] = rng.choice(donor)
+        corpus.append(Passage(f"{real[i].url}#copy{len(corpus)}", real[i].title, " ".join(text)))
+    return corpus
+
+
+def latencies(func: Callable[[str], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            func(query)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local retrieval query latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2_000, 20_000, 200_000])
+    parser.add_argument("--data-dir", default=str(Path(__file__).resolve().parent.parent))
+    parser.add_argument("--repeat", type=int, default=10, help="Passes over the query set")
+    args = parser.parse_args()
+
+    pages = load_pages(find_dataset_dirs(Path(args.data_dir)))
+    real = [p for url, content in pages.items() for p in split_passages(url, content)]
+    print(f"📚 {len(real)} real passages from {len(pages)} pages")
+
+    print(f"{'chunks':>8} {'scorer':>12} {'p50 ms':>8} {'p99 ms':>8}   build")
+    for size in args.sizes:
+        start = time.perf_counter()
+        index = LocalIndex(build_corpus(real, size))
+        index_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        hybrid = HybridSearch(index, *fit_lsa(index))
+        lsa_seconds = time.perf_counter() - start
+
+        def numpy_bm25(query: str) -> np.ndarray:
+            return _top(hybrid.bm25_scores(hybrid._query_terms(query)), 3)
+
+        def dense(query: str) -> np.ndarray:
+            scores = hybrid.dense_scores(hybrid._query_terms(query))
+            return _top(scores, 3) if scores is not None else None
+
+        scorers = [
+            ("bm25-python", index.search, f"index {index_seconds:.1f}s"),
+            ("bm25-numpy", numpy_bm25, ""),
+            ("dense-lsa", dense, f"lsa {lsa_seconds:.1f}s"),
+            ("hybrid-rrf", hybrid.search, ""),
+        ]
+        for name, func, note in scorers:
+            func(QUERIES[0])  # Warm up
+            samples = latencies(func, args.repeat)
+            print(f"{size:>8} {name:>12} {statistics.median(samples):>8.2f} {percentile(samples, 99):>8.2f}   {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: slack_splitter.split_message vs. the old line-based loop
+Usage: python benchmark_splitter.py [--sizes 100000 500000 2000000]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from slack_splitter import split_message
+
+
+def legacy_split(formatted_response: str, max_length: int = 3900) -> List[str]:
+    """The line-by-line loop previously inlined in process_user_request"""
+    lines = formatted_response.split('\n')
+    chunks = []
+    current_chunk = []
+    current_length = 0
+
+    for line in lines:
+        line_length = len(line) + 1
+
+        if current_length + line_length > max_length:
+            if current_chunk:
+                chunks.append('\n'.join(current_chunk))
+
+            if line_length > max_length:
+                while len(line) > max_length:
+                    chunks.append(line[:max_length])
+                    line = line[max_length:]
+                current_chunk = [line] if line else []
+                current_length = len(line) + 1 if line else 0
+            else:
+                current_chunk = [line]
+                current_length = line_length
+        else:
+            current_chunk.append(line)
+            current_length += line_length
+
+    if current_chunk:
+        chunks.append('\n'.join(current_chunk))
+
+    return chunks
+
+
+def build_answer(size: int, seed: int = 42) -> str:
+    """Synthetic answer with paragraphs, links, mentions, code blocks and long lines"""
+    rng = random.Random(seed)
+    words = ["Cardano", "staking", "delegation", "Ouroboros", "Plutus", "epoch", "rewards", "ada",
+             "<https://docs.cardano.org/learn/delegation|delegation guide>", "<@U024BE7LH>"]
+    pieces = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < 0.05:
+            block = "\n\n```haskell\n" + "\n".join(f"validator{i} = mkValidator {i}" for i in range(rng.randint(5, 80))) + "\n```\n\n"
+        elif roll < 0.08:
+            block = " ".join(rng.choice(words) for _ in range(800)) + "\n"  # One very long line
+        else:
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(8, 25))) + ". "
+            block = sentence + ("\n\n" if rng.random() < 0.2 else "")
+        pieces.append(block)
+        length += len(block)
+    return "".join(pieces)
+
+
+def count_broken_links(parts: List[str]) -> int:
+    return sum(1 for part in parts if part.count("<") != part.count(">"))
+
+
+def count_broken_fences(parts: List[str]) -> int:
+    return sum(1 for part in parts if part.count("```") % 2)
+
+
+def bench(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Slack message splitter")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 500_000, 2_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'impl':>8} {'best ms':>10} {'MB/s':>8} {'parts':>6} {'broken links':>13} {'broken fences':>14}")
+    for size in args.sizes:
+        text = build_answer(size)
+        for name, func in (("legacy", legacy_split), ("splitter", split_message)):
+            seconds = bench(func, text, args.repeat)
+            parts = func(text)
+            print(f"{len(text):>10} {name:>8} {seconds * 1000:>10.2f} {len(text) / seconds / 1e6:>8.1f} "
+                  f"{len(parts):>6} {count_broken_links(parts):>13} {count_broken_fences(parts):>14}")
+
+
+if __name__ == "__main__":
+    main()
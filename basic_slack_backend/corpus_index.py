@@ -0,0 +1,255 @@
+"""
+Prebuilt, memory-mapped corpus index.
+`python corpus_index.py --data-dir .. --output corpus.idx` compiles the
+dataset folders into one binary file: a sorted term table, flat postings
+arrays, per-passage BM25 norms, and a doc/passage string table. The bot
+mmaps that file at startup instead of parsing every JSON page, so boot time
+and RSS stay flat as the corpus grows, and all uvicorn workers share one
+copy through the OS page cache.
+
+Layout (native little-endian, every section 8-byte aligned):
+    header      magic, counts, k1, b, then (offset, length) per section
+    term_offsets  u64[n_terms + 1]      into terms
+    terms         utf-8 bytes, sorted
+    postings      u64[n_terms + 1]      into pids/tfs
+    pids          u32[n_postings]
+    tfs           u16[n_postings]
+    norms         f32[n_passages]       k1 * (1 - b + b * len / avg_len)
+    passage_docs  u32[n_passages]       doc id of each passage
+    string_offsets u64[n_strings + 1]   into strings
+    strings       utf-8: doc urls, then (title, text) per passage
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import logging
+import argparse
+from array import array
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+
+from local_retrieval import BM25Search, LocalIndex, Passage, find_dataset_dirs
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CRPIDX01"
+SECTIONS = (
+    ("term_offsets", "Q"),
+    ("terms", None),
+    ("postings", "Q"),
+    ("pids", "I"),
+    ("tfs", "H"),
+    ("norms", "f"),
+    ("passage_docs", "I"),
+    ("string_offsets", "Q"),
+    ("strings", None),
+)
+_HEADER = struct.Struct("<8sIIIdd")
+_SECTION = struct.Struct("<QQ")
+HEADER_SIZE = _HEADER.size + _SECTION.size * len(SECTIONS)
+
+
+def _pad(length: int) -> int:
+    return (8 - length % 8) % 8
+
+
+def _string_table(strings: List[str]) -> Tuple[array, bytes]:
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for value in strings:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def write_corpus_index(index: LocalIndex, path: str):
+    """Serialize an in-memory LocalIndex to the mmap-able file format."""
+    if sys.byteorder != "little":
+        raise RuntimeError("corpus index files are little-endian only")
+
+    terms = sorted(index.postings)
+    term_offsets, term_blob = _string_table(terms)
+
+    postings = array("Q", [0])
+    pids = array("I")
+    tfs = array("H")
+    for term in terms:
+        term_pids, term_tfs = index.postings[term]
+        pids.extend(term_pids)
+        tfs.extend(term_tfs)
+        postings.append(len(pids))
+
+    doc_ids: Dict[str, int] = {}
+    passage_docs = array("I")
+    for passage in index.passages:
+        passage_docs.append(doc_ids.setdefault(passage.url, len(doc_ids)))
+
+    strings = list(doc_ids)  # Insertion order == doc id
+    for passage in index.passages:
+        strings.append(passage.title)
+        strings.append(passage.text)
+    string_offsets, string_blob = _string_table(strings)
+
+    payloads = {
+        "term_offsets": term_offsets.tobytes(),
+        "terms": term_blob,
+        "postings": postings.tobytes(),
+        "pids": pids.tobytes(),
+        "tfs": tfs.tobytes(),
+        "norms": array("f", index._norms).tobytes(),
+        "passage_docs": passage_docs.tobytes(),
+        "string_offsets": string_offsets.tobytes(),
+        "strings": string_blob,
+    }
+
+    table = []
+    offset = HEADER_SIZE + _pad(HEADER_SIZE)
+    for name, _ in SECTIONS:
+        table.append((offset, len(payloads[name])))
+        offset += len(payloads[name]) + _pad(len(payloads[name]))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(doc_ids), index.passage_count, len(terms), index.k1, index.b))
+        for entry in table:
+            f.write(_SECTION.pack(*entry))
+        f.write(b"\0" * _pad(HEADER_SIZE))
+        for name, _ in SECTIONS:
+            f.write(payloads[name])
+            f.write(b"\0" * _pad(len(payloads[name])))
+    os.replace(tmp_path, path)  # Running bots keep their old mapping until restart
+
+
+class MappedIndex(BM25Search):
+    """Read-only BM25 index served straight from an mmap'd corpus file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.doc_count, self.passage_count, self.term_count, self.k1, self.b = \
+            _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a corpus index file (bad magic)")
+
+        view = memoryview(self._mm)
+        self._views: Dict[str, Any] = {}
+        for i, (name, typecode) in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size)
+            section = view[offset:offset + length]
+            self._views[name] = section.cast(typecode) if typecode else section
+
+        self._term_offsets = self._views["term_offsets"]
+        self._terms = self._views["terms"]
+        self._postings_start = self._views["postings"]
+        self._pids = self._views["pids"]
+        self._tfs = self._views["tfs"]
+        self._norms = self._views["norms"]
+        self._passage_docs = self._views["passage_docs"]
+        self._string_offsets = self._views["string_offsets"]
+        self._strings = self._views["strings"]
+
+    def _term(self, i: int) -> bytes:
+        return bytes(self._terms[self._term_offsets[i]:self._term_offsets[i + 1]])
+
+    def _string(self, i: int) -> str:
+        return str(self._strings[self._string_offsets[i]:self._string_offsets[i + 1]], "utf-8")
+
+    def term_id(self, term: str) -> Optional[int]:
+        """Binary search of the sorted term table (UTF-8 byte order == code point order)."""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.term_count or self._term(lo) != key:
+            return None
+        return lo
+
+    def _postings_at(self, i: int) -> Tuple[memoryview, memoryview]:
+        start, end = self._postings_start[i], self._postings_start[i + 1]
+        return self._pids[start:end], self._tfs[start:end]
+
+    def _postings(self, term: str) -> Optional[Tuple[memoryview, memoryview]]:
+        i = self.term_id(term)
+        return self._postings_at(i) if i is not None else None
+
+    def iter_postings(self) -> Iterator[Tuple[str, memoryview, memoryview]]:
+        for i in range(self.term_count):
+            yield (self._term(i).decode("utf-8"), *self._postings_at(i))
+
+    def passage(self, pid: int) -> Passage:
+        doc = self._passage_docs[pid]
+        strings = self.doc_count + 2 * pid
+        return Passage(self._string(doc), self._string(strings), self._string(strings + 1))
+
+    def close(self):
+        """Release the views before unmapping (mmap refuses to close while exported)."""
+        for view in getattr(self, "_views", {}).values():
+            view.release()
+        self._views = {}
+        self._mm.close()
+        self._file.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Index size, for /health."""
+        return {
+            'backend': 'mmap',
+            'path': self.path,
+            'file_bytes': len(self._mm),
+            'passages': self.passage_count,
+            'pages': self.doc_count,
+            'terms': self.term_count
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the dataset folders into a memory-mapped corpus index")
+    parser.add_argument("--data-dir", default=str(Path(__file__).resolve().parent.parent),
+                        help="Folder containing the *-dataset-* directories")
+    parser.add_argument("--output", default=str(Path(__file__).resolve().parent / "corpus.idx"))
+    parser.add_argument("--no-embeddings", action="store_true",
+                        help="Skip the LSA embeddings used for hybrid retrieval")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    dataset_dirs = find_dataset_dirs(Path(args.data_dir))
+    if not dataset_dirs:
+        print(f"❌ No *-dataset-* folders found under {args.data_dir}")
+        sys.exit(1)
+
+    print(f"📂 Indexing {len(dataset_dirs)} dataset folders: {', '.join(d.name for d in dataset_dirs)}")
+    index = LocalIndex.from_datasets(dataset_dirs)
+
+    start = time.perf_counter()
+    write_corpus_index(index, args.output)
+    size_mb = os.path.getsize(args.output) / 1e6
+    print(f"✅ Wrote {args.output} ({size_mb:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+    if args.no_embeddings:
+        return
+    try:
+        from hybrid_retrieval import fit_lsa, save_embeddings
+    except ImportError:
+        print("⚠️ NumPy not installed - skipping hybrid retrieval embeddings (pip install -e .[hybrid])")
+        return
+
+    # Fit against the mapped file so term and passage ids match what the bot will load
+    mapped = MappedIndex(args.output)
+    try:
+        save_embeddings(args.output, *fit_lsa(mapped))
+    finally:
+        mapped.close()
+    print(f"✅ Wrote hybrid retrieval embeddings next to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Slack event deduplication.
+Slack redelivers events that are not acked within 3 seconds. Each event_id
+is recorded here for a time window so retried deliveries can be dropped
+before any work is scheduled.
+"""
+
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteEventStore:
+    """Shared dedup store for multi-replica runs (point replicas at the same file)."""
+
+    def __init__(self, path: str, window_seconds: float):
+        self.path = path
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS slack_events (event_id TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_slack_events_seen_at ON slack_events (seen_at)")
+        self._inserts = 0
+
+    def mark(self, event_id: str, now: float) -> bool:
+        """Record event_id; return True if it was already recorded within the window."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO slack_events (event_id, seen_at) VALUES (?, ?)",
+                (event_id, now)
+            )
+            if cursor.rowcount == 1:
+                self._inserts += 1
+                if self._inserts % 500 == 0:
+                    self._conn.execute(
+                        "DELETE FROM slack_events WHERE seen_at < ?", (now - self.window_seconds,)
+                    )
+                return False
+
+            # Already present - a stale row from an earlier window counts as new
+            row = self._conn.execute(
+                "SELECT seen_at FROM slack_events WHERE event_id = ?", (event_id,)
+            ).fetchone()
+            if row and now - row[0] > self.window_seconds:
+                self._conn.execute(
+                    "UPDATE slack_events SET seen_at = ? WHERE event_id = ?", (now, event_id)
+                )
+                return False
+            return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EventDeduplicator:
+    """Bounded, time-windowed event_id store with an optional SQLite backend."""
+
+    def __init__(
+        self,
+        window_seconds: float = 3600,
+        max_entries: int = 10000,
+        sqlite_path: Optional[str] = None
+    ):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._shared = SQLiteEventStore(sqlite_path, window_seconds) if sqlite_path else None
+
+        self.stats = {
+            'accepted': 0,
+            'duplicates': 0,
+            'retries_seen': 0
+        }
+
+    def _prune(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._seen:
+            oldest_id, seen_at = next(iter(self._seen.items()))
+            if seen_at >= cutoff and len(self._seen) <= self.max_entries:
+                break
+            del self._seen[oldest_id]
+
+    async def is_duplicate(self, event_id: str, retry_num: Optional[str] = None) -> bool:
+        """Record event_id and report whether it was already delivered within the window."""
+        now = time.time()
+        if retry_num:
+            self.stats['retries_seen'] += 1
+
+        seen_at = self._seen.get(event_id)
+        if seen_at is not None and now - seen_at <= self.window_seconds:
+            self.stats['duplicates'] += 1
+            return True
+
+        self._seen[event_id] = now
+        self._seen.move_to_end(event_id)
+        self._prune(now)
+
+        if self._shared is not None:
+            try:
+                if await asyncio.to_thread(self._shared.mark, event_id, now):
+                    self.stats['duplicates'] += 1
+                    return True
+            except sqlite3.Error as e:
+                # Fail open: a broken shared store must not stop the bot answering
+                logger.warning(f"Shared event dedup store error: {e}")
+
+        self.stats['accepted'] += 1
+        return False
+
+    def close(self):
+        if self._shared is not None:
+            self._shared.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and size, for /health."""
+        return {
+            'tracked': len(self._seen),
+            'window_seconds': self.window_seconds,
+            'shared_store': bool(self._shared),
+            **self.stats
+        }
@@ -0,0 +1,257 @@
+"""
+Persistent feedback store.
+Answers and 👍/👎 clicks are buffered in memory and written to SQLite in
+batches by a background task (on size or time thresholds, and on shutdown),
+so a click never blocks the event loop on disk I/O. Feedback rows are
+append-only; per-day rollup counters are updated in the same transaction so
+summaries by question, source file or day never scan the raw rows.
+"""
+
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+
+from answer_cache import normalize_query
+from metrics import ERRORS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_QUESTION = "(unknown)"
+GROUP_BY_COLUMNS = {
+    "question": ("question", "key"),
+    "source": ("source", "key"),
+    "day": ("question", "day"),
+}
+
+
+def _day(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class SQLiteFeedbackDB:
+    """Blocking SQLite access; called from a worker thread by FeedbackStore."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS answers (
+                message_id TEXT PRIMARY KEY,
+                question TEXT NOT NULL,
+                sources TEXT NOT NULL,
+                answered_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS feedback (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                message_id TEXT NOT NULL,
+                user_id TEXT,
+                channel_id TEXT,
+                feedback_type TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS feedback_rollup (
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                day TEXT NOT NULL,
+                positive INTEGER NOT NULL DEFAULT 0,
+                negative INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, key, day)
+            );
+            CREATE INDEX IF NOT EXISTS idx_feedback_rollup_day ON feedback_rollup (dimension, day);
+        """)
+        self._conn.commit()
+
+    def write(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        """Apply one batch of ("answer" | "feedback", row) records in a single transaction."""
+        with self._lock, self._conn:
+            for kind, row in batch:
+                if kind == "answer":
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO answers (message_id, question, sources, answered_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (row["message_id"], row["question"], json.dumps(row["sources"]), row["timestamp"])
+                    )
+                else:
+                    self._write_feedback(row)
+
+    def _write_feedback(self, row: Dict[str, Any]):
+        self._conn.execute(
+            "INSERT INTO feedback (message_id, user_id, channel_id, feedback_type, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (row["message_id"], row["user_id"], row["channel_id"], row["feedback_type"], row["timestamp"])
+        )
+
+        answer = self._conn.execute(
+            "SELECT question, sources FROM answers WHERE message_id = ?", (row["message_id"],)
+        ).fetchone()
+        question = (normalize_query(answer[0]) or UNKNOWN_QUESTION) if answer else UNKNOWN_QUESTION
+        sources = json.loads(answer[1]) if answer else []
+
+        positive = 1 if row["feedback_type"] == "positive" else 0
+        day = _day(row["timestamp"])
+        for dimension, key in [("question", question)] + [("source", s) for s in sources]:
+            self._conn.execute(
+                "INSERT INTO feedback_rollup (dimension, key, day, positive, negative) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (dimension, key, day) DO UPDATE SET "
+                "positive = positive + excluded.positive, negative = negative + excluded.negative",
+                (dimension, key, day, positive, 1 - positive)
+            )
+
+    def summary(self, group_by: str, since: Optional[str], until: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        """Thumbs-up/down totals from the rollup table, grouped by question, source or day."""
+        dimension, column = GROUP_BY_COLUMNS[group_by]
+        query = (
+            f"SELECT {column}, SUM(positive), SUM(negative) FROM feedback_rollup "
+            "WHERE dimension = ? AND day >= ? AND day <= ? "
+            f"GROUP BY {column} "
+            + ("ORDER BY day DESC " if group_by == "day" else "ORDER BY SUM(positive) + SUM(negative) DESC ")
+            + "LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, (dimension, since or "", until or "9999-12-31", limit)).fetchall()
+
+        return [
+            {group_by: key, "positive": positive, "negative": negative, "total": positive + negative}
+            for key, positive, negative in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FeedbackStore:
+    """Buffers answer/feedback records and flushes them to SQLite in the background."""
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 50,
+        flush_interval: float = 5.0,
+        max_buffer: int = 10000
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self._db: Optional[SQLiteFeedbackDB] = None
+        self._buffer: List[Tuple[str, Dict[str, Any]]] = []
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            'answers': 0,
+            'feedback': 0,
+            'flushes': 0,
+            'written': 0,
+            'dropped': 0,
+            'write_errors': 0
+        }
+
+    def start(self):
+        """Open the database and start the flush task. Call from the app lifespan."""
+        if self._task:
+            return
+        self._db = SQLiteFeedbackDB(self.path)
+        self._task = asyncio.create_task(self._run(), name="feedback-writer")
+        logger.info(f"Feedback store writing to {self.path}")
+
+    async def close(self):
+        """Stop the flush task and write whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def record_answer(self, message_id: str, question: str, sources: List[str]):
+        """Remember which question and sources a message_id answered, for later feedback."""
+        self.stats['answers'] += 1
+        self._enqueue("answer", {
+            "message_id": message_id,
+            "question": question,
+            "sources": sources,
+            "timestamp": time.time()
+        })
+
+    def record_feedback(self, message_id: str, user_id: str, channel_id: str, feedback_type: str):
+        self.stats['feedback'] += 1
+        self._enqueue("feedback", {
+            "message_id": message_id,
+            "user_id": user_id,
+            "channel_id": channel_id,
+            "feedback_type": feedback_type,
+            "timestamp": time.time()
+        })
+
+    def _enqueue(self, kind: str, row: Dict[str, Any]):
+        if len(self._buffer) >= self.max_buffer:
+            # The writer is far behind (disk trouble); shed load rather than grow without bound
+            self.stats['dropped'] += 1
+            ERRORS_TOTAL.labels("feedback_dropped").inc()
+            return
+        self._buffer.append((kind, row))
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write the buffered records in one transaction off the event loop."""
+        async with self._flush_lock:
+            if not self._buffer or self._db is None:
+                return
+            batch, self._buffer = self._buffer, []
+            try:
+                await asyncio.to_thread(self._db.write, batch)
+                self.stats['flushes'] += 1
+                self.stats['written'] += len(batch)
+            except sqlite3.Error as e:
+                # Keep the batch for the next attempt, within the buffer bound
+                self.stats['write_errors'] += 1
+                ERRORS_TOTAL.labels("feedback_store").inc()
+                logger.error(f"Feedback store write failed: {e}")
+                self._buffer = (batch + self._buffer)[-self.max_buffer:]
+
+    async def summary(
+        self,
+        group_by: str = "question",
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Aggregated feedback counts; pending records are flushed first so results are current."""
+        if group_by not in GROUP_BY_COLUMNS:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_BY_COLUMNS)}")
+        if self._db is None:
+            return []
+        await self.flush()
+        return await asyncio.to_thread(self._db.summary, group_by, since, until, limit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Buffer size and write counters, for /health."""
+        return {
+            'path': self.path,
+            'buffered': len(self._buffer),
+            **self.stats
+        }
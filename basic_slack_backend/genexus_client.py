@@ -0,0 +1,247 @@
+"""
+Async Genexus RAG client.
+Shares one keep-alive connection pool across all Slack requests instead of
+opening a fresh TCP+TLS connection per question.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import time
+import urllib.parse
+from typing import Dict, Any, Optional, List, Union, Callable, Awaitable
+
+import aiohttp
+
+from metrics import STAGE_SECONDS, ERRORS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+GENEXUS_BASE_URL = os.getenv(
+    "GENEXUS_BASE_URL",
+    "https://workspace.saia.ai/api/chat/ece1d2ab-981e-4c24-b628-fec5757fe77e/b240017b-defa-42c4-8430-c364fadd77e3/67b580da-9f22-428e-b81f-5ac63452bad7"
+)
+GENEXUS_MAX_CONNECTIONS = int(os.getenv("GENEXUS_MAX_CONNECTIONS", 20))
+GENEXUS_MAX_CONCURRENCY = int(os.getenv("GENEXUS_MAX_CONCURRENCY", 20))
+GENEXUS_TIMEOUT = float(os.getenv("GENEXUS_TIMEOUT", 120))
+GENEXUS_CONNECT_TIMEOUT = float(os.getenv("GENEXUS_CONNECT_TIMEOUT", 10))
+GENEXUS_KEEPALIVE_TIMEOUT = float(os.getenv("GENEXUS_KEEPALIVE_TIMEOUT", 60))
+
+# Called with the decoded content chunks so far each time a new one arrives.
+# The list is passed as-is so callers only pay for ''.join when they render it.
+PartialCallback = Callable[[List[str]], Awaitable[None]]
+
+
+def parse_genexus_line(line: str, content_chunks: List[str], files_info: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Parse one NDJSON line of a Genexus response.
+    Appends URL-decoded content to content_chunks and returns the (possibly updated) files list.
+    """
+    if not line.strip():
+        return files_info
+
+    try:
+        chunk = json.loads(line)
+    except json.JSONDecodeError:
+        return files_info
+
+    if 'content' in chunk:
+        # URL decode the content
+        content_chunks.append(urllib.parse.unquote(chunk['content']))
+    elif 'files' in chunk:
+        files_info = chunk.get('files', [])
+
+    return files_info
+
+
+def build_rag_result(claim: str, content_chunks: List[str], files_info: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the result dict consumed by format_rag_results."""
+    return {
+        "question": claim,
+        "content": ''.join(content_chunks),
+        "files": files_info,
+        "meta": {"query": claim}
+    }
+
+
+class GenexusClient:
+    """Natively async Genexus RAG client with a pooled, keep-alive HTTP session."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = GENEXUS_BASE_URL,
+        max_connections: int = GENEXUS_MAX_CONNECTIONS,
+        max_concurrency: int = GENEXUS_MAX_CONCURRENCY,
+        timeout: float = GENEXUS_TIMEOUT,
+        connect_timeout: float = GENEXUS_CONNECT_TIMEOUT,
+        keepalive_timeout: float = GENEXUS_KEEPALIVE_TIMEOUT
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.keepalive_timeout = keepalive_timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0  # Requests holding a semaphore slot, for the metrics gauge
+
+    async def start(self):
+        """Create the shared session. Call once from the app lifespan."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                }
+            )
+            logger.info(
+                f"Genexus client started (connections={self.max_connections}, "
+                f"concurrency={self.max_concurrency}, timeout={self.timeout.total}s)"
+            )
+
+    async def close(self):
+        """Close the shared session and its connection pool."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a concurrency slot."""
+        return self._in_flight
+
+    def _build_body(self, claim: str) -> Dict[str, Any]:
+        return {
+            "role": "user",
+            "content": claim,
+            "requestId": f"slack-{hash(claim) % 10000}",
+            "application": "saia-chat"
+        }
+
+    async def rag_request(self, claim: str, model_name: Optional[str] = None) -> Union[Dict[str, Any], str]:
+        """
+        Send a question to the Genexus RAG assistant.
+        Returns the result dict, or an error string (as the sync helper did).
+        """
+        if self._session is None:
+            await self.start()
+
+        async with self._semaphore:
+            self._in_flight += 1
+            start = time.perf_counter()
+            try:
+                async with self._session.post(self.base_url, json=self._build_body(claim)) as response:
+                    STAGE_SECONDS.labels("upstream_ttfb").observe(time.perf_counter() - start)
+                    logger.info(f"Response status code: {response.status}")
+                    response.raise_for_status()
+                    text = await response.text()
+            except asyncio.TimeoutError:
+                ERRORS_TOTAL.labels("genexus_timeout").inc()
+                logger.error(f"Request timed out after {self.timeout.total}s")
+                return f"Error making request: timed out after {self.timeout.total:.0f}s"
+            except aiohttp.ClientError as e:
+                ERRORS_TOTAL.labels("genexus_request").inc()
+                logger.error(f"Request error: {e}")
+                return f"Error making request: {e}"
+            finally:
+                self._in_flight -= 1
+                STAGE_SECONDS.labels("upstream_total").observe(time.perf_counter() - start)
+
+        try:
+            # Handle streaming JSON response with URL-encoded content
+            content_chunks: List[str] = []
+            files_info: List[Dict[str, Any]] = []
+
+            with STAGE_SECONDS.labels("parse").time():
+                for line in text.strip().split('\n'):
+                    files_info = parse_genexus_line(line, content_chunks, files_info)
+
+        except Exception as e:
+            ERRORS_TOTAL.labels("genexus_parse").inc()
+            logger.error(f"Response parsing error: {e}")
+            logger.error(f"Full response content: {text[:200]}...")
+            return f"Error parsing response: {str(e)}"
+
+        return build_rag_result(claim, content_chunks, files_info)
+
+    async def stream_rag_request(
+        self,
+        claim: str,
+        on_partial: PartialCallback,
+        model_name: Optional[str] = None
+    ) -> Union[Dict[str, Any], str]:
+        """
+        Send a question and parse the NDJSON chunks as they arrive.
+        on_partial receives the content chunks so far after every new one;
+        the final result is the same as rag_request.
+        """
+        if self._session is None:
+            await self.start()
+
+        content_chunks: List[str] = []
+        files_info: List[Dict[str, Any]] = []
+
+        parse_seconds = 0.0
+
+        async with self._semaphore:
+            self._in_flight += 1
+            start = time.perf_counter()
+            try:
+                async with self._session.post(self.base_url, json=self._build_body(claim)) as response:
+                    STAGE_SECONDS.labels("upstream_ttfb").observe(time.perf_counter() - start)
+                    logger.info(f"Response status code: {response.status}")
+                    response.raise_for_status()
+
+                    # Split lines ourselves: aiohttp's line iterator rejects lines over its
+                    # buffer limit, and a single NDJSON chunk can be arbitrarily long
+                    pending: List[bytes] = []
+                    async for data in response.content.iter_any():
+                        *complete, tail = data.split(b'\n')
+                        if complete:
+                            complete[0] = b''.join(pending) + complete[0]
+                            pending = []
+                        pending.append(tail)
+
+                        for raw_line in complete:
+                            parse_start = time.perf_counter()
+                            line = raw_line.decode('utf-8', errors='replace')
+                            chunks_before = len(content_chunks)
+                            files_info = parse_genexus_line(line, content_chunks, files_info)
+                            parse_seconds += time.perf_counter() - parse_start
+
+                            if len(content_chunks) > chunks_before:
+                                try:
+                                    await on_partial(content_chunks)
+                                except Exception as e:
+                                    # A failed progress update must never abort the answer
+                                    logger.warning(f"Partial update callback failed: {e}")
+
+                    # Last line without a trailing newline
+                    files_info = parse_genexus_line(b''.join(pending).decode('utf-8', errors='replace'),
+                                                    content_chunks, files_info)
+
+            except asyncio.TimeoutError:
+                ERRORS_TOTAL.labels("genexus_timeout").inc()
+                logger.error(f"Request timed out after {self.timeout.total}s")
+                return f"Error making request: timed out after {self.timeout.total:.0f}s"
+            except aiohttp.ClientError as e:
+                ERRORS_TOTAL.labels("genexus_request").inc()
+                logger.error(f"Request error: {e}")
+                return f"Error making request: {e}"
+            finally:
+                self._in_flight -= 1
+                STAGE_SECONDS.labels("upstream_total").observe(time.perf_counter() - start)
+
+        STAGE_SECONDS.labels("parse").observe(parse_seconds)
+        return build_rag_result(claim, content_chunks, files_info)
@@ -0,0 +1,248 @@
+"""
+Hybrid BM25 + dense retrieval with NumPy.
+BM25 catches exact terms (CIP numbers, "Plutus V3", "Ouroboros Praos");
+dense LSA vectors catch passages that use different words for the same
+idea. Both are scored with vectorized NumPy over the index's postings and an
+embedding matrix, and the two rankings are merged with reciprocal rank
+fusion. The embeddings come from a truncated SVD of the passage x term
+tf-idf matrix (randomized, so it runs on CPU in seconds) and need nothing
+beyond NumPy.
+"""
+
+import math
+import time
+import logging
+from typing import Dict, Any, List, Tuple, Optional
+
+import numpy as np
+
+from local_retrieval import BM25Search, Passage, tokenize
+
+logger = logging.getLogger(__name__)
+
+LSA_DIM = 128       # Embedding width
+RRF_K = 60          # Standard reciprocal rank fusion constant
+CANDIDATES = 100    # Depth of each ranking fed into fusion
+BLOCK_NNZ = 1 << 11  # Non-zeros per block in sparse products; small blocks stay in CPU cache
+
+DOC_VECTORS_SUFFIX = ".lsa-docs.npy"
+TERM_VECTORS_SUFFIX = ".lsa-terms.npy"
+
+
+def _as_arrays(pids, tfs) -> Tuple[np.ndarray, np.ndarray]:
+    """Zero-copy NumPy views of a postings list (array.array or mmap memoryview)."""
+    return np.frombuffer(pids, dtype=np.uint32), np.frombuffer(tfs, dtype=np.uint16)
+
+
+def _idf(n: int, df: int) -> float:
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+def _segment_sums(starts: np.ndarray, idx: np.ndarray, vals: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    out[s] = sum(vals[e] * matrix[idx[e]] for e in segment s), where segment s is
+    starts[s]:starts[s + 1]. Processed in blocks so memory stays at BLOCK_NNZ rows.
+    """
+    segments = len(starts) - 1
+    out = np.zeros((segments, matrix.shape[1]), dtype=np.float32)
+    seg = 0
+    while seg < segments:
+        end = int(np.searchsorted(starts, starts[seg] + BLOCK_NNZ, side="right")) - 1
+        end = min(max(end, seg + 1), segments)
+        lo, hi = starts[seg], starts[end]
+        if hi > lo:
+            contrib = vals[lo:hi, None] * matrix[idx[lo:hi]]
+            nonempty = starts[seg + 1:end + 1] > starts[seg:end]
+            out[seg:end][nonempty] = np.add.reduceat(contrib, starts[seg:end][nonempty] - lo, axis=0)
+        seg = end
+    return out
+
+
+class TermMatrix:
+    """Sparse passage x term tf-idf matrix, held in both column (postings) and row order."""
+
+    def __init__(self, index: BM25Search):
+        n = index.passage_count
+        rows, vals, lengths = [], [], []
+        for _, pids, tfs in index.iter_postings():
+            pids, tfs = _as_arrays(pids, tfs)
+            rows.append(pids)
+            vals.append(np.log1p(tfs.astype(np.float32)) * _idf(n, len(pids)))
+            lengths.append(len(pids))
+
+        self.shape = (n, len(lengths))
+        self.rows = np.concatenate(rows).astype(np.int64) if rows else np.zeros(0, np.int64)
+        self.vals = np.concatenate(vals).astype(np.float32) if vals else np.zeros(0, np.float32)
+        self.col_starts = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.cols = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+
+        order = np.argsort(self.rows, kind="stable")
+        self._row_cols = self.cols[order]
+        self._row_vals = self.vals[order]
+        self._row_starts = np.searchsorted(self.rows[order], np.arange(n + 1)).astype(np.int64)
+
+    def matmul(self, matrix: np.ndarray) -> np.ndarray:
+        """A @ matrix, shape (passages, k)."""
+        return _segment_sums(self._row_starts, self._row_cols, self._row_vals, matrix)
+
+    def rmatmul(self, matrix: np.ndarray) -> np.ndarray:
+        """A.T @ matrix, shape (terms, k)."""
+        return _segment_sums(self.col_starts, self.rows, self.vals, matrix)
+
+
+def fit_lsa(index: BM25Search, dim: int = LSA_DIM, oversample: int = 10,
+            power_iterations: int = 2, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Randomized truncated SVD of the tf-idf matrix (Halko et al.).
+    Returns L2-normalized passage vectors U*S and the term vectors V used to fold in queries.
+    """
+    start = time.perf_counter()
+    matrix = TermMatrix(index)
+    n, terms = matrix.shape
+    rank = min(dim + oversample, n, terms)
+    rng = np.random.default_rng(seed)
+
+    sample = matrix.matmul(rng.standard_normal((terms, rank), dtype=np.float32))
+    for _ in range(power_iterations):
+        q, _ = np.linalg.qr(sample)
+        q, _ = np.linalg.qr(matrix.rmatmul(q))
+        sample = matrix.matmul(q)
+    q, _ = np.linalg.qr(sample)
+
+    u, s, vt = np.linalg.svd(matrix.rmatmul(q).T, full_matrices=False)
+    k = min(dim, len(s))
+    doc_vectors = (q @ u[:, :k]) * s[:k]
+    doc_vectors /= np.maximum(np.linalg.norm(doc_vectors, axis=1, keepdims=True), 1e-12)
+    term_vectors = np.ascontiguousarray(vt[:k].T)
+
+    logger.info(f"🧮 LSA embeddings fitted: {n} passages x {k} dims in {time.perf_counter() - start:.1f}s")
+    return doc_vectors.astype(np.float32), term_vectors.astype(np.float32)
+
+
+def save_embeddings(prefix: str, doc_vectors: np.ndarray, term_vectors: np.ndarray):
+    np.save(prefix + DOC_VECTORS_SUFFIX, doc_vectors)
+    np.save(prefix + TERM_VECTORS_SUFFIX, term_vectors)
+
+
+def load_embeddings(prefix: str, index: BM25Search) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Memory-map saved embeddings; None if missing or built for a different index."""
+    try:
+        doc_vectors = np.load(prefix + DOC_VECTORS_SUFFIX, mmap_mode="r")
+        term_vectors = np.load(prefix + TERM_VECTORS_SUFFIX, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if doc_vectors.shape[0] != index.passage_count or term_vectors.shape[0] != index.term_count:
+        logger.warning(f"Embeddings at {prefix} do not match the corpus index - ignoring them")
+        return None
+    return doc_vectors, term_vectors
+
+
+def _top(scores: np.ndarray, count: int) -> np.ndarray:
+    """Indices of the count highest positive scores, best first."""
+    positive = np.flatnonzero(scores > 0)
+    if len(positive) > count:
+        positive = positive[np.argpartition(-scores[positive], count - 1)[:count]]
+    return positive[np.argsort(-scores[positive], kind="stable")]
+
+
+class HybridSearch:
+    """BM25 and LSA rankings over one index, fused with reciprocal rank fusion."""
+
+    def __init__(self, index: BM25Search, doc_vectors: np.ndarray, term_vectors: np.ndarray,
+                 rrf_k: int = RRF_K, candidates: int = CANDIDATES):
+        self.index = index
+        self.passage_count = index.passage_count
+        self.doc_vectors = doc_vectors
+        self.term_vectors = term_vectors
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+        self._norms = np.array(index._norms, dtype=np.float32)  # A copy: a view would pin the index's mmap open
+
+    @classmethod
+    def for_index(cls, index: BM25Search, embeddings_prefix: Optional[str] = None) -> "HybridSearch":
+        """Use saved embeddings when they match the index, otherwise fit them now."""
+        embeddings = load_embeddings(embeddings_prefix, index) if embeddings_prefix else None
+        if embeddings is None:
+            embeddings = fit_lsa(index)
+        return cls(index, *embeddings)
+
+    def _query_terms(self, query: str) -> List[Tuple[int, int, np.ndarray, np.ndarray]]:
+        """(term id, query tf, pids, tfs) for each known query term."""
+        counts: Dict[str, int] = {}
+        for term in tokenize(query):
+            counts[term] = counts.get(term, 0) + 1
+
+        terms = []
+        for term, count in counts.items():
+            term_id = self.index.term_id(term)
+            if term_id is None:
+                continue
+            pids, tfs = _as_arrays(*self.index._postings(term))
+            terms.append((term_id, count, pids, tfs))
+        return terms
+
+    def bm25_scores(self, query_terms) -> np.ndarray:
+        scores = np.zeros(self.passage_count, dtype=np.float32)
+        k1 = self.index.k1
+        for _, _, pids, tfs in query_terms:
+            tf = tfs.astype(np.float32)
+            weight = _idf(self.passage_count, len(pids)) * (k1 + 1)
+            scores[pids] += weight * tf / (tf + self._norms[pids])
+        return scores
+
+    def dense_scores(self, query_terms) -> Optional[np.ndarray]:
+        if not query_terms:
+            return None
+        ids = np.array([t[0] for t in query_terms])
+        weights = np.array(
+            [math.log1p(count) * _idf(self.passage_count, len(pids)) for _, count, pids, _ in query_terms],
+            dtype=np.float32
+        )
+        vector = weights @ self.term_vectors[ids]
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return self.doc_vectors @ (vector / norm)
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[float, Passage]]:
+        """Top-k passages by fused BM25 + dense rank, at most one per page."""
+        query_terms = self._query_terms(query)
+        if not query_terms:
+            return []
+
+        rankings = [_top(self.bm25_scores(query_terms), self.candidates)]
+        dense = self.dense_scores(query_terms)
+        if dense is not None:
+            rankings.append(_top(dense, self.candidates))
+
+        fused: Dict[int, float] = {}
+        for ranking in rankings:
+            for rank, pid in enumerate(ranking.tolist(), 1):
+                fused[pid] = fused.get(pid, 0.0) + 1.0 / (self.rrf_k + rank)
+
+        hits: List[Tuple[float, Passage]] = []
+        seen_urls = set()
+        for pid, score in sorted(fused.items(), key=lambda item: item[1], reverse=True):
+            passage = self.index.passage(pid)
+            if passage.url in seen_urls:
+                continue
+            seen_urls.add(passage.url)
+            hits.append((score, passage))
+            if len(hits) == k:
+                break
+        return hits
+
+    def passage(self, pid: int) -> Passage:
+        return self.index.passage(pid)
+
+    def close(self):
+        self._norms = None
+        self.index.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Index size plus embedding shape, for /health."""
+        return {
+            **self.index.snapshot(),
+            'hybrid': True,
+            'embedding_dims': int(self.doc_vectors.shape[1])
+        }
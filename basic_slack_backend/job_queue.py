@@ -0,0 +1,152 @@
+"""
+Bounded work queue for user requests.
+Jobs are held per user and served round-robin by a fixed pool of asyncio
+workers, so one chatty user cannot starve everyone else. When the queue is
+full, submit() refuses the job and the caller tells the user to retry.
+"""
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Callable, Awaitable, Deque
+
+from metrics import STAGE_SECONDS, QUEUE_REJECTED_TOTAL
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """One queued unit of work."""
+    user_id: str
+    factory: Callable[[], Awaitable[Any]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+    description: str = ""
+
+
+class JobQueue:
+    """Fixed worker pool over a bounded, per-user round-robin queue."""
+
+    def __init__(self, max_depth: int = 100, workers: int = 10, max_per_user: int = 3):
+        self.max_depth = max_depth
+        self.worker_count = workers
+        self.max_per_user = max_per_user
+
+        self._pending: "OrderedDict[str, Deque[Job]]" = OrderedDict()
+        self._depth = 0
+        self._available = asyncio.Semaphore(0)
+        self._workers: List[asyncio.Task] = []
+        self._busy = 0
+
+        self.stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'completed': 0,
+            'failed': 0,
+            'last_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'total_wait_seconds': 0.0
+        }
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    def start(self):
+        """Spawn the worker tasks. Call from the app lifespan."""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info(
+            f"Job queue started (workers={self.worker_count}, depth={self.max_depth}, "
+            f"per_user={self.max_per_user})"
+        )
+
+    async def stop(self, timeout: float = 30):
+        """Let workers finish queued jobs for up to timeout seconds, then cancel them."""
+        if not self._workers:
+            return
+
+        deadline = time.monotonic() + timeout
+        while (self._depth or self._busy) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, user_id: str, factory: Callable[[], Awaitable[Any]], description: str = "") -> bool:
+        """Queue a job. Returns False (and queues nothing) if the queue or the user's share is full."""
+        user_jobs = self._pending.get(user_id)
+        if self._depth >= self.max_depth or (user_jobs and len(user_jobs) >= self.max_per_user):
+            self.stats['rejected'] += 1
+            QUEUE_REJECTED_TOTAL.inc()
+            logger.warning(f"Job queue full - rejecting request from {user_id} (depth={self._depth})")
+            return False
+
+        if user_jobs is None:
+            user_jobs = self._pending[user_id] = deque()
+        user_jobs.append(Job(user_id=user_id, factory=factory, description=description))
+
+        self._depth += 1
+        self.stats['submitted'] += 1
+        self._available.release()
+        return True
+
+    def _next_job(self) -> Job:
+        """Take the oldest job of the user at the front, then rotate that user to the back."""
+        user_id, user_jobs = next(iter(self._pending.items()))
+        job = user_jobs.popleft()
+        if user_jobs:
+            self._pending.move_to_end(user_id)
+        else:
+            del self._pending[user_id]
+        self._depth -= 1
+        return job
+
+    async def _worker(self, index: int):
+        while True:
+            await self._available.acquire()
+            job = self._next_job()
+
+            wait = time.monotonic() - job.enqueued_at
+            self.stats['last_wait_seconds'] = wait
+            self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], wait)
+            self.stats['total_wait_seconds'] += wait
+            STAGE_SECONDS.labels("queue_wait").observe(wait)
+
+            self._busy += 1
+            try:
+                await job.factory()
+                self.stats['completed'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"Job for {job.user_id} failed: {e}", exc_info=True)
+            finally:
+                self._busy -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Depth, worker usage and wait times, for /health."""
+        started = self.stats['completed'] + self.stats['failed'] + self._busy
+        return {
+            'depth': self._depth,
+            'max_depth': self.max_depth,
+            'workers': self.worker_count,
+            'busy_workers': self._busy,
+            'waiting_users': len(self._pending),
+            'avg_wait_seconds': round(self.stats['total_wait_seconds'] / started, 3) if started else 0.0,
+            'last_wait_seconds': round(self.stats['last_wait_seconds'], 3),
+            'max_wait_seconds': round(self.stats['max_wait_seconds'], 3),
+            'submitted': self.stats['submitted'],
+            'rejected': self.stats['rejected'],
+            'completed': self.stats['completed'],
+            'failed': self.stats['failed']
+        }
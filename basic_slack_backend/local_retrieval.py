@@ -0,0 +1,277 @@
+"""
+Local retrieval over the scraped documentation datasets.
+The *-dataset-* folders next to this app hold one JSON file per page
+({"url", "content", ...}). Pages are cut into heading-scoped passages and
+indexed with BM25 in memory, so when Genexus is slow or down the bot can
+still answer with the most relevant cited passages in a few milliseconds.
+"""
+
+import re
+import json
+import math
+import time
+import heapq
+import logging
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Optional, Sequence, Iterator
+
+from answer_cache import STOPWORDS
+
+logger = logging.getLogger(__name__)
+
+DATASET_GLOB = "*-dataset-*"
+PASSAGE_CHARS = 1200     # Target passage size when packing paragraphs
+MIN_PASSAGE_CHARS = 80   # Skip navigation crumbs and empty sections
+SNIPPET_CHARS = 450      # Per-passage excerpt in the fallback answer
+
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*$", re.MULTILINE)
+_TOKEN = re.compile(r"[^\W_]+")
+_BLANK_LINES = re.compile(r"\n\s*\n")
+_CJK = re.compile(r"[\u3000-\u9fff\uac00-\ud7af]")
+MAX_CJK_SHARE = 0.3      # The bot answers in English; skip translated (mostly Japanese) sections
+
+
+@dataclass
+class Passage:
+    """One indexed section of a scraped page."""
+    url: str
+    title: str
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; plural 's' is folded like the answer cache does."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def clean_markdown(content: str) -> str:
+    """Drop images (often inline base64) and keep only the text of links."""
+    content = _IMAGE.sub("", content)
+    content = _LINK.sub(r"\1", content)
+    return content.replace("​", "")
+
+
+def split_passages(url: str, content: str) -> List[Passage]:
+    """Cut a page into passages at headings, packing paragraphs up to PASSAGE_CHARS."""
+    content = clean_markdown(content)
+
+    # Anything before the page heading (the H1, else the first heading) is cookie banners and navigation
+    headings = list(_HEADING.finditer(content))
+    top = next((h for h in headings if len(h.group(1)) == 1), headings[0] if headings else None)
+    page_title = top.group(2) if top else url
+    if top:
+        content = content[top.start():]
+        headings = list(_HEADING.finditer(content))
+
+    sections: List[Tuple[str, str]] = []
+    bounds = [h.start() for h in headings] + [len(content)]
+    if not headings or bounds[0] > 0:
+        sections.append((page_title, content[:bounds[0]]))
+    for heading, end in zip(headings, bounds[1:]):
+        title = page_title if heading.start() == 0 else f"{page_title} › {heading.group(2)}"
+        sections.append((title, content[heading.end():end]))
+
+    passages = []
+    for title, body in sections:
+        current = ""
+        for paragraph in _BLANK_LINES.split(body):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if current and len(current) + len(paragraph) > PASSAGE_CHARS:
+                passages.append(Passage(url, title, current))
+                current = ""
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+        if current:
+            passages.append(Passage(url, title, current))
+
+    return [
+        p for p in passages
+        if len(p.text) >= MIN_PASSAGE_CHARS and len(_CJK.findall(p.text)) <= MAX_CJK_SHARE * len(p.text)
+    ]
+
+
+def find_dataset_dirs(root: Path) -> List[Path]:
+    """Dataset folders under root, oldest first (folder names end in the extraction date)."""
+    return sorted((p for p in root.glob(DATASET_GLOB) if p.is_dir()), key=lambda p: p.name)
+
+
+def load_pages(dataset_dirs: List[Path]) -> Dict[str, str]:
+    """url -> content; when a page appears in several snapshots the newest one wins."""
+    pages: Dict[str, str] = {}
+    for directory in dataset_dirs:
+        for path in sorted(directory.glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    page = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Skipping unreadable dataset file {path}: {e}")
+                continue
+            if isinstance(page, dict) and page.get("url") and page.get("content"):
+                pages[page["url"]] = page["content"]
+    return pages
+
+
+class BM25Search:
+    """
+    BM25 scoring shared by the in-memory and memory-mapped indexes.
+    Subclasses provide passage_count, k1, _norms (per-passage length factor),
+    _postings(term) and passage(pid).
+    """
+    passage_count: int
+    term_count: int
+    k1: float
+    _norms: Sequence[float]
+
+    def _postings(self, term: str) -> Optional[Tuple[Sequence[int], Sequence[int]]]:
+        raise NotImplementedError
+
+    def term_id(self, term: str) -> Optional[int]:
+        """Rank of term in sorted vocabulary order, or None if unknown."""
+        raise NotImplementedError
+
+    def iter_postings(self) -> Iterator[Tuple[str, Sequence[int], Sequence[int]]]:
+        """(term, passage ids, term frequencies) for every term, in term_id order."""
+        raise NotImplementedError
+
+    def passage(self, pid: int) -> Passage:
+        raise NotImplementedError
+
+    def _idf(self, df: int) -> float:
+        n = self.passage_count
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[float, Passage]]:
+        """Top-k passages by BM25, at most one per page."""
+        scores: Dict[int, float] = {}
+        k1 = self.k1
+        norms = self._norms
+        for term in set(tokenize(query)):
+            entry = self._postings(term)
+            if entry is None:
+                continue
+            pids, tfs = entry
+            weight = self._idf(len(pids)) * (k1 + 1)
+            for pid, tf in zip(pids, tfs):
+                scores[pid] = scores.get(pid, 0.0) + weight * tf / (tf + norms[pid])
+
+        hits: List[Tuple[float, Passage]] = []
+        seen_urls = set()
+        for pid, score in heapq.nlargest(k * 5, scores.items(), key=lambda item: item[1]):
+            passage = self.passage(pid)
+            if passage.url in seen_urls:
+                continue
+            seen_urls.add(passage.url)
+            hits.append((score, passage))
+            if len(hits) == k:
+                break
+        return hits
+
+    def close(self):
+        pass
+
+
+class LocalIndex(BM25Search):
+    """In-memory BM25 inverted index over passages."""
+
+    def __init__(self, passages: List[Passage], k1: float = 1.2, b: float = 0.75):
+        self.passages = passages
+        self.passage_count = len(passages)
+        self.k1 = k1
+        self.b = b
+
+        # term -> (passage ids, term frequencies), both compact arrays
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.lengths = array("I")
+        for pid, passage in enumerate(passages):
+            terms = Counter(tokenize(f"{passage.title}\n{passage.text}"))
+            self.lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                entry = self.postings.get(term)
+                if entry is None:
+                    entry = self.postings[term] = (array("I"), array("H"))
+                entry[0].append(pid)
+                entry[1].append(min(tf, 65535))
+
+        average = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        # Length normalisation folded into one factor per passage
+        self._norms = [k1 * (1 - b + b * length / average) if average else k1 for length in self.lengths]
+        self.term_count = len(self.postings)
+        self._term_ids: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_datasets(cls, dataset_dirs: List[Path]) -> "LocalIndex":
+        start = time.perf_counter()
+        pages = load_pages(dataset_dirs)
+        passages = [p for url, content in pages.items() for p in split_passages(url, content)]
+        index = cls(passages)
+        logger.info(
+            f"📚 Local index built: {len(pages)} pages, {len(passages)} passages, "
+            f"{len(index.postings)} terms in {time.perf_counter() - start:.1f}s"
+        )
+        return index
+
+    def _postings(self, term: str) -> Optional[Tuple[array, array]]:
+        return self.postings.get(term)
+
+    def term_id(self, term: str) -> Optional[int]:
+        if self._term_ids is None:
+            self._term_ids = {t: i for i, t in enumerate(sorted(self.postings))}
+        return self._term_ids.get(term)
+
+    def iter_postings(self) -> Iterator[Tuple[str, array, array]]:
+        for term in sorted(self.postings):
+            pids, tfs = self.postings[term]
+            yield term, pids, tfs
+
+    def passage(self, pid: int) -> Passage:
+        return self.passages[pid]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Index size, for /health."""
+        return {
+            'backend': 'memory',
+            'passages': len(self.passages),
+            'pages': len({p.url for p in self.passages}),
+            'terms': len(self.postings)
+        }
+
+
+def _snippet(text: str, limit: int = SNIPPET_CHARS) -> str:
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit] + "…"
+
+
+def local_sources(hits: List[Tuple[float, Passage]]) -> List[Dict[str, Any]]:
+    """Hits as Genexus-style file entries (caption + url) for the Sources list."""
+    return [{"caption": passage.title, "url": passage.url, "origin": "local"} for _, passage in hits]
+
+
+def build_local_answer(query: str, hits: List[Tuple[float, Passage]], notice: str) -> Dict[str, Any]:
+    """A Genexus-shaped result quoting the top passages, with numbered citations."""
+    lines = [f"_{notice}_", ""]
+    for i, (_, passage) in enumerate(hits, 1):
+        lines.append(f"*[{i}] {passage.title}*")
+        lines.append(_snippet(passage.text))
+        lines.append("")
+    return {
+        "question": query,
+        "content": "\n".join(lines).strip(),
+        "files": local_sources(hits),
+        "meta": {"query": query, "engine": "local"}
+    }
@@ -5,14 +5,32 @@ from typing import Dict, Any, Optional, List
 from urllib.parse import parse_qs
 from contextlib import asynccontextmanager
 import json
-import requests
-from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from fastapi import FastAPI, Request, BackgroundTasks
+from fastapi import FastAPI, Request, BackgroundTasks, HTTPException
+from fastapi.responses import PlainTextResponse
 from slack_sdk.web.async_client import AsyncWebClient
 from slack_sdk.errors import SlackApiError
 import uvicorn
 
+from genexus_client import GenexusClient
+from answer_cache import AnswerCache, is_cacheable, normalize_query
+from event_dedup import EventDeduplicator
+from feedback_store import FeedbackStore
+from job_queue import JobQueue
+from local_retrieval import BM25Search, LocalIndex, find_dataset_dirs, build_local_answer, local_sources
+from corpus_index import MappedIndex
+try:
+    from hybrid_retrieval import HybridSearch
+except ImportError:  # NumPy is optional: pip install -e .[hybrid]
+    HybridSearch = None
+from slack_sender import SlackSender
+from slack_splitter import split_message
+from metrics import (
+    render_metrics, STAGE_SECONDS, REQUESTS_TOTAL, ERRORS_TOTAL, CACHE_LOOKUPS_TOTAL,
+    CHUNKED_REPLIES_TOTAL, REPLY_PARTS_TOTAL, QUEUE_DEPTH, GENEXUS_IN_FLIGHT, LOCAL_ANSWERS_TOTAL
+)
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,89 +40,197 @@ SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 GENEXUS_API_KEY = os.getenv("GENEXUS_API_KEY")
 MODEL_NAME = os.getenv("LLM_NAME", "saia:llama-3.1-8b-instruct")  # Provide default
 PORT = int(os.getenv("PORT", 8080))
+STREAMING_ENABLED = os.getenv("GENEXUS_STREAMING", "true").lower() == "true"
+STREAM_UPDATE_INTERVAL = float(os.getenv("STREAM_UPDATE_INTERVAL", 1.5))  # Seconds between chat_update calls
+STREAM_PREVIEW_LENGTH = 3500  # Keep previews under Slack's 4000 char limit
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 1000))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 86400))  # Seconds
+ANSWER_CACHE_NEAR_DUPLICATES = os.getenv("ANSWER_CACHE_NEAR_DUPLICATES", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.8))
+EVENT_DEDUP_WINDOW = float(os.getenv("EVENT_DEDUP_WINDOW", 3600))  # Seconds to remember event_ids
+EVENT_DEDUP_MAX_ENTRIES = int(os.getenv("EVENT_DEDUP_MAX_ENTRIES", 10000))
+EVENT_DEDUP_SQLITE_PATH = os.getenv("EVENT_DEDUP_SQLITE_PATH")  # Shared file for multi-replica runs
+JOB_QUEUE_DEPTH = int(os.getenv("JOB_QUEUE_DEPTH", 100))
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", 10))
+JOB_QUEUE_MAX_PER_USER = int(os.getenv("JOB_QUEUE_MAX_PER_USER", 3))
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+FEEDBACK_DB_PATH = os.getenv("FEEDBACK_DB_PATH", "feedback.db")
+FEEDBACK_BATCH_SIZE = int(os.getenv("FEEDBACK_BATCH_SIZE", 50))
+FEEDBACK_FLUSH_INTERVAL = float(os.getenv("FEEDBACK_FLUSH_INTERVAL", 5))  # Seconds
+LOCAL_RETRIEVAL_MODE = os.getenv("LOCAL_RETRIEVAL_MODE", "fallback").lower()  # off | fallback | hybrid
+LOCAL_RETRIEVAL_DATA_DIR = os.getenv(
+    "LOCAL_RETRIEVAL_DATA_DIR",
+    str(Path(__file__).resolve().parent.parent)  # Repo root, where the *-dataset-* folders live
+)
+LOCAL_RETRIEVAL_TOP_K = int(os.getenv("LOCAL_RETRIEVAL_TOP_K", 3))
+LOCAL_RETRIEVAL_HYBRID = os.getenv("LOCAL_RETRIEVAL_HYBRID", "true").lower() == "true"  # BM25 + LSA fusion
+LOCAL_INDEX_PATH = os.getenv(
+    "LOCAL_INDEX_PATH",
+    str(Path(__file__).resolve().parent / "corpus.idx")  # Built with `make corpus-index`
+)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # Required for admin endpoints such as cache invalidation
 
 # Global instances
 slack_client: Optional[AsyncWebClient] = None
+slack_sender: Optional[SlackSender] = None  # Rate-limit-aware wrapper around slack_client
 BOT_USER_ID: Optional[str] = None
-executor = ThreadPoolExecutor(max_workers=5)  # For running sync requests in async context
+genexus_client: Optional[GenexusClient] = None  # Shared keep-alive pool for Genexus calls
+answer_cache: Optional[AnswerCache] = AnswerCache(
+    max_entries=ANSWER_CACHE_SIZE,
+    ttl_seconds=ANSWER_CACHE_TTL,
+    near_duplicates=ANSWER_CACHE_NEAR_DUPLICATES,
+    similarity_threshold=ANSWER_CACHE_SIMILARITY
+) if ANSWER_CACHE_ENABLED else None
+inflight_requests: Dict[str, asyncio.Future] = {}  # Normalized query -> shared upstream result
+single_flight_stats = {"leaders": 0, "coalesced": 0}
+event_dedup: Optional[EventDeduplicator] = None
+feedback_store: Optional[FeedbackStore] = None
+local_index: Optional[BM25Search] = None  # BM25 index over the scraped datasets (mmap'd file or built in memory)
+local_index_task: Optional[asyncio.Task] = None
+job_queue = JobQueue(max_depth=JOB_QUEUE_DEPTH, workers=JOB_QUEUE_WORKERS, max_per_user=JOB_QUEUE_MAX_PER_USER)
 
 
-def genexus_rag_request(api_key: str, claim: str, model_name: str = None):
+async def async_genexus_rag_request(api_key: str, claim: str, model_name: str = None):
     """
-    Internal helper for Genexus RAG calls.
+    Send a question to Genexus through the shared async client.
     """
-    model_name = model_name or MODEL_NAME  # Use default if not provided
-    base_url = "https://workspace.saia.ai/api/chat/ece1d2ab-981e-4c24-b628-fec5757fe77e/b240017b-defa-42c4-8430-c364fadd77e3/67b580da-9f22-428e-b81f-5ac63452bad7"
-    body = {
-        "role": "user",
-        "content": claim,
-        "requestId": f"slack-{hash(claim) % 10000}",
-        "application": "saia-chat"
-    }
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    global genexus_client
 
-    try:
-        response = requests.post(base_url, headers=headers, json=body)
-        logger.info(f"Response status code: {response.status_code}")
-        response.raise_for_status()
-    except requests.RequestException as e:
-        logger.error(f"Request error: {e}")
-        return f"Error making request: {e}"
+    if genexus_client is None:
+        # Fallback for calls made outside the app lifespan (e.g. scripts)
+        genexus_client = GenexusClient(api_key)
+        await genexus_client.start()
+
+    return await genexus_client.rag_request(claim, model_name or MODEL_NAME)
+
+
+async def async_genexus_stream_request(api_key: str, claim: str, on_partial, model_name: str = None):
+    """
+    Streaming variant of async_genexus_rag_request; on_partial receives the content chunks so far.
+    """
+    global genexus_client
+
+    if genexus_client is None:
+        genexus_client = GenexusClient(api_key)
+        await genexus_client.start()
+
+    return await genexus_client.stream_rag_request(claim, on_partial, model_name or MODEL_NAME)
+
+
+async def coalesced_rag_request(query: str, on_partial=None):
+    """
+    Single-flight wrapper: concurrent identical (normalized) queries share one upstream call.
+    The first caller makes the request; later callers await its result.
+    """
+    key = normalize_query(query)
+    if not SINGLE_FLIGHT_ENABLED or not key:
+        if on_partial:
+            return await async_genexus_stream_request(GENEXUS_API_KEY, query, on_partial, MODEL_NAME)
+        return await async_genexus_rag_request(GENEXUS_API_KEY, query, MODEL_NAME)
+
+    existing = inflight_requests.get(key)
+    if existing is not None:
+        single_flight_stats["coalesced"] += 1
+        logger.info(f"Coalescing identical in-flight query: {key}")
+        # Shield so one waiter giving up doesn't cancel the shared request
+        return await asyncio.shield(existing)
+
+    future = asyncio.get_event_loop().create_future()
+    # Mark the exception as retrieved even if nobody else was waiting
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    inflight_requests[key] = future
+    single_flight_stats["leaders"] += 1
 
     try:
-        # Handle streaming JSON response with URL-encoded content
-        import urllib.parse
-
-        content_chunks = []
-        files_info = []
-
-        for line in response.text.strip().split('\n'):
-            if line.strip():
-                try:
-                    chunk = json.loads(line)
-                    if 'content' in chunk:
-                        # URL decode the content
-                        decoded_content = urllib.parse.unquote(chunk['content'])
-                        content_chunks.append(decoded_content)
-                    elif 'files' in chunk:
-                        files_info = chunk.get('files', [])
-                except json.JSONDecodeError:
-                    continue
+        if on_partial:
+            results = await async_genexus_stream_request(GENEXUS_API_KEY, query, on_partial, MODEL_NAME)
+        else:
+            results = await async_genexus_rag_request(GENEXUS_API_KEY, query, MODEL_NAME)
+        future.set_result(results)
+        return results
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        inflight_requests.pop(key, None)
 
-        # Combine all content chunks
-        full_content = ''.join(content_chunks)
 
-        # Create response in expected format
-        data = {
-            "content": full_content,
-            "files": files_info
-        }
+async def load_local_index():
+    """
+    Map the prebuilt corpus index if there is one; otherwise build the index from the
+    dataset folders off the event loop (the bot answers normally meanwhile).
+    """
+    global local_index
 
+    index: Optional[BM25Search] = None
+    embeddings_prefix = None
+    if os.path.exists(LOCAL_INDEX_PATH):
+        try:
+            index = MappedIndex(LOCAL_INDEX_PATH)
+            embeddings_prefix = LOCAL_INDEX_PATH
+            logger.info(f"📚 Mapped corpus index {LOCAL_INDEX_PATH}: {index.snapshot()}")
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Could not map corpus index {LOCAL_INDEX_PATH}, rebuilding in memory: {e}")
+
+    if index is None:
+        dataset_dirs = find_dataset_dirs(Path(LOCAL_RETRIEVAL_DATA_DIR))
+        if not dataset_dirs:
+            logger.warning(f"⚠️ No datasets found under {LOCAL_RETRIEVAL_DATA_DIR} - local retrieval disabled")
+            return
+        try:
+            index = await asyncio.to_thread(LocalIndex.from_datasets, dataset_dirs)
+        except Exception as e:
+            logger.error(f"❌ Failed to build local retrieval index: {e}", exc_info=True)
+            return
+
+    # Serve plain BM25 right away; swap in the hybrid scorer once its embeddings are ready
+    local_index = index
+    if not LOCAL_RETRIEVAL_HYBRID:
+        return
+    if HybridSearch is None:
+        logger.warning("⚠️ NumPy not installed - hybrid retrieval disabled, using BM25 only")
+        return
+    try:
+        local_index = await asyncio.to_thread(HybridSearch.for_index, index, embeddings_prefix)
     except Exception as e:
-        logger.error(f"Response parsing error: {e}")
-        logger.error(f"Full response content: {response.text[:200]}...")
-        return f"Error parsing response: {str(e)}"
-
-    # Return formatted result with content and sources
-    result = {
-        "question": claim,
-        "content": data.get("content", ""),
-        "files": data.get("files", []),
-        "meta": {"query": claim}
-    }
+        logger.error(f"❌ Failed to set up hybrid retrieval, using BM25 only: {e}", exc_info=True)
 
-    return result
 
+LOCAL_FALLBACK_NOTICE = "The knowledge service is unavailable right now, so here are the most relevant passages from the Cardano docs:"
 
-async def async_genexus_rag_request(api_key: str, claim: str, model_name: str = None):
+
+def apply_local_retrieval(query: str, results: Any) -> Any:
     """
-    Async wrapper for the Genexus RAG request.
+    Fallback: replace a failed Genexus answer with cited local passages.
+    Hybrid: additionally attach local passages to good answers as related docs.
     """
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, genexus_rag_request, api_key, claim, model_name)
+    if local_index is None or LOCAL_RETRIEVAL_MODE not in ("fallback", "hybrid"):
+        return results
+
+    upstream_failed = not is_cacheable(results)
+    if not upstream_failed and LOCAL_RETRIEVAL_MODE != "hybrid":
+        return results
+
+    with STAGE_SECONDS.labels("local_search").time():
+        hits = local_index.search(query, LOCAL_RETRIEVAL_TOP_K)
+    if not hits:
+        return results
+
+    if upstream_failed:
+        logger.warning(f"Genexus answer unavailable ({str(results)[:100]}); answering from the local index")
+        LOCAL_ANSWERS_TOTAL.labels("fallback").inc()
+        return build_local_answer(query, hits, LOCAL_FALLBACK_NOTICE)
+
+    known_urls = {f.get('url') for f in results.get('files', [])}
+    related = [source for source in local_sources(hits) if source['url'] not in known_urls]
+    if related:
+        LOCAL_ANSWERS_TOTAL.labels("hybrid").inc()
+        results = {**results, "related": related}
+    return results
 
 
 def format_rag_results(results: Any, query: str) -> str:
@@ -136,7 +262,15 @@ def format_rag_results(results: Any, query: str) -> str:
             formatted_message += "\n\n*📚 Sources:*\n"
             for i, file_info in enumerate(files[:3], 1):  # Limit to 3 sources
                 caption = file_info.get('caption', f'Source {i}')
-                formatted_message += f"• {caption}\n"
+                url = file_info.get('url')
+                formatted_message += f"• <{url}|{caption}>\n" if url else f"• {caption}\n"
+
+        # Local passages attached in hybrid mode
+        related = results.get('related', [])
+        if related:
+            formatted_message += "\n*🔎 Related docs:*\n"
+            for file_info in related:
+                formatted_message += f"• <{file_info['url']}|{file_info['caption']}>\n"
 
         return formatted_message
 
@@ -167,7 +301,7 @@ def format_rag_results(results: Any, query: str) -> str:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management."""
-    global slack_client, BOT_USER_ID
+    global slack_client, slack_sender, BOT_USER_ID, genexus_client, event_dedup, feedback_store, local_index_task
     
     logger.info("🚀 Starting Slack Bot...")
     
@@ -179,11 +313,14 @@ async def lifespan(app: FastAPI):
         logger.warning("⚠️ GENEXUS_API_KEY not found in environment variables")
     else:
         logger.info("✅ Genexus API key loaded")
+        genexus_client = GenexusClient(GENEXUS_API_KEY)
+        await genexus_client.start()
     
     try:
         if SLACK_BOT_TOKEN:
             # Initialize Slack client
             slack_client = AsyncWebClient(token=SLACK_BOT_TOKEN)
+            slack_sender = SlackSender(slack_client)
             
             # Get bot user ID
             auth_response = await slack_client.auth_test()
@@ -194,10 +331,33 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Slack initialization failed: {e}")
         # Continue anyway for health checks
     
+    event_dedup = EventDeduplicator(
+        window_seconds=EVENT_DEDUP_WINDOW,
+        max_entries=EVENT_DEDUP_MAX_ENTRIES,
+        sqlite_path=EVENT_DEDUP_SQLITE_PATH
+    )
+    feedback_store = FeedbackStore(
+        FEEDBACK_DB_PATH,
+        batch_size=FEEDBACK_BATCH_SIZE,
+        flush_interval=FEEDBACK_FLUSH_INTERVAL
+    )
+    feedback_store.start()
+    if LOCAL_RETRIEVAL_MODE in ("fallback", "hybrid"):
+        local_index_task = asyncio.create_task(load_local_index())
+    job_queue.start()
+    
     yield
     
     # Cleanup
-    executor.shutdown(wait=True)
+    await job_queue.stop()
+    if feedback_store:
+        await feedback_store.close()
+    if genexus_client:
+        await genexus_client.close()
+    if event_dedup:
+        event_dedup.close()
+    if local_index:
+        local_index.close()
     logger.info("👋 Slack bot shutdown complete")
 
 
@@ -229,10 +389,59 @@ async def health():
         "services": {
             "slack": bool(slack_client and BOT_USER_ID),
             "genexus_api": bool(GENEXUS_API_KEY)
-        }
+        },
+        "answer_cache": answer_cache.snapshot() if answer_cache is not None else None,
+        "single_flight": {"in_flight": len(inflight_requests), **single_flight_stats},
+        "event_dedup": event_dedup.snapshot() if event_dedup else None,
+        "feedback_store": feedback_store.snapshot() if feedback_store else None,
+        "local_index": {"mode": LOCAL_RETRIEVAL_MODE, **local_index.snapshot()} if local_index else None,
+        "queue": job_queue.snapshot()
     }
 
 
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """Prometheus-style metrics: per-stage latency histograms and counters."""
+    QUEUE_DEPTH.set(job_queue.depth)
+    GENEXUS_IN_FLIGHT.set(genexus_client.in_flight if genexus_client else 0)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+def require_admin(request: Request):
+    """Reject the request unless it carries "Authorization: Bearer $ADMIN_TOKEN"."""
+    if not ADMIN_TOKEN or request.headers.get("Authorization") != f"Bearer {ADMIN_TOKEN}":
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@app.post("/cache/invalidate")
+async def invalidate_cache(request: Request) -> Dict[str, Any]:
+    """Drop all cached answers. Call after re-uploading the knowledge base datasets."""
+    require_admin(request)
+
+    dropped = answer_cache.invalidate() if answer_cache is not None else 0
+    return {"status": "ok", "dropped": dropped}
+
+
+@app.get("/feedback/summary")
+async def feedback_summary(
+    request: Request,
+    group_by: str = "question",
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 50
+) -> Dict[str, Any]:
+    """Thumbs-up/down totals grouped by question, source or day (dates as YYYY-MM-DD, UTC)."""
+    require_admin(request)
+    if not feedback_store:
+        raise HTTPException(status_code=503, detail="Feedback store not available")
+
+    try:
+        rows = await feedback_store.summary(group_by, since, until, max(1, min(limit, 1000)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"group_by": group_by, "since": since, "until": until, "results": rows}
+
+
 def create_feedback_blocks(message_id: str) -> List[Dict[str, Any]]:
     """Create feedback button blocks for a message."""
     return [
@@ -273,25 +482,14 @@ async def send_message(
     blocks: Optional[List[Dict[str, Any]]] = None
 ) -> Dict[str, Any]:
     """Send a message to Slack."""
-    if not slack_client:
+    if not slack_sender:
         logger.error("Slack client not initialized")
         return {}
     
     try:
-        kwargs = {
-            "channel": channel,
-            "text": text,
-        }
-        
-        if thread_ts:
-            kwargs["thread_ts"] = thread_ts
-            
-        if blocks:
-            kwargs["blocks"] = blocks
-            
-        response = await slack_client.chat_postMessage(**kwargs)
-        return response.data
+        return await slack_sender.post_message(channel, text, thread_ts, blocks)
     except SlackApiError as e:
+        ERRORS_TOTAL.labels("slack_api").inc()
         logger.error(f"Error sending message: {e}")
         return {}
 
@@ -303,8 +501,12 @@ async def send_message_with_feedback(
     thread_ts: Optional[str] = None
 ) -> Dict[str, Any]:
     """Send a message with feedback buttons."""
-    # Create blocks with the message text and feedback buttons
-    blocks = [
+    return await send_message(channel, text, thread_ts, create_message_blocks(text, message_id))
+
+
+def create_message_blocks(text: str, message_id: str) -> List[Dict[str, Any]]:
+    """Create blocks with the message text and feedback buttons."""
+    return [
         {
             "type": "section",
             "text": {
@@ -313,8 +515,59 @@ async def send_message_with_feedback(
             }
         }
     ] + create_feedback_blocks(message_id)
-    
-    return await send_message(channel, text, thread_ts, blocks)
+
+
+async def update_message(
+    channel: str,
+    ts: str,
+    text: str,
+    blocks: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Edit an existing Slack message."""
+    if not slack_sender:
+        return {}
+
+    try:
+        return await slack_sender.update_message(channel, ts, text, blocks)
+    except SlackApiError as e:
+        ERRORS_TOTAL.labels("slack_api").inc()
+        logger.warning(f"Error updating message: {e}")
+        return {}
+
+
+class StreamingAckUpdater:
+    """Progressively edits the acknowledgement message with a partial answer, throttled."""
+
+    def __init__(self, channel: str, ts: str, header: str, interval: float = STREAM_UPDATE_INTERVAL):
+        self.channel = channel
+        self.ts = ts
+        self.header = header
+        self.interval = interval
+        self._last_update = 0.0
+        self._pending: Optional[asyncio.Task] = None
+
+    async def on_partial(self, content_chunks: List[str]):
+        """Schedule a chat_update if the throttle window has passed and none is in flight."""
+        now = asyncio.get_event_loop().time()
+        if now - self._last_update < self.interval:
+            return
+        if self._pending and not self._pending.done():
+            return
+
+        self._last_update = now
+        content = ''.join(content_chunks)
+        if len(content) > STREAM_PREVIEW_LENGTH:
+            content = content[:STREAM_PREVIEW_LENGTH] + "..."
+
+        # Run in the background so reading the stream is never blocked on Slack
+        self._pending = asyncio.create_task(
+            update_message(self.channel, self.ts, f"{self.header}\n\n{content} ✍️")
+        )
+
+    async def drain(self):
+        """Wait for any in-flight update so it cannot overwrite the final answer."""
+        if self._pending:
+            await asyncio.gather(self._pending, return_exceptions=True)
 
 
 async def handle_feedback(
@@ -325,27 +578,19 @@ async def handle_feedback(
     response_url: Optional[str] = None
 ):
     """Handle feedback from users."""
-    # Log feedback to stdout for now
-    feedback_data = {
-        "timestamp": asyncio.get_event_loop().time(),
-        "user_id": user_id,
-        "channel_id": channel_id,
-        "message_id": message_id,
-        "feedback_type": feedback_type
-    }
-    
-    # Print to stdout as requested
-    print(f"FEEDBACK RECEIVED: {json.dumps(feedback_data, indent=2)}")
-    logger.info(f"Feedback received: {feedback_data}")
+    # Buffered and written to the feedback store in batches - no disk I/O per click
+    if feedback_store:
+        feedback_store.record_feedback(message_id, user_id, channel_id, feedback_type)
+    logger.debug(f"Feedback received: {feedback_type} on {message_id} from {user_id}")
     
     # Send acknowledgment to user (ephemeral message) - only if we have a real Slack client
-    if slack_client and response_url:
+    if slack_sender and response_url:
         emoji = "✅" if feedback_type == "positive" else "📝"
         message = f"{emoji} Thank you for your feedback!"
         
         try:
             # Try to send ephemeral message, but don't fail if channel doesn't exist (testing scenario)
-            await slack_client.chat_postEphemeral(
+            await slack_sender.post_ephemeral(
                 channel=channel_id,
                 user=user_id,
                 text=message
@@ -368,6 +613,7 @@ async def process_user_request(
     interaction_type: str = "message"
 ):
     """Process a user's request using Genexus RAG API."""
+    REQUESTS_TOTAL.labels(interaction_type).inc()
     try:
         # Check API key
         if not GENEXUS_API_KEY:
@@ -378,88 +624,63 @@ async def process_user_request(
             )
             return
         
-        # Send initial acknowledgment (no feedback buttons for this)
-        emoji_map = {"dm": "💬", "mention": "👋", "command": "🔍"}
-        emoji = emoji_map.get(interaction_type, "🤖")
+        # Serve repeated questions straight from the cache - no acknowledgement needed
+        ack: Dict[str, Any] = {}
+        results = answer_cache.get(query) if answer_cache is not None else None
+        if answer_cache is not None:
+            CACHE_LOOKUPS_TOTAL.labels("hit" if results is not None else "miss").inc()
         
-        await send_message(
-            channel,
-            f"{emoji} <@{user_id}> I'm working on answering your request: _{query}_\n⏳ This may take a moment...",
-            thread_ts
-        )
-        
-        # Make the RAG request
-        results = await async_genexus_rag_request(GENEXUS_API_KEY, query, MODEL_NAME)
+        if results is None:
+            # Send initial acknowledgment (no feedback buttons for this)
+            emoji_map = {"dm": "💬", "mention": "👋", "command": "🔍"}
+            emoji = emoji_map.get(interaction_type, "🤖")
+            
+            ack_header = f"{emoji} <@{user_id}> I'm working on answering your request: _{query}_"
+            with STAGE_SECONDS.labels("ack_post").time():
+                ack = await send_message(
+                    channel,
+                    f"{ack_header}\n⏳ This may take a moment...",
+                    thread_ts
+                )
+            
+            # Make the RAG request, streaming partial answers into the acknowledgement when possible
+            if STREAMING_ENABLED and ack.get("ts"):
+                updater = StreamingAckUpdater(ack.get("channel", channel), ack["ts"], ack_header)
+                results = await coalesced_rag_request(query, updater.on_partial)
+                await updater.drain()
+            else:
+                results = await coalesced_rag_request(query)
+            
+            results = apply_local_retrieval(query, results)
+            
+            if answer_cache is not None and is_cacheable(results):
+                answer_cache.put(query, results)
         
         # Format the results
-        formatted_response = format_rag_results(results, query)
+        with STAGE_SECONDS.labels("format").time():
+            formatted_response = format_rag_results(results, query)
         
         # Generate unique message ID for tracking feedback
         message_id = f"{user_id}_{channel}_{int(asyncio.get_event_loop().time() * 1000)}"
+        if feedback_store and isinstance(results, dict):
+            sources = [f.get('caption') or f.get('name', '') for f in results.get('files', [])[:3]]
+            feedback_store.record_answer(message_id, query, [s for s in sources if s])
         
-        # Check message length and split if needed
-        max_length = 3900  # Slack's limit is 4000
+        # Split into Slack-sized parts on paragraph/sentence boundaries if needed
+        with STAGE_SECONDS.labels("split").time():
+            chunks = split_message(formatted_response)
         
-        if len(formatted_response) <= max_length:
-            # Send single message with feedback buttons
-            await send_message_with_feedback(
-                channel,
-                formatted_response,
-                message_id,
-                thread_ts
-            )
+        if len(chunks) == 1:
+            parts = chunks
         else:
-            # Split into chunks at newline boundaries
-            lines = formatted_response.split('\n')
-            chunks = []
-            current_chunk = []
-            current_length = 0
-            
-            for line in lines:
-                line_length = len(line) + 1
-                
-                if current_length + line_length > max_length:
-                    if current_chunk:
-                        chunks.append('\n'.join(current_chunk))
-                    
-                    if line_length > max_length:
-                        while len(line) > max_length:
-                            chunks.append(line[:max_length])
-                            line = line[max_length:]
-                        current_chunk = [line] if line else []
-                        current_length = len(line) + 1 if line else 0
-                    else:
-                        current_chunk = [line]
-                        current_length = line_length
-                else:
-                    current_chunk.append(line)
-                    current_length += line_length
-            
-            if current_chunk:
-                chunks.append('\n'.join(current_chunk))
-            
-            # Send chunks - only last one gets feedback buttons
-            for i, chunk in enumerate(chunks):
-                is_last = (i == len(chunks) - 1)
-                
-                if is_last:
-                    # Last chunk gets feedback buttons
-                    await send_message_with_feedback(
-                        channel,
-                        f"📄 Part {i+1}/{len(chunks)}:\n{chunk}",
-                        message_id,
-                        thread_ts
-                    )
-                else:
-                    # Other chunks are sent normally
-                    await send_message(
-                        channel,
-                        f"📄 Part {i+1}/{len(chunks)}:\n{chunk}",
-                        thread_ts
-                    )
-                await asyncio.sleep(0.5)  # Avoid rate limits
+            parts = [f"📄 Part {i+1}/{len(chunks)}:\n{chunk}" for i, chunk in enumerate(chunks)]
+            CHUNKED_REPLIES_TOTAL.inc()
+            REPLY_PARTS_TOTAL.inc(len(parts))
+        
+        await deliver_answer(channel, parts, message_id, thread_ts, ack)
             
     except Exception as e:
+        ERRORS_TOTAL.labels("process_user_request").inc()
         logger.error(f"Error processing query: {e}", exc_info=True)
         # Error message - no feedback buttons needed
         await send_message(
@@ -469,6 +690,56 @@ async def process_user_request(
         )
 
 
+async def deliver_answer(
+    channel: str,
+    parts: List[str],
+    message_id: str,
+    thread_ts: Optional[str] = None,
+    ack: Optional[Dict[str, Any]] = None
+):
+    """
+    Post the answer parts in order. The first part replaces the acknowledgement
+    message in place; only the last part gets feedback buttons. The sender waits
+    only when Slack's rate budget is used up, instead of a fixed sleep per part.
+    """
+    for i, part in enumerate(parts):
+        is_last = (i == len(parts) - 1)
+        blocks = create_message_blocks(part, message_id) if is_last else None
+        
+        with STAGE_SECONDS.labels("slack_post").time():
+            if i == 0 and ack and ack.get("ts"):
+                response = await update_message(ack.get("channel", channel), ack["ts"], part, blocks)
+                if response:
+                    continue
+            # No acknowledgement to edit (or the edit failed) - post a new message
+            await send_message(channel, part, thread_ts, blocks)
+
+
+BUSY_MESSAGE = "🚦 <@{user_id}> I'm handling a lot of questions right now. Please try again in a minute."
+
+
+def enqueue_user_request(
+    background_tasks: BackgroundTasks,
+    user_id: str,
+    channel: str,
+    query: str,
+    thread_ts: Optional[str] = None,
+    interaction_type: str = "message"
+) -> bool:
+    """Queue process_user_request; if the queue is full, post a fast busy reply instead."""
+    accepted = job_queue.submit(
+        user_id,
+        lambda: process_user_request(user_id, channel, query, thread_ts, interaction_type),
+        description=query[:80]
+    )
+
+    # Slash commands answer "busy" in their ephemeral HTTP response instead
+    if not accepted and interaction_type != "command":
+        background_tasks.add_task(send_message, channel, BUSY_MESSAGE.format(user_id=user_id), thread_ts)
+
+    return accepted
+
+
 @app.post("/slack/interactions")
 async def slack_interactions(request: Request, background_tasks: BackgroundTasks) -> Dict[str, Any]:
     """Handle interactive components (buttons, select menus, etc.)."""
@@ -537,6 +808,16 @@ async def slack_events(request: Request, background_tasks: BackgroundTasks) -> D
             event = data.get("event", {})
             event_type = event.get("type")
             
+            # Ack and drop Slack retries of events we have already scheduled
+            event_id = data.get("event_id") or f"{event.get('channel')}:{event.get('ts')}"
+            retry_num = request.headers.get("X-Slack-Retry-Num")
+            if event_dedup and await event_dedup.is_duplicate(event_id, retry_num):
+                logger.info(
+                    f"Dropping duplicate event {event_id} "
+                    f"(retry {retry_num}, reason {request.headers.get('X-Slack-Retry-Reason')})"
+                )
+                return {"status": "ok"}
+            
             # Skip bot's own messages
             if event.get("user") == BOT_USER_ID:
                 return {"status": "ok"}
@@ -549,8 +830,8 @@ async def slack_events(request: Request, background_tasks: BackgroundTasks) -> D
                 
                 if user and text:
                     logger.info(f"DM from {user}: {text}")
-                    background_tasks.add_task(
-                        process_user_request,
+                    enqueue_user_request(
+                        background_tasks,
                         user,
                         channel,
                         text,
@@ -570,8 +851,8 @@ async def slack_events(request: Request, background_tasks: BackgroundTasks) -> D
                     query = text.replace(f"<@{BOT_USER_ID}>", "").strip()
                     logger.info(f"Mention from {user}: {query}")
                     
-                    background_tasks.add_task(
-                        process_user_request,
+                    enqueue_user_request(
+                        background_tasks,
                         user,
                         channel,
                         query,
@@ -611,9 +892,9 @@ async def slack_commands(request: Request, background_tasks: BackgroundTasks) ->
                     "text": "📝 Please provide a query. Example: `/search <your question here>`"
                 }
             
-            # Process in background
-            background_tasks.add_task(
-                process_user_request,
+            # Process in the job queue
+            accepted = enqueue_user_request(
+                background_tasks,
                 user_id,
                 channel_id,
                 text,
@@ -621,6 +902,12 @@ async def slack_commands(request: Request, background_tasks: BackgroundTasks) ->
                 "command"
             )
             
+            if not accepted:
+                return {
+                    "response_type": "ephemeral",
+                    "text": "🚦 I'm handling a lot of questions right now. Please try again in a minute."
+                }
+            
             # Immediate response
             return {
                 "response_type": "ephemeral",
@@ -0,0 +1,129 @@
+"""
+Rate-limit-aware Slack Web API sender.
+Each method has a workspace-wide token bucket sized to its Slack tier, and
+chat.postMessage also gets one bucket per channel (Slack allows ~1 message
+per second per channel with short bursts). Calls only wait when a budget is
+exhausted, and a 429 pauses the affected bucket for its Retry-After.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Optional, List, Tuple
+
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.errors import SlackApiError
+
+from metrics import ERRORS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# (requests per second, burst) - Slack tiers: Tier 2 ~20/min, Tier 3 ~50/min, Tier 4 ~100/min
+METHOD_LIMITS: Dict[str, Tuple[float, int]] = {
+    "chat.postMessage": (1.0, 10),      # Special tier; the per-channel bucket is the real limit
+    "chat.update": (50 / 60, 10),       # Tier 3
+    "chat.postEphemeral": (100 / 60, 20),  # Tier 4
+}
+CHANNEL_LIMITS: Dict[str, Tuple[float, int]] = {
+    "chat.postMessage": (1.0, 3),
+}
+DEFAULT_LIMIT = (20 / 60, 5)  # Tier 2 for anything else
+
+
+class TokenBucket:
+    """Async token bucket; waiters are served in FIFO order."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def block(self, seconds: float):
+        """Pause the bucket (after a 429), leaving a single token for the retry."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 1.0
+        self._updated = self._blocked_until
+
+
+class SlackSender:
+    """Sends Slack Web API calls within per-method and per-channel rate budgets."""
+
+    def __init__(self, client: AsyncWebClient, max_retries: int = 3):
+        self.client = client
+        self.max_retries = max_retries
+        self._method_buckets: Dict[str, TokenBucket] = {}
+        self._channel_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def _buckets(self, method: str, channel: Optional[str]) -> List[TokenBucket]:
+        buckets = []
+        if method not in self._method_buckets:
+            self._method_buckets[method] = TokenBucket(*METHOD_LIMITS.get(method, DEFAULT_LIMIT))
+        buckets.append(self._method_buckets[method])
+
+        if channel and method in CHANNEL_LIMITS:
+            key = (method, channel)
+            if key not in self._channel_buckets:
+                self._channel_buckets[key] = TokenBucket(*CHANNEL_LIMITS[method])
+            buckets.append(self._channel_buckets[key])
+        return buckets
+
+    async def call(self, method: str, **kwargs) -> Dict[str, Any]:
+        """Call a Web API method, waiting for budget and honoring Retry-After on 429s."""
+        buckets = self._buckets(method, kwargs.get("channel"))
+
+        for attempt in range(self.max_retries + 1):
+            for bucket in buckets:
+                await bucket.acquire()
+            try:
+                response = await self.client.api_call(method, json=kwargs)
+                return response.data
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt == self.max_retries:
+                    raise
+                headers = e.response.headers or {}
+                retry_after = float(headers.get("Retry-After") or headers.get("retry-after") or 1)
+                ERRORS_TOTAL.labels("slack_rate_limited").inc()
+                logger.warning(f"Slack rate limited {method}; retrying in {retry_after:.0f}s")
+                for bucket in buckets:
+                    bucket.block(retry_after)
+
+        return {}
+
+    async def post_message(self, channel: str, text: str, thread_ts: Optional[str] = None,
+                           blocks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"channel": channel, "text": text}
+        if thread_ts:
+            kwargs["thread_ts"] = thread_ts
+        if blocks:
+            kwargs["blocks"] = blocks
+        return await self.call("chat.postMessage", **kwargs)
+
+    async def update_message(self, channel: str, ts: str, text: str,
+                             blocks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"channel": channel, "ts": ts, "text": text}
+        if blocks:
+            kwargs["blocks"] = blocks
+        return await self.call("chat.update", **kwargs)
+
+    async def post_ephemeral(self, channel: str, user: str, text: str) -> Dict[str, Any]:
+        return await self.call("chat.postEphemeral", channel=channel, user=user, text=text)
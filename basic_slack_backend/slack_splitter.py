@@ -0,0 +1,139 @@
+"""
+Slack mrkdwn-aware message splitter.
+Splits long answers into Slack-sized parts in a single linear pass,
+preferring paragraph, line, sentence and word boundaries (in that order).
+<url|label> links, <@mentions> and <#channels> are never split; a code
+block that has to be split is closed at the end of one part and reopened
+at the start of the next.
+"""
+
+import re
+from typing import List, Tuple, Optional
+
+SLACK_MAX_LENGTH = 3900  # Slack's hard limit is 4000; leave room for "📄 Part i/n" headers
+
+PARAGRAPH, LINE, SENTENCE, WORD = 0, 1, 2, 3
+
+FENCE = "```"
+_FENCE_CLOSE = "\n```"
+_MAX_OPENER = 20    # "```haskell" etc.; longer info strings are truncated when reopening
+_MAX_LINK = 1000    # Longest <...> construct we try to keep whole
+
+_LEADING_WHITESPACE = re.compile(r"\s*")
+
+
+def _link_start(text: str, pos: int, cut: int) -> int:
+    """Start of the <...> link/mention that cut falls inside, or -1."""
+    lt = text.rfind("<", max(pos, cut - _MAX_LINK), cut)
+    if lt < 0 or text.find(">", lt, cut) >= 0 or text.find("\n", lt, cut) >= 0:
+        return -1
+    gt = text.find(">", cut, cut + _MAX_LINK)
+    if gt < 0 or text.find("\n", cut, gt) >= 0:
+        return -1
+    return lt
+
+
+def _fence_at(text: str, pos: int, cut: int, opener: Optional[str]) -> Optional[str]:
+    """Fence opener in effect at cut, given the opener in effect at pos (None = outside)."""
+    fences = text.count(FENCE, pos, cut)
+    if fences % 2 == 0:
+        return opener
+    if opener is not None:
+        return None
+    start = text.rfind(FENCE, pos, cut)
+    line_end = text.find("\n", start, cut)
+    return text[start:line_end if line_end >= 0 else cut][:_MAX_OPENER]
+
+
+def _find_break(text: str, pos: int, floor: int, limit: int, priority: int,
+                opener: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Last boundary of the given priority in (floor, limit], as (cut, next part start).
+    Only the current window is searched (with str.rfind), so the total work over
+    all parts stays linear in the length of the text.
+    """
+    end = limit
+    while end > floor:
+        if priority == PARAGRAPH:
+            cut = text.rfind("\n\n", floor, end)
+            resume = _LEADING_WHITESPACE.match(text, cut).end() if cut >= 0 else -1
+        elif priority == LINE:
+            cut = text.rfind("\n", floor, end)
+            resume = cut + 1
+        elif priority == SENTENCE:
+            mark = max(text.rfind(". ", floor, end), text.rfind("! ", floor, end), text.rfind("? ", floor, end))
+            cut = mark + 1 if mark >= 0 else -1
+            resume = cut + 1
+        else:
+            cut = text.rfind(" ", floor, end)
+            resume = cut + 1
+
+        if cut <= floor:
+            return None
+
+        link = _link_start(text, pos, cut)
+        if link >= 0:
+            end = link  # Never break a link or mention; look further back
+            continue
+
+        if priority in (SENTENCE, WORD) and _fence_at(text, pos, cut, opener) is not None:
+            # Inside a code block only line breaks are allowed
+            end = text.rfind(FENCE, floor, cut)
+            if end < 0:
+                return None
+            continue
+
+        return cut, resume
+
+    return None
+
+
+def split_message(text: str, max_length: int = SLACK_MAX_LENGTH) -> List[str]:
+    """Split text into parts of at most max_length characters."""
+    if len(text) <= max_length:
+        return [text]
+
+    parts: List[str] = []
+    pos = 0
+    opener: Optional[str] = None  # Fence opener when pos is inside a code block
+
+    while pos < len(text):
+        reopen = opener + "\n" if opener is not None else ""
+        if len(reopen) + len(text) - pos <= max_length:
+            parts.append(reopen + text[pos:])
+            break
+
+        budget = max_length - len(reopen) - len(_FENCE_CLOSE)
+        limit = pos + budget
+        min_fill = pos + budget // 2
+        found = None
+
+        for priority in (PARAGRAPH, LINE, SENTENCE, WORD):
+            found = _find_break(text, pos, pos if priority == WORD else min_fill, limit, priority, opener)
+            if found:
+                break
+
+        if found:
+            cut, resume = found
+        else:
+            # No usable boundary: hard cut, but never through a link or mention
+            cut = resume = limit
+            link = _link_start(text, pos, cut)
+            if link > pos:
+                cut = resume = link
+            # Don't leave a partial ``` marker on either side of the cut
+            fence = text.rfind(FENCE, max(pos, cut - 2), cut + 2)
+            if pos < fence < cut < fence + len(FENCE):
+                cut = resume = fence
+
+        part = reopen + text[pos:cut]
+        opener_at_cut = _fence_at(text, pos, cut, opener)
+        if opener_at_cut is not None:
+            part += _FENCE_CLOSE
+
+        if part.strip():
+            parts.append(part)
+        opener = opener_at_cut if resume == cut else _fence_at(text, cut, resume, opener_at_cut)
+        pos = resume
+
+    return parts
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate matching in the answer cache: rephrasings hit, while questions
+that differ in their question word or negation miss.
+"""
+
+from answer_cache import AnswerCache
+
+
+def _cache_with(query: str) -> AnswerCache:
+    cache = AnswerCache(max_entries=10, ttl_seconds=60)
+    cache.put(query, {'content': f"answer to {query}"})
+    return cache
+
+
+def test_rephrasings_hit():
+    cache = _cache_with("What is the Chang hard fork?")
+    assert cache.get("what's the chang hard fork") is not None
+    assert cache.get("Explain the Chang hard forks") is not None
+    assert cache.stats['near_hits'] == 2, cache.stats
+
+
+def test_question_words_must_match():
+    cache = _cache_with("What is the Chang hard fork?")
+    assert cache.get("When is the Chang hard fork?") is None
+    assert cache.get("Why is the Chang hard fork?") is None
+
+    cache = _cache_with("How does staking work?")
+    assert cache.get("How does staking works") is not None
+    assert cache.get("Why does staking work?") is None
+
+
+def test_negation_must_match():
+    cache = _cache_with("Is Cardano proof of stake?")
+    assert cache.get("Is Cardano not proof of stake?") is None
+    assert cache.get("Isn't Cardano proof of stake?") is None
+
+    cache = _cache_with("Can I stake without a hardware wallet?")
+    assert cache.get("Can I stake with a hardware wallet?") is None
+    assert cache.get("can i stake without hardware wallets") is not None
+
+
+if __name__ == "__main__":
+    test_rephrasings_hit()
+    test_question_words_must_match()
+    test_negation_must_match()
+    print("✅ Answer cache near-duplicates respect question words and negation")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Start and stop the app with hybrid retrieval over a memory-mapped corpus index
+(no Slack or Genexus credentials needed). Shutdown must unmap the index cleanly.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+TOPICS = [
+    ("plutus", "Plutus V3 smart contracts run on-chain validators written in Haskell and compiled to UPLC."),
+    ("ouroboros", "Ouroboros Praos selects slot leaders by stake and keeps the chain secure without mining."),
+    ("chang", "The Chang hard fork enabled on-chain governance with delegate representatives and votes."),
+]
+
+
+def write_dataset(data_dir: Path):
+    dataset = data_dir / "test-dataset-2025-01-01"
+    dataset.mkdir()
+    for name, sentence in TOPICS:
+        page = {"url": f"https://example.org/{name}", "content": f"# {name.title()}\n\n" + " ".join([sentence] * 5)}
+        (dataset / f"{name}.json").write_text(json.dumps(page), encoding="utf-8")
+
+
+def test_hybrid_mapped_index_lifespan():
+    with tempfile.TemporaryDirectory() as workdir:
+        data_dir = Path(workdir)
+        write_dataset(data_dir)
+
+        from local_retrieval import LocalIndex, find_dataset_dirs
+        from corpus_index import write_corpus_index
+        index_path = str(data_dir / "corpus.idx")
+        write_corpus_index(LocalIndex.from_datasets(find_dataset_dirs(data_dir)), index_path)
+
+        # main reads its settings at import time
+        os.environ.update({
+            "LOCAL_INDEX_PATH": index_path,
+            "LOCAL_RETRIEVAL_MODE": "fallback",
+            "LOCAL_RETRIEVAL_HYBRID": "true",
+            "LOCAL_RETRIEVAL_DATA_DIR": workdir,
+            "FEEDBACK_DB_PATH": str(data_dir / "feedback.db"),
+        })
+        for name in ("SLACK_BOT_TOKEN", "GENEXUS_API_KEY"):
+            os.environ.pop(name, None)
+        sys.modules.pop("main", None)
+        import main
+        from fastapi.testclient import TestClient
+        from corpus_index import MappedIndex
+        from hybrid_retrieval import HybridSearch
+
+        print("🧪 Starting the app with a mapped index")
+        with TestClient(main.app) as client:
+            deadline = time.monotonic() + 30
+            while not isinstance(main.local_index, HybridSearch):
+                assert time.monotonic() < deadline, "hybrid retrieval never came up"
+                time.sleep(0.05)
+            health = client.get("/health").json()
+            assert health["local_index"]["backend"] == "mmap", health
+            assert health["local_index"]["hybrid"] is True, health
+            assert isinstance(main.local_index.index, MappedIndex)
+            hits = main.local_index.search("Chang hard fork governance", k=1)
+            assert hits and hits[0][1].url == "https://example.org/chang", hits
+
+        print("🧪 Stopped the app")  # Leaving the client ran shutdown, which closes the mapped index
+        assert main.local_index.index._mm.closed
+
+    print("\n✅ App starts and stops cleanly with hybrid retrieval on a mapped index")
+
+
+if __name__ == "__main__":
+    test_hybrid_mapped_index_lifespan()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Chunk extracted pages into retrieval-sized passages
+Split markdown by headings, then pack paragraphs up to a token budget with
+overlap. Each passage carries its heading path and a stable content-hash ID,
+and passages are streamed to JSONL one page at a time so large datasets
+never sit fully in memory.
+"""
+
+import json
+import re
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from process_content import ContentProcessor
+
+HEADING = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+FENCE = re.compile(r'^\s*(```|~~~)')
+FENCE_MARKER = re.compile(r'\s*(`{3,}|~{3,})')  # Full marker run, to close a fence with the same length
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(\[*_`])')
+TOKEN = re.compile(r'\w+|[^\w\s]')
+IMAGE = re.compile(r'!\[[^\]]*\]\([^)]*\)')  # Often inline base64 - no retrievable text
+DATA_URI = re.compile(r'data:[\w/+.-]*(?:;[\w=.-]+)*,[\w+/=%-]*')
+BASE64_RUN = re.compile(r'[A-Za-z0-9+/]{200,}={0,2}')  # Unbroken payloads the image pattern missed
+
+
+def estimate_tokens(text: str) -> int:
+    """Word and punctuation count - close to BPE token counts for English prose"""
+    return len(TOKEN.findall(text))
+
+
+def passage_id(url: str, heading_path: List[str], text: str, occurrence: int = 0) -> str:
+    """Stable ID: same page, section and text always hash to the same ID"""
+    normalized = ' '.join(text.split())
+    key = '\x1f'.join([url, ' > '.join(heading_path), normalized] + ([str(occurrence)] if occurrence else []))
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:20]
+
+
+class PassageChunker:
+    """Split markdown documents into heading-scoped, token-budgeted passages"""
+
+    def __init__(self, max_tokens: int = 400, overlap_tokens: int = 50, min_tokens: int = 20):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = min_tokens
+        self.cleaner = ContentProcessor()  # Reuse the pipeline's markdown cleaning
+
+    def iter_sections(self, markdown: str) -> Iterator[Tuple[List[str], List[str]]]:
+        """Yield (heading path, blocks) per section; fenced code is never treated as headings"""
+        path: List[Tuple[int, str]] = []
+        blocks: List[str] = []
+        current: List[str] = []
+        in_fence = False
+
+        def flush_block():
+            if current:
+                block = '\n'.join(current).strip()
+                if block:
+                    blocks.append(block)
+                current.clear()
+
+        for line in markdown.split('\n'):
+            if FENCE.match(line):
+                if not in_fence:
+                    flush_block()
+                current.append(line)
+                in_fence = not in_fence
+                if not in_fence:
+                    flush_block()
+                continue
+
+            if in_fence:
+                current.append(line)
+                continue
+
+            heading = HEADING.match(line)
+            if heading:
+                flush_block()
+                if blocks:
+                    yield [title for _, title in path], blocks
+                    blocks = []
+                level = len(heading.group(1))
+                path = [(lvl, title) for lvl, title in path if lvl < level]
+                path.append((level, heading.group(2).strip()))
+            elif line.strip():
+                current.append(line)
+            else:
+                flush_block()
+
+        flush_block()
+        if blocks:
+            yield [title for _, title in path], blocks
+
+    def split_long_word(self, word: str, max_tokens: Optional[int] = None) -> List[str]:
+        """Cut one unbroken "word" over the budget at token boundaries"""
+        max_tokens = max_tokens or self.max_tokens
+        pieces = []
+        start = count = 0
+        for match in TOKEN.finditer(word):
+            if count == max_tokens:
+                pieces.append(word[start:match.start()])
+                start, count = match.start(), 0
+            count += 1
+        pieces.append(word[start:])
+        return pieces
+
+    def split_words(self, text: str, max_tokens: Optional[int] = None) -> List[str]:
+        """Word windows of at most max_tokens"""
+        max_tokens = max_tokens or self.max_tokens
+        pieces = []
+        window: List[str] = []
+        window_tokens = 0
+        for word in text.split(' '):
+            word_tokens = estimate_tokens(word)
+            parts = [word] if word_tokens <= max_tokens else self.split_long_word(word, max_tokens)
+            for part in parts:
+                part_tokens = word_tokens if len(parts) == 1 else estimate_tokens(part)
+                if window and window_tokens + part_tokens > max_tokens:
+                    pieces.append(' '.join(window))
+                    window, window_tokens = [], 0
+                window.append(part)
+                window_tokens += part_tokens
+        if window:
+            pieces.append(' '.join(window))
+        return pieces
+
+    def split_oversized(self, block: str) -> List[str]:
+        """
+        Break a block that exceeds the budget into sentences, then word windows; fenced
+        code is cut between lines into pieces that are each a balanced fence of their own
+        """
+        if estimate_tokens(block) <= self.max_tokens:
+            return [block]
+
+        if FENCE.match(block):
+            # Code keeps its line breaks: whole lines are grouped back up to the budget, and
+            # every piece is closed and reopened with the original fence (info string included)
+            lines = block.split('\n')
+            opener = lines[0]
+            closed = len(lines) > 1 and FENCE.match(lines[-1])
+            closer = lines.pop() if closed else FENCE_MARKER.match(opener).group(0)
+            budget = self.max_tokens - estimate_tokens(opener) - estimate_tokens(closer)
+            if budget < 1:  # Not even one token of code fits between the fences
+                return self.split_words(block)
+
+            bodies = []
+            body: List[str] = []
+            size = 0
+            for line in lines[1:]:
+                for part in [line] if estimate_tokens(line) <= budget else self.split_words(line, budget):
+                    tokens = estimate_tokens(part)
+                    if body and size + tokens > budget:
+                        bodies.append(body)
+                        body, size = [], 0
+                    body.append(part)
+                    size += tokens
+            if body:
+                bodies.append(body)
+            return ['\n'.join([opener, *body, closer]) for body in bodies]
+
+        pieces = []
+        for sentence in SENTENCE_END.split(block):
+            if estimate_tokens(sentence) <= self.max_tokens:
+                pieces.append(sentence)
+            else:
+                pieces.extend(self.split_words(sentence))
+        return pieces
+
+    def pack(self, blocks: List[str]) -> Iterator[str]:
+        """Pack blocks into passages of at most max_tokens, repeating trailing context as overlap"""
+        units = [(piece, estimate_tokens(piece)) for block in blocks for piece in self.split_oversized(block)]
+        passage: List[Tuple[str, int]] = []
+        size = 0
+        fresh = 0  # Units in the passage that were not carried over as overlap
+
+        for unit, tokens in units:
+            if passage and size + tokens > self.max_tokens:
+                yield '\n\n'.join(text for text, _ in passage)
+                # Carry trailing units (up to overlap_tokens) into the next passage
+                carried: List[Tuple[str, int]] = []
+                carried_size = 0
+                for text, unit_tokens in reversed(passage):
+                    if carried_size + unit_tokens > self.overlap_tokens or carried_size + unit_tokens + tokens > self.max_tokens:
+                        break
+                    carried.insert(0, (text, unit_tokens))
+                    carried_size += unit_tokens
+                passage, size, fresh = carried, carried_size, 0
+            passage.append((unit, tokens))
+            size += tokens
+            fresh += 1
+
+        if passage and fresh:
+            yield '\n\n'.join(text for text, _ in passage)
+
+    def chunk_document(self, url: str, title: str, markdown: str) -> Iterator[Dict]:
+        """Yield passage records for one page"""
+        markdown = BASE64_RUN.sub('', DATA_URI.sub('', IMAGE.sub('', markdown)))
+        content = self.cleaner.clean_markdown_content(markdown)
+        position = 0
+        seen: Dict[str, int] = {}  # Repeated identical passages on one page get distinct IDs
+        for heading_path, blocks in self.iter_sections(content):
+            if not heading_path and title:
+                heading_path = [title]
+            for text in self.pack(blocks):
+                tokens = estimate_tokens(text)
+                if tokens < self.min_tokens:
+                    continue
+                base_id = passage_id(url, heading_path, text)
+                occurrence = seen.get(base_id, 0)
+                seen[base_id] = occurrence + 1
+                yield {
+                    "id": passage_id(url, heading_path, text, occurrence) if occurrence else base_id,
+                    "url": url,
+                    "title": title or (heading_path[0] if heading_path else url),
+                    "heading_path": heading_path,
+                    "position": position,
+                    "token_estimate": tokens,
+                    "text": text
+                }
+                position += 1
+
+
+def load_document(filepath: Path) -> Optional[Tuple[str, str, str]]:
+    """(url, title, markdown) from a raw extraction or a *-dataset-* page file"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        return None
+
+    # Firecrawl raw extraction (1-extraction/raw_extractions)
+    if isinstance(data.get('content'), dict):
+        url = data.get('url_info', {}).get('final_url', '')
+        title = data.get('metadata', {}).get('title', '')
+        return url, title, data['content'].get('markdown', '')
+
+    # Tavily dataset page ({"url", "content", ...})
+    if data.get('url') and isinstance(data.get('content'), str):
+        return data['url'], data.get('title', ''), data['content']
+
+    return None
+
+
+def main():
+    """Main execution function"""
+    base = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Chunk extracted pages into JSONL passages")
+    parser.add_argument("--input-dir", default=str(base.parent / "1-extraction" / "raw_extractions"),
+                        help="Raw extractions or a *-dataset-* folder")
+    parser.add_argument("--output", default=str(base / "processed_content" / "passages.jsonl"))
+    parser.add_argument("--max-tokens", type=int, default=400)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--min-tokens", type=int, default=20)
+    args = parser.parse_args()
+
+    chunker = PassageChunker(args.max_tokens, args.overlap, args.min_tokens)
+    input_dir = Path(args.input_dir)
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    print("✂️  Chunking Content into Passages")
+    print("=" * 50)
+    print(f"📁 Input: {input_dir}")
+    print(f"🎯 Budget: {args.max_tokens} tokens, {args.overlap} overlap")
+
+    documents = passages = skipped = 0
+    tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        for filepath in sorted(input_dir.glob("*.json")):
+            if filepath.name.startswith('extraction_summary'):
+                continue
+            try:
+                document = load_document(filepath)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"❌ Error reading {filepath.name}: {e}")
+                skipped += 1
+                continue
+            if not document:
+                skipped += 1
+                continue
+
+            url, title, markdown = document
+            count = 0
+            for record in chunker.chunk_document(url, title, markdown):
+                record["source_file"] = filepath.name
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                count += 1
+            documents += 1
+            passages += count
+            print(f"✅ {filepath.name}: {count} passages")
+    tmp_path.replace(output_path)
+
+    print(f"\n🎯 Chunking Complete!")
+    print(f"📄 Documents: {documents} (skipped {skipped})")
+    print(f"🧩 Passages: {passages}")
+    print(f"📁 Output: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Async Extraction Engine
+Runs extraction requests concurrently under a shared token bucket sized to the
+provider's quota. The existing blocking request functions (Firecrawl scrape,
+Tavily extract) run in worker threads, so their parsing and error semantics
+are unchanged. A 429 pauses the whole bucket for Retry-After and halves the
+request rate; the rate creeps back up as requests succeed again. Request
+functions take a token only when they actually call the API, so cache hits
+run at full speed and never count toward the rate budget.
+"""
+
+import time
+import random
+import asyncio
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class RateLimitError(Exception):
+    """Provider answered 429; retry_after is in seconds when the response said so"""
+
+    def __init__(self, message: str = "Rate limited by API", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header as seconds (delta-seconds or HTTP date form)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit(error: Exception) -> bool:
+    """RateLimitError, or an SDK error that reads like one (same check the serial extractors use)"""
+    if isinstance(error, RateLimitError):
+        return True
+    message = f"{type(error).__name__} {error}".lower()
+    return "429" in message or "rate limit" in message or "usagelimit" in message
+
+
+class TokenBucket:
+    """Async token bucket with additive-increase / multiplicative-decrease on 429s"""
+
+    def __init__(self, rate: float, burst: int, min_rate: Optional[float] = None, recover_after: int = 10):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate or rate / 8
+        self.burst = burst
+        self.recover_after = recover_after
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._successes = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if now <= self._updated:  # Still inside a Retry-After pause
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def block(self, seconds: float):
+        """Pause the bucket after a 429 and halve the rate, leaving a single token for the retry"""
+        self._refill(time.monotonic())
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = min(self._tokens, 1.0)
+        self._updated = self._blocked_until
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._successes = 0
+
+    def success(self):
+        """Step the rate back toward the configured quota after a run of successes"""
+        self._successes += 1
+        if self._successes >= self.recover_after and self.rate < self.max_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+            self._successes = 0
+
+
+class AsyncExtractionEngine:
+    """Bounded-concurrency runner for blocking extraction requests under one rate budget"""
+
+    def __init__(self, request_fn: Callable[[Any, Callable[[], None]], Any], requests_per_minute: float,
+                 concurrency: int = 4, burst: Optional[int] = None, max_retries: int = 3, base_delay: float = 5, max_delay: float = 60):
+        self.request_fn = request_fn
+        self.bucket = TokenBucket(requests_per_minute / 60, burst or concurrency)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.stats = {
+            'requests': 0,
+            'cached': 0,
+            'successful': 0,
+            'failed': 0,
+            'retries': 0,
+            'rate_limited': 0,
+            'timeouts': 0,
+            'started_at': None,
+            'finished_at': None
+        }
+
+    async def _attempt(self, item: Any) -> Any:
+        """
+        One request with retries; rate limits do not use up the retry budget.
+        request_fn(item, throttle) calls throttle() right before it goes to the
+        network, so responses served from a cache neither wait for nor spend a token.
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        rate_limits = 0
+        while True:
+            throttled = False
+
+            def throttle():
+                nonlocal throttled
+                asyncio.run_coroutine_threadsafe(self.bucket.acquire(), loop).result()
+                throttled = True
+
+            try:
+                result = await asyncio.to_thread(self.request_fn, item, throttle)
+                if throttled:
+                    self.stats['requests'] += 1
+                    self.bucket.success()
+                else:
+                    self.stats['cached'] += 1
+                return result
+            except Exception as e:
+                self.stats['requests'] += throttled
+                if is_rate_limit(e) and rate_limits < self.max_retries * 3:
+                    rate_limits += 1
+                    self.stats['rate_limited'] += 1
+                    delay = getattr(e, 'retry_after', None)
+                    if delay is None:
+                        delay = min(self.base_delay * (2 ** rate_limits), self.max_delay)
+                    self.bucket.block(delay)
+                    print(f"🚦 Rate limited - pausing all requests for {delay:.1f}s "
+                          f"(rate now {self.bucket.rate * 60:.0f}/min)")
+                    continue
+
+                if "timeout" in str(e).lower() or "timed out" in str(e).lower():
+                    self.stats['timeouts'] += 1
+                attempt += 1
+                if attempt >= self.max_retries:
+                    raise
+                self.stats['retries'] += 1
+                delay = min(self.base_delay * (2 ** attempt), self.max_delay) * random.uniform(0.5, 1.5)
+                print(f"🔄 Retry {attempt + 1}/{self.max_retries} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+    async def run(self, items: Iterable[Any],
+                  on_result: Optional[Callable[[Any, Any, Optional[Exception]], None]] = None) -> List:
+        """
+        Process every item; on_result(item, result, error) runs on the event loop
+        as each request finishes, so callbacks can write files and progress without locks.
+        """
+        self.stats['started_at'] = datetime.now().isoformat()
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+        outcomes = []
+
+        async def worker():
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    result, error = await self._attempt(item), None
+                    self.stats['successful'] += 1
+                except Exception as e:
+                    result, error = None, e
+                    self.stats['failed'] += 1
+                    print(f"💥 All retries exhausted: {e}")
+                outcomes.append((item, result, error))
+                if on_result:
+                    on_result(item, result, error)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, self.concurrency))))
+        self.stats['finished_at'] = datetime.now().isoformat()
+        return outcomes
+
+    def run_sync(self, items: Iterable[Any],
+                 on_result: Optional[Callable[[Any, Any, Optional[Exception]], None]] = None) -> List:
+        """Entry point for the synchronous extractor scripts"""
+        return asyncio.run(self.run(items, on_result))
+
+    def summary(self) -> Dict:
+        return {**self.stats, 'final_rate_per_minute': round(self.bucket.rate * 60, 1)}
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: TavilyContentProcessor._clean_raw_content vs. the old per-pattern loop
+Usage: python benchmark_content_cleaning.py [--dataset ../essential-cardano-dataset-2025-09-19]
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from typing import List
+
+from tavily_content_processor import TavilyContentProcessor
+
+
+def legacy_clean(noise_patterns: List[str], raw_content: str) -> str:
+    """The loop _clean_raw_content used before the patterns were precompiled"""
+    cleaned = raw_content
+
+    for pattern in noise_patterns:
+        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE | re.DOTALL)
+
+    cleaned = re.sub(r'\n\s*\n\s*\n+', '\n\n', cleaned)
+    cleaned = re.sub(r'[ \t]+', ' ', cleaned)
+
+    lines = cleaned.split('\n')
+    filtered_lines = []
+
+    for line in lines:
+        line = line.strip()
+        if (line.startswith('[') and line.endswith(']') and
+            any(nav in line.lower() for nav in ['all', 'articles', 'videos', 'faqs', 'infographics'])):
+            continue
+        if re.match(r'^\d+\s+Results?$', line) or 'Refine by:' in line or 'Sort by:' in line:
+            continue
+        if line:
+            filtered_lines.append(line)
+
+    return '\n'.join(filtered_lines)
+
+
+def load_documents(dataset_dir: Path) -> List[str]:
+    documents = []
+    for path in sorted(dataset_dir.glob("*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and data.get('content'):
+            documents.append(data['content'])
+    return documents
+
+
+def bench(func, documents: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            func(document)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Tavily raw-content cleaning")
+    parser.add_argument("--dataset", type=Path, default=Path("../essential-cardano-dataset-2025-09-19"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = load_documents(args.dataset)
+    if not documents:
+        print(f"❌ No documents with content found in {args.dataset}")
+        return
+    total_mb = sum(len(document.encode('utf-8')) for document in documents) / 1e6
+    print(f"📂 {len(documents)} documents, {total_mb:.1f} MB from {args.dataset}")
+
+    processor = TavilyContentProcessor()
+    mismatches = sum(
+        1 for document in documents
+        if processor._clean_raw_content(document) != legacy_clean(processor.noise_patterns, document)
+    )
+    print(f"{'✅' if not mismatches else '❌'} Output identical on {len(documents) - mismatches}/{len(documents)} documents")
+
+    print(f"{'impl':>10} {'best s':>8} {'MB/s':>8}")
+    results = {}
+    for name, func in (("legacy", lambda d: legacy_clean(processor.noise_patterns, d)),
+                       ("compiled", processor._clean_raw_content)):
+        seconds = bench(func, documents, args.repeat)
+        results[name] = seconds
+        print(f"{name:>10} {seconds:>8.3f} {total_mb / seconds:>8.1f}")
+    print(f"🚀 Speedup: {results['legacy'] / results['compiled']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
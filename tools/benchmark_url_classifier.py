@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled URLClassifier vs. the old per-pattern re.search loops
+Usage: python benchmark_url_classifier.py [--urls 1000000] [--site iog_blog]
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import List, Tuple
+from urllib.parse import urlparse
+
+from site_profiles import SITE_PROFILES, SiteProfile
+
+PATH_SEGMENTS = [
+    "faq", "glossary", "article", "development-update", "developer", "guide", "video", "infographic",
+    "podcast", "about-cardano", "smart-contracts", "native-tokens", "plutus", "governance", "docs",
+    "get-started", "integrate-cardano", "blog", "posts", "research", "tools", "showcase", "tag",
+    "category", "search", "api", "admin", "profile", "page", "author", "jp", "Stake-Pool-Course",
+]
+
+
+def legacy_classify(profile: SiteProfile, url: str) -> Tuple[str, bool]:
+    """The _categorize_url + filter_urls_for_extraction loops the sitemap parsers used"""
+    path = urlparse(url).path.lower()
+    content_type = "other"
+    for category, pattern in profile.content_patterns.items():
+        if category != "other" and re.search(pattern, path):
+            content_type = category
+            break
+
+    if profile.included_types is not None and content_type not in profile.included_types:
+        return content_type, False
+    for pattern in profile.excluded_patterns:
+        if re.search(pattern, url, re.IGNORECASE):
+            return content_type, False
+    return content_type, True
+
+
+def build_urls(profile: SiteProfile, count: int, seed: int = 42) -> List[str]:
+    """Synthetic URLs on the site's host: category paths, excluded paths, dated posts and noise"""
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(count):
+        segments = [rng.choice(PATH_SEGMENTS) for _ in range(rng.randint(1, 4))]
+        if rng.random() < 0.2:
+            segments[-1:-1] = [f"{rng.randint(2015, 2025)}", f"{rng.randint(1, 12):02d}", f"{rng.randint(1, 28):02d}"]
+        if rng.random() < 0.1:
+            segments.append(f"page-{rng.randint(1, 40)}")
+        slug = f"post-{rng.randint(0, 10**6)}" + rng.choice(["", "", ".json", ".xml", "/"])
+        suffix = rng.choice(["", "", "", "?ref=home", "#section", "/#top"])
+        urls.append(f"https://{profile.source_site}/{'/'.join(segments)}/{slug}{suffix}")
+    return urls
+
+
+def bench(func, urls: List[str]) -> Tuple[float, list]:
+    start = time.perf_counter()
+    results = [func(url) for url in urls]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sitemap URL classification")
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    parser.add_argument("--site", choices=sorted(SITE_PROFILES), action="append",
+                        help="Profiles to benchmark (default: all)")
+    args = parser.parse_args()
+
+    print(f"{'site':>18} {'impl':>9} {'seconds':>8} {'URLs/s':>10} {'accepted':>9}")
+    for name in args.site or sorted(SITE_PROFILES):
+        profile = SITE_PROFILES[name]
+        urls = build_urls(profile, args.urls)
+
+        legacy_seconds, legacy_results = bench(lambda url: legacy_classify(profile, url), urls)
+        compiled_seconds, compiled_results = bench(profile.classifier.classify, urls)
+
+        for impl, seconds, results in (("legacy", legacy_seconds, legacy_results),
+                                       ("compiled", compiled_seconds, compiled_results)):
+            accepted = sum(1 for _, keep in results if keep)
+            print(f"{name:>18} {impl:>9} {seconds:>8.2f} {len(urls) / seconds:>10,.0f} {accepted:>9,}")
+
+        mismatches = sum(1 for a, b in zip(legacy_results, compiled_results) if a != b)
+        print(f"{'':>18} {'✅' if not mismatches else '❌'} {mismatches} mismatches, "
+              f"speedup {legacy_seconds / compiled_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,88 +4,32 @@ Cardano Documentation Sitemap Parser
 Systematically extracts all URLs from the Cardano documentation sitemap for comprehensive content extraction
 """
 
-import requests
-import xml.etree.ElementTree as ET
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Set
-from urllib.parse import urlparse
-import re
+from typing import Dict, List, Set
+
+from site_profiles import CARDANO_DOCS
+from sitemap_snapshot import SitemapSnapshot, save_sitemap_diff
+from sitemap_stream import SitemapStreamReader, read_site_urls
 
 class CardanoDocsSitemapParser:
     """Parser for Cardano documentation sitemap to get comprehensive URL list"""
 
     def __init__(self):
-        self.sitemap_url = "https://docs.cardano.org/sitemap.xml"
+        self.sitemap_url = CARDANO_DOCS.sitemap_url
         self.output_dir = Path("comprehensive_extraction")
         self.output_dir.mkdir(exist_ok=True)
+        self.snapshot = SitemapSnapshot(self.output_dir / f"{CARDANO_DOCS.name}_sitemap_snapshot.json")
+        self.reader = SitemapStreamReader(snapshot=self.snapshot)
 
         # Content type patterns based on URL structure for docs.cardano.org
-        self.content_patterns = {
-            "about_cardano": r"/about-cardano",
-            "developer_resources": r"/(smart-contracts|native-tokens|transaction-tutorials|scalability|release-notes)",
-            "stake_pool_operators": r"/stake-pool-course",
-            "testnets": r"/cardano-testnets",
-            "new_to_blockchain": r"/new-to-blockchain",
-            "governance": r"/governance",
-            "technical": r"/(plutus|marlowe|aiken|hydra|mithril)",
-            "other": r".*"  # catchall
-        }
-
-    def fetch_sitemap(self) -> str:
-        """Fetch the sitemap XML content"""
-        try:
-            print(f"Fetching sitemap from {self.sitemap_url}")
-            response = requests.get(self.sitemap_url, timeout=30)
-            response.raise_for_status()
-            print(f"✅ Successfully fetched sitemap ({len(response.content)} bytes)")
-            return response.content
-        except Exception as e:
-            print(f"❌ Error fetching sitemap: {e}")
-            raise
-
-    def parse_sitemap_xml(self, xml_content: str) -> List[Dict]:
-        """Parse XML sitemap and extract URL information"""
-        try:
-            root = ET.fromstring(xml_content)
-
-            # Handle namespace
-            namespace = {'sitemap': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-
-            urls = []
-            for url_element in root.findall('sitemap:url', namespace):
-                loc = url_element.find('sitemap:loc', namespace)
-                lastmod = url_element.find('sitemap:lastmod', namespace)
-                changefreq = url_element.find('sitemap:changefreq', namespace)
-                priority = url_element.find('sitemap:priority', namespace)
-
-                if loc is not None:
-                    url_info = {
-                        'url': loc.text,
-                        'lastmod': lastmod.text if lastmod is not None else None,
-                        'changefreq': changefreq.text if changefreq is not None else None,
-                        'priority': priority.text if priority is not None else None,
-                        'content_type': self._categorize_url(loc.text)
-                    }
-                    urls.append(url_info)
-
-            print(f"✅ Parsed {len(urls)} URLs from sitemap")
-            return urls
-
-        except Exception as e:
-            print(f"❌ Error parsing sitemap XML: {e}")
-            raise
+        self.content_patterns = CARDANO_DOCS.content_patterns
+        self.classifier = CARDANO_DOCS.classifier
 
     def _categorize_url(self, url: str) -> str:
         """Categorize URL based on path patterns"""
-        path = urlparse(url).path.lower()
-
-        for category, pattern in self.content_patterns.items():
-            if category != "other" and re.search(pattern, path):
-                return category
-
-        return "other"
+        return self.classifier.category(url)
 
     def analyze_urls(self, urls: List[Dict]) -> Dict:
         """Analyze URL distribution and provide statistics"""
@@ -122,33 +66,7 @@ class CardanoDocsSitemapParser:
 
     def filter_urls_for_extraction(self, urls: List[Dict]) -> List[Dict]:
         """Filter URLs to exclude non-content pages"""
-        excluded_patterns = [
-            r'/api',
-            r'/admin',
-            r'\.xml$',
-            r'\.json$',
-            r'/search',
-            r'/404',
-            r'/#'  # Hash anchors
-        ]
-
-        filtered_urls = []
-        excluded_count = 0
-
-        for url_info in urls:
-            url = url_info['url']
-
-            # Check if URL should be excluded
-            should_exclude = False
-            for pattern in excluded_patterns:
-                if re.search(pattern, url, re.IGNORECASE):
-                    should_exclude = True
-                    break
-
-            if not should_exclude:
-                filtered_urls.append(url_info)
-            else:
-                excluded_count += 1
+        filtered_urls, excluded_count = self.classifier.filter(urls)
 
         print(f"✅ Filtered URLs: {len(filtered_urls)} included, {excluded_count} excluded")
         return filtered_urls
@@ -215,9 +133,8 @@ class CardanoDocsSitemapParser:
         """Run complete sitemap analysis and prepare for extraction"""
         print("🚀 Starting Cardano Documentation Sitemap Analysis")
 
-        # Fetch and parse sitemap
-        xml_content = self.fetch_sitemap()
-        all_urls = self.parse_sitemap_xml(xml_content)
+        # Stream and parse sitemap
+        all_urls = read_site_urls(self.reader, self.sitemap_url, self.classifier)
 
         # Analyze all URLs
         all_stats = self.analyze_urls(all_urls)
@@ -236,6 +153,8 @@ class CardanoDocsSitemapParser:
 
         # Save URLs for extraction
         urls_file = self.save_urls(filtered_urls)
+        diff_file = save_sitemap_diff(self.snapshot, filtered_urls, self.classifier,
+                                      self.output_dir, CARDANO_DOCS.name, self.sitemap_url)
 
         # Create extraction batches (smaller for technical docs)
         batches = self.create_extraction_batches(filtered_urls, batch_size=15)
@@ -265,12 +184,15 @@ class CardanoDocsSitemapParser:
 
         print(f"\n🎯 READY FOR EXTRACTION:")
         print(f"  URLs file: {urls_file}")
+        if diff_file:
+            print(f"  Diff file: {diff_file} (extract with --incremental --urls-file)")
         print(f"  Batch file: {batch_file}")
         print(f"  Total URLs: {len(filtered_urls)}")
         print(f"  Batches: {len(batches)} (batch size: 15 for technical content)")
 
         return {
             'urls_file': urls_file,
+            'diff_file': diff_file,
             'batch_file': batch_file,
             'total_urls': len(filtered_urls),
             'batches': len(batches),
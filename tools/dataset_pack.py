@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Packed Dataset Format
+Stores a per-URL dataset folder (url / content / images / extraction_metadata
+JSON files) as a few compressed JSONL shards plus a URL index. Each shard is
+a run of independent gzip members holding ~256 KB of records apiece, so it
+still reads as one .jsonl.gz stream for sequential scans (zcat, gzip.open),
+while the index points at a single member for random access by URL. Export
+writes the original per-file layout back out for Globant upload.
+
+Usage:
+  python dataset_pack.py pack ../essential-cardano-dataset-2025-09-19
+  python dataset_pack.py get ../essential-cardano-dataset-2025-09-19.pack https://www.essentialcardano.io/faq
+  python dataset_pack.py export ../essential-cardano-dataset-2025-09-19.pack /tmp/essential-cardano
+  python dataset_pack.py scan ../essential-cardano-dataset-2025-09-19
+"""
+
+import sys
+import gzip
+import json
+import time
+import zlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+PACK_VERSION = 1
+INDEX_FILE = "index.json"
+DEFAULT_SHARD_MB = 64
+DEFAULT_BLOCK_KB = 256
+
+
+def iter_dataset_files(dataset_dir: Path) -> Iterator[Tuple[str, Dict]]:
+    """(relative filename, record) for every page file, in a stable order"""
+    for path in sorted(dataset_dir.rglob("*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        if isinstance(record, dict) and record.get('url'):
+            yield path.relative_to(dataset_dir).as_posix(), record
+
+
+class _ShardWriter:
+    """Appends gzip-member blocks to numbered shard files"""
+
+    def __init__(self, pack_dir: Path, shard_bytes: int):
+        self.pack_dir = pack_dir
+        self.shard_bytes = shard_bytes
+        self.shards: List[str] = []
+        self._file: Optional[BinaryIO] = None
+
+    def write_block(self, data: bytes) -> Tuple[int, int, int]:
+        """Compress one block; returns (shard number, offset, compressed length)"""
+        if self._file is None or self._file.tell() >= self.shard_bytes:
+            self.close()
+            name = f"shard-{len(self.shards):05d}.jsonl.gz"
+            self.shards.append(name)
+            self._file = open(self.pack_dir / name, 'wb')
+        member = gzip.compress(data, compresslevel=6, mtime=0)
+        offset = self._file.tell()
+        self._file.write(member)
+        return len(self.shards) - 1, offset, len(member)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def pack_dataset(dataset_dir: Path, pack_dir: Path, shard_mb: int = DEFAULT_SHARD_MB,
+                 block_kb: int = DEFAULT_BLOCK_KB) -> Dict:
+    """Pack a dataset folder; non-JSON files (README.md) are kept verbatim in the index"""
+    dataset_dir, pack_dir = Path(dataset_dir), Path(pack_dir)
+    pack_dir.mkdir(parents=True, exist_ok=True)
+    writer = _ShardWriter(pack_dir, shard_mb * 1024 * 1024)
+    block_bytes = block_kb * 1024
+
+    entries = []  # [url, filename, shard, offset, length, line]
+    pending: List[Tuple[str, str]] = []  # (url, filename) of the lines in the open block
+    lines: List[bytes] = []
+    size = 0
+
+    def flush():
+        nonlocal lines, pending, size
+        if not lines:
+            return
+        shard, offset, length = writer.write_block(b''.join(lines))
+        for line_number, (url, filename) in enumerate(pending):
+            entries.append([url, filename, shard, offset, length, line_number])
+        lines, pending, size = [], [], 0
+
+    for filename, record in iter_dataset_files(dataset_dir):
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        lines.append(line)
+        pending.append((record['url'], filename))
+        size += len(line)
+        if size >= block_bytes:
+            flush()
+    flush()
+    writer.close()
+
+    extras = {}
+    for path in sorted(dataset_dir.rglob("*")):
+        if path.is_file() and path.suffix != '.json':
+            try:
+                extras[path.relative_to(dataset_dir).as_posix()] = path.read_text(encoding='utf-8')
+            except UnicodeDecodeError:
+                print(f"⚠️ Skipping binary file {path}")
+
+    index = {
+        'version': PACK_VERSION,
+        'source': dataset_dir.name,
+        'packed_at': datetime.now().isoformat(),
+        'records': len(entries),
+        'shards': writer.shards,
+        'extras': extras,
+        'entries': entries
+    }
+    tmp_path = pack_dir / (INDEX_FILE + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    tmp_path.replace(pack_dir / INDEX_FILE)
+
+    packed_bytes = sum((pack_dir / shard).stat().st_size for shard in writer.shards)
+    return {'records': len(entries), 'shards': len(writer.shards), 'packed_bytes': packed_bytes}
+
+
+class PackedDataset:
+    """Read side of a pack: random access by URL, sequential scans and export"""
+
+    def __init__(self, pack_dir: Path):
+        self.pack_dir = Path(pack_dir)
+        with open(self.pack_dir / INDEX_FILE, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != PACK_VERSION:
+            raise ValueError(f"Unsupported pack version {index.get('version')} in {self.pack_dir}")
+        self.source = index['source']
+        self.shards = index['shards']
+        self.extras: Dict[str, str] = index['extras']
+        self.entries = index['entries']
+        self.by_url = {entry[0]: entry for entry in self.entries}
+        self._files: Dict[int, BinaryIO] = {}
+        self._block_key = None
+        self._block_lines: List[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.by_url
+
+    def urls(self) -> List[str]:
+        return [entry[0] for entry in self.entries]
+
+    def _read_block(self, shard: int, offset: int, length: int) -> List[bytes]:
+        key = (shard, offset)
+        if key != self._block_key:  # Neighbouring lookups usually hit the same block
+            if shard not in self._files:
+                self._files[shard] = open(self.pack_dir / self.shards[shard], 'rb')
+            shard_file = self._files[shard]
+            shard_file.seek(offset)
+            data = zlib.decompress(shard_file.read(length), wbits=31)
+            self._block_key, self._block_lines = key, data.splitlines()
+        return self._block_lines
+
+    def get(self, url: str) -> Optional[Dict]:
+        """One record by URL, decompressing only the block that holds it"""
+        entry = self.by_url.get(url)
+        if entry is None:
+            return None
+        _, _, shard, offset, length, line = entry
+        return json.loads(self._read_block(shard, offset, length)[line])
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Sequential scan of every record, shard by shard"""
+        for _, record in self.iter_files():
+            yield record
+
+    def iter_files(self) -> Iterator[Tuple[str, Dict]]:
+        """(original filename, record) in pack order, one decompressed block at a time"""
+        block_key, lines = None, []
+        for _, filename, shard, offset, length, line in self.entries:
+            if (shard, offset) != block_key:
+                block_key = (shard, offset)
+                lines = self._read_block(shard, offset, length)
+            yield filename, json.loads(lines[line])
+
+    def export(self, output_dir: Path) -> int:
+        """Write the per-file layout back out (indented JSON per URL, plus README and other extras)"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        count = 0
+        for filename, record in self.iter_files():
+            path = output_dir / filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, indent=2, ensure_ascii=False)
+            count += 1
+        for filename, text in self.extras.items():
+            path = output_dir / filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding='utf-8')
+        return count
+
+    def close(self):
+        for shard_file in self._files.values():
+            shard_file.close()
+        self._files.clear()
+
+
+def scan_benchmark(dataset_dir: Path, pack_dir: Path):
+    """Time a full scan of the folder vs. the pack, and random lookups by URL"""
+    start = time.perf_counter()
+    folder_chars = sum(len(record['content']) for _, record in iter_dataset_files(dataset_dir))
+    folder_seconds = time.perf_counter() - start
+
+    dataset = PackedDataset(pack_dir)
+    start = time.perf_counter()
+    pack_chars = sum(len(record['content']) for record in dataset)
+    pack_seconds = time.perf_counter() - start
+
+    urls = dataset.urls()[::-1]  # Reverse order defeats the one-block cache
+    start = time.perf_counter()
+    for url in urls:
+        dataset.get(url)
+    lookup_ms = (time.perf_counter() - start) / max(len(urls), 1) * 1000
+    dataset.close()
+
+    print(f"📂 Folder scan: {folder_seconds:.3f}s ({len(urls)} files, {folder_chars:,} chars)")
+    print(f"📦 Pack scan:   {pack_seconds:.3f}s ({pack_chars:,} chars) - {folder_seconds / pack_seconds:.1f}x")
+    print(f"🔎 Random get:  {lookup_ms:.3f} ms per URL")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack, query and export per-URL datasets")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack = commands.add_parser("pack", help="Pack a dataset folder")
+    pack.add_argument("dataset_dir", type=Path)
+    pack.add_argument("--output", type=Path, help="Pack folder (default: <dataset_dir>.pack)")
+    pack.add_argument("--shard-mb", type=int, default=DEFAULT_SHARD_MB)
+    pack.add_argument("--block-kb", type=int, default=DEFAULT_BLOCK_KB)
+
+    get = commands.add_parser("get", help="Print one record by URL")
+    get.add_argument("pack_dir", type=Path)
+    get.add_argument("url")
+
+    export = commands.add_parser("export", help="Write a pack back out as per-URL files")
+    export.add_argument("pack_dir", type=Path)
+    export.add_argument("output_dir", type=Path)
+
+    scan = commands.add_parser("scan", help="Compare full-scan and lookup speed of a folder and its pack")
+    scan.add_argument("dataset_dir", type=Path)
+    scan.add_argument("--pack", type=Path, help="Pack folder (default: <dataset_dir>.pack)")
+
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        output = args.output or args.dataset_dir.with_name(args.dataset_dir.name + ".pack")
+        start = time.perf_counter()
+        stats = pack_dataset(args.dataset_dir, output, args.shard_mb, args.block_kb)
+        print(f"✅ Packed {stats['records']} records into {stats['shards']} shard(s), "
+              f"{stats['packed_bytes'] / 1e6:.1f} MB, in {time.perf_counter() - start:.1f}s -> {output}")
+    elif args.command == "get":
+        dataset = PackedDataset(args.pack_dir)
+        record = dataset.get(args.url)
+        dataset.close()
+        if record is None:
+            print(f"❌ {args.url} is not in {args.pack_dir}")
+            sys.exit(1)
+        print(json.dumps(record, indent=2, ensure_ascii=False))
+    elif args.command == "export":
+        count = PackedDataset(args.pack_dir).export(args.output_dir)
+        print(f"✅ Exported {count} files to {args.output_dir}")
+    elif args.command == "scan":
+        pack_dir = args.pack or args.dataset_dir.with_name(args.dataset_dir.name + ".pack")
+        if not (pack_dir / INDEX_FILE).exists():
+            pack_dataset(args.dataset_dir, pack_dir)
+        scan_benchmark(args.dataset_dir, pack_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Extraction Manifest for Incremental Re-extraction
+Remembers, per URL, the sitemap lastmod, HTTP validators (ETag / Last-Modified)
+and a hash of the extracted content. A refresh run plans against the manifest
+so only new or changed pages are sent to Firecrawl/Tavily, and writes the pages
+whose content really changed to a delta folder for re-upload.
+"""
+
+import json
+import hashlib
+import requests
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from simple_batch_splitter import url_to_filename
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(content: str) -> str:
+    """Hash of the page text with whitespace normalized, so reflowed output is not a change"""
+    return hashlib.sha256(' '.join(content.split()).encode('utf-8')).hexdigest()
+
+
+def load_url_list(urls_file: str) -> Tuple[List[Dict], Optional[List[str]]]:
+    """URL records from a sitemap parser file, plus its explicit removals when it is a sitemap diff"""
+    with open(urls_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('urls', []), data.get('removed')
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """ISO 8601 (sitemap lastmod, our own timestamps) or HTTP date as naive UTC; None if unparseable"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def extracted_since(extracted_at: Optional[str], modified_at: Optional[str]) -> bool:
+    """True only when an extraction is known to postdate the page's last modification"""
+    extracted, modified = parse_timestamp(extracted_at), parse_timestamp(modified_at)
+    return extracted is not None and modified is not None and extracted >= modified
+
+
+def iter_existing_pages(sources: Iterable[Path]) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    (url, content, extracted_at) from earlier output: *-dataset-* page files,
+    saved Firecrawl pages and raw Tavily batch dumps, searched recursively
+    """
+    for source in sources:
+        source = Path(source)
+        if not source.is_dir():
+            continue
+        for path in sorted(source.rglob("*.json")):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            if not isinstance(data, dict):
+                continue
+
+            response = data.get('response')
+            if isinstance(response, dict):  # Raw Tavily batch dump
+                for result in response.get('results', []):
+                    if isinstance(result, dict) and result.get('url') and result.get('raw_content'):
+                        yield result['url'], result['raw_content'], data.get('timestamp')
+            elif data.get('url') and isinstance(data.get('content'), str) and data['content']:
+                metadata = data.get('extraction_metadata') or {}
+                yield data['url'], data['content'], data.get('extracted_at') or metadata.get('extraction_timestamp')
+
+
+class ExtractionManifest:
+    """URL -> lastmod, ETag and content hash for one site's extraction output"""
+
+    def __init__(self, path: Path, probe_workers: int = 8, probe_timeout: int = 15):
+        self.path = Path(path)
+        self.probe_workers = probe_workers
+        self.probe_timeout = probe_timeout
+        self.pages: Dict[str, Dict] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.pages = data.get('pages', {})
+
+    def save(self):
+        """Write the manifest atomically so an interrupted run never corrupts it"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'updated_at': datetime.now().isoformat(),
+                'total_pages': len(self.pages),
+                'pages': self.pages
+            }, f, indent=2, ensure_ascii=False)
+        tmp_path.replace(self.path)
+
+    def probe(self, url_info: Dict) -> bool:
+        """
+        Conditional HEAD for pages the sitemap gives no lastmod for. Costs no API
+        credits; True means the page may have changed and must be extracted.
+        The response validators are kept on url_info for record().
+        """
+        entry = self.pages.get(url_info['url'], {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = requests.head(url_info['url'], headers=headers, timeout=self.probe_timeout,
+                                     allow_redirects=True)
+        except requests.RequestException:
+            return True
+
+        if response.status_code == 304:
+            return False
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        url_info['etag'] = etag
+        url_info['last_modified'] = last_modified
+
+        if not entry or response.status_code != 200:
+            return True
+        # Seeded from earlier output, so there are no validators yet: compare dates instead
+        if entry.get('seeded') and not entry.get('etag') and not entry.get('last_modified'):
+            return not extracted_since(entry.get('extracted_at'), last_modified)
+        # Some servers ignore conditional headers on HEAD but still send stable validators
+        if etag and etag == entry.get('etag'):
+            return False
+        if not etag and last_modified and last_modified == entry.get('last_modified'):
+            return False
+        return True
+
+    def plan(self, url_infos: List[Dict], probe: bool = True,
+             removed: Optional[List[str]] = None) -> Dict[str, List]:
+        """
+        Split the current URL list into new, changed and unchanged pages, plus
+        URLs that left the sitemap (removed). A lastmod that differs from the
+        recorded one marks a page changed; pages without a lastmod are probed.
+        A sitemap diff lists only what changed, so it passes its removals
+        explicitly instead of having every unlisted page count as removed.
+        """
+        plan = {'new': [], 'changed': [], 'unchanged': [], 'removed': []}
+        to_probe = []
+
+        for url_info in url_infos:
+            entry = self.pages.get(url_info['url'])
+            lastmod = url_info.get('lastmod')
+            if lastmod and entry:
+                plan['changed' if lastmod != entry.get('lastmod') else 'unchanged'].append(url_info)
+            elif lastmod or not probe:
+                plan['changed' if entry else 'new'].append(url_info)
+            else:
+                to_probe.append(url_info)
+
+        if to_probe:
+            print(f"🔎 Probing {len(to_probe)} URLs without sitemap lastmod...")
+            with ThreadPoolExecutor(max_workers=self.probe_workers) as executor:
+                results = list(executor.map(self.probe, to_probe))
+            for url_info, stale in zip(to_probe, results):
+                if url_info['url'] not in self.pages:
+                    plan['new'].append(url_info)
+                else:
+                    plan['changed' if stale else 'unchanged'].append(url_info)
+
+        if removed is not None:
+            plan['removed'] = [url for url in removed if url in self.pages]
+        else:
+            current = {url_info['url'] for url_info in url_infos}
+            plan['removed'] = [url for url in self.pages if url not in current]
+        return plan
+
+    def seed(self, url_infos: List[Dict], sources: Iterable[Path]) -> int:
+        """
+        Fill the manifest from earlier output so a first incremental run does not
+        re-extract the whole site. A page extracted no earlier than its sitemap
+        lastmod is recorded as current; otherwise it is recorded without a lastmod,
+        so plan() marks it changed. Returns the number of pages seeded.
+        """
+        wanted = {url_info['url']: url_info for url_info in url_infos}
+        latest: Dict[str, Tuple[str, Optional[str]]] = {}
+        for url, content, extracted_at in iter_existing_pages(sources):
+            if url not in wanted:
+                continue
+            previous = latest.get(url)
+            if previous is None or (extracted_at or '') >= (previous[1] or ''):
+                latest[url] = (content, extracted_at)
+
+        now = datetime.now().isoformat()
+        for url, (content, extracted_at) in latest.items():
+            url_info = wanted[url]
+            lastmod = url_info.get('lastmod')
+            self.pages[url] = {
+                'lastmod': lastmod if extracted_since(extracted_at, lastmod) else None,
+                'etag': None,
+                'last_modified': None,
+                'content_hash': content_hash(content),
+                'content_type': url_info.get('content_type'),
+                'extracted_at': extracted_at or now,
+                'checked_at': now,
+                'seeded': True
+            }
+        return len(latest)
+
+    def prepare_first_run(self, url_infos: List[Dict], sources: Iterable[Path], allow_full_run: bool) -> bool:
+        """
+        Seed an empty manifest before planning. Returns False when there is no
+        earlier output to seed from and a full-cost run was not explicitly allowed.
+        """
+        if self.pages:
+            return True
+        sources = list(sources)
+        seeded = self.seed(url_infos, sources)
+        if seeded:
+            print(f"🌱 Seeded the manifest with {seeded} of {len(url_infos)} URLs from earlier output")
+            return True
+        if allow_full_run:
+            print(f"⚠️ No manifest or earlier output - all {len(url_infos)} URLs will be extracted")
+            return True
+        print(f"❌ No extraction manifest and no earlier output of these URLs to seed one from "
+              f"(searched: {', '.join(str(source) for source in sources) or 'nothing'}).")
+        print(f"   All {len(url_infos)} URLs would be re-extracted; re-run with --full-run to confirm.")
+        return False
+
+    def record(self, url_info: Dict, content: str) -> str:
+        """Store a fresh extraction; returns 'added', 'changed' or 'unchanged' by content hash"""
+        url = url_info['url']
+        digest = content_hash(content)
+        previous = self.pages.get(url)
+        now = datetime.now().isoformat()
+
+        if previous is None:
+            status = 'added'
+        elif previous.get('content_hash') != digest:
+            status = 'changed'
+        else:
+            status = 'unchanged'
+
+        self.pages[url] = {
+            'lastmod': url_info.get('lastmod'),
+            'etag': url_info.get('etag') or (previous or {}).get('etag'),
+            'last_modified': url_info.get('last_modified') or (previous or {}).get('last_modified'),
+            'content_hash': digest,
+            'content_type': url_info.get('content_type'),
+            'extracted_at': now if status != 'unchanged' else previous.get('extracted_at', now),
+            'checked_at': now
+        }
+        return status
+
+    def forget(self, url: str):
+        self.pages.pop(url, None)
+
+    @staticmethod
+    def print_plan(plan: Dict[str, List]):
+        print(f"\n📋 INCREMENTAL PLAN:")
+        print(f"   🆕 New: {len(plan['new'])}")
+        print(f"   🔄 Changed: {len(plan['changed'])}")
+        print(f"   ⏭️  Unchanged: {len(plan['unchanged'])}")
+        print(f"   🗑️  Removed: {len(plan['removed'])}")
+
+
+class DeltaSet:
+    """Pages added or changed in one refresh run, written in dataset format for re-upload"""
+
+    def __init__(self, root: Path, source: str):
+        self.root = Path(root) / f"delta_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}"
+        self.pages_dir = self.root / "pages"
+        self.pages_dir.mkdir(parents=True, exist_ok=True)
+        self.source = source
+        self.entries = {'added': [], 'changed': [], 'removed': []}
+        self.unchanged = 0
+
+    def add(self, url: str, content: str, status: str, images: Optional[List] = None):
+        """Write one page if its content changed; unchanged re-extractions are only counted"""
+        if status == 'unchanged':
+            self.unchanged += 1
+            return
+
+        filename = url_to_filename(url)
+        with open(self.pages_dir / filename, 'w', encoding='utf-8') as f:
+            json.dump({
+                "url": url,
+                "content": content,
+                "images": images or [],
+                "extraction_metadata": {
+                    "extraction_timestamp": datetime.now().isoformat(),
+                    "source": self.source,
+                    "delta_status": status
+                }
+            }, f, indent=2, ensure_ascii=False)
+        self.entries[status].append({'url': url, 'file': filename})
+
+    def remove(self, url: str):
+        self.entries['removed'].append({'url': url, 'file': url_to_filename(url)})
+
+    def finish(self) -> Path:
+        """Write delta.json next to the pages and print what needs re-uploading"""
+        summary_file = self.root / "delta.json"
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'source': self.source,
+                'counts': {
+                    **{status: len(entries) for status, entries in self.entries.items()},
+                    'unchanged_after_extraction': self.unchanged
+                },
+                **self.entries
+            }, f, indent=2, ensure_ascii=False)
+
+        print(f"\n📦 DELTA SET:")
+        print(f"   🆕 Added: {len(self.entries['added'])}")
+        print(f"   🔄 Changed: {len(self.entries['changed'])}")
+        print(f"   🗑️  Removed: {len(self.entries['removed'])}")
+        print(f"   ⏭️  Re-extracted but identical: {self.unchanged}")
+        print(f"   📁 Upload folder: {self.pages_dir}")
+        print(f"   📝 Summary: {summary_file}")
+        return summary_file
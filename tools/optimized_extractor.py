@@ -8,13 +8,19 @@ import os
 import json
 import time
 import requests
+import argparse
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 import random
 
+from extraction_manifest import ExtractionManifest, DeltaSet, load_url_list
+from progress_journal import ProgressJournal
+from response_cache import ResponseCache
+from async_extraction_engine import AsyncExtractionEngine, RateLimitError, parse_retry_after
+
 # Load environment variables
 load_dotenv()
 
@@ -54,7 +60,9 @@ class OptimizedExtractor:
         self.progress_dir.mkdir(parents=True, exist_ok=True)
 
         # Progress tracking files
-        self.progress_file = self.progress_dir / "extraction_progress.json"
+        self.progress_file = self.progress_dir / "extraction_progress.jsonl"
+        self.legacy_progress_file = self.progress_dir / "extraction_progress.json"  # Pre-journal checkpoints
+        self.journal = None
         self.stats_file = self.progress_dir / "extraction_stats.json"
 
         # Optimized rate limiting for Firecrawl API
@@ -63,6 +71,9 @@ class OptimizedExtractor:
         self.timeout = 180       # Request timeout (3 minutes)
         self.max_retries = 3     # Maximum retry attempts
 
+        # Raw scrape results are cached so reprocessing never pays for the API twice
+        self.cache = ResponseCache.from_env()
+
         # Statistics
         self.stats = {
             'total_urls': 0,
@@ -82,28 +93,24 @@ class OptimizedExtractor:
         return data.get('urls', [])
 
     def load_progress(self) -> Dict:
-        """Load previous extraction progress"""
-        if not self.progress_file.exists():
-            return {'completed_urls': set(), 'failed_urls': set()}
-
-        with open(self.progress_file, 'r', encoding='utf-8') as f:
-            progress = json.load(f)
+        """Replay the progress journal (importing an old JSON checkpoint on first use)"""
+        if self.journal is None:
+            self.journal = ProgressJournal(self.progress_file, legacy_file=self.legacy_progress_file)
 
         return {
-            'completed_urls': set(progress.get('completed_urls', [])),
-            'failed_urls': set(progress.get('failed_urls', []))
+            'completed_urls': self.journal.completed_urls,
+            'failed_urls': self.journal.failed_urls
         }
 
-    def save_progress(self, completed_urls: set, failed_urls: set):
-        """Save extraction progress"""
-        progress = {
-            'completed_urls': list(completed_urls),
-            'failed_urls': list(failed_urls),
-            'last_saved': datetime.now().isoformat()
-        }
+    def save_progress(self, url: str, status: str):
+        """Durably record one URL outcome - a single appended journal line"""
+        self.journal.record_url(url, status)
 
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress, f, indent=2, ensure_ascii=False)
+    def close_progress(self):
+        """Compact and close the journal at the end of a run"""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
 
     def save_stats(self):
         """Save extraction statistics"""
@@ -157,8 +164,9 @@ class OptimizedExtractor:
             retry_count=self.max_retries
         )
 
-    def _make_api_request(self, url: str, content_type: str) -> Optional[ExtractedContent]:
-        """Make single API request to Firecrawl"""
+    def _make_api_request(self, url: str, content_type: str,
+                          throttle: Callable[[], None] = None) -> Optional[ExtractedContent]:
+        """Make single API request to Firecrawl; throttle() runs first when the cache misses"""
         payload = {
             "url": url,
             "formats": ["markdown", "html"],
@@ -167,35 +175,17 @@ class OptimizedExtractor:
             "waitFor": 3000  # Wait 3 seconds for dynamic content
         }
 
-        print(f"📡 Requesting: {url}")
-        start_time = time.time()
-
-        response = requests.post(
-            f"{self.base_url}/scrape",
-            headers=self.headers,
-            json=payload,
-            timeout=self.timeout
-        )
-
-        elapsed = time.time() - start_time
-        print(f"⏱️  Response in {elapsed:.1f}s (Status: {response.status_code})")
-
-        if response.status_code == 408:
-            # Handle timeout specifically
-            raise Exception("Request timed out in API queue")
-        elif response.status_code == 429:
-            # Handle rate limiting
-            raise Exception("Rate limited by API")
-        elif response.status_code != 200:
-            raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
-
-        data = response.json()
-
-        if not data.get("success"):
-            raise Exception(f"API error: {data.get('error', 'Unknown error')}")
+        options = {key: value for key, value in payload.items() if key != "url"}
+        result = self.cache.get("firecrawl", url, options)
+        if result is not None:
+            print(f"💾 Cache hit: {url}")
+        else:
+            if throttle:
+                throttle()
+            result = self._scrape(url, payload)
+            self.cache.put("firecrawl", url, options, result)
 
         # Process successful response
-        result = data.get("data", {})
         metadata = {
             "author": result.get("metadata", {}).get("author", ""),
             "description": result.get("metadata", {}).get("description", ""),
@@ -221,6 +211,37 @@ class OptimizedExtractor:
         print(f"✅ Extracted: {content.title[:50]}...")
         return content
 
+    def _scrape(self, url: str, payload: Dict) -> Dict:
+        """POST /scrape; raises on timeouts, rate limits and API errors"""
+        print(f"📡 Requesting: {url}")
+        start_time = time.time()
+
+        response = requests.post(
+            f"{self.base_url}/scrape",
+            headers=self.headers,
+            json=payload,
+            timeout=self.timeout
+        )
+
+        elapsed = time.time() - start_time
+        print(f"⏱️  Response in {elapsed:.1f}s (Status: {response.status_code})")
+
+        if response.status_code == 408:
+            # Handle timeout specifically
+            raise Exception("Request timed out in API queue")
+        elif response.status_code == 429:
+            # Handle rate limiting; Retry-After lets the async engine pause exactly as long as asked
+            raise RateLimitError("Rate limited by API", parse_retry_after(response.headers.get("Retry-After")))
+        elif response.status_code != 200:
+            raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
+
+        data = response.json()
+
+        if not data.get("success"):
+            raise Exception(f"API error: {data.get('error', 'Unknown error')}")
+
+        return data.get("data", {})
+
     def save_content(self, content: ExtractedContent) -> bool:
         """Save extracted content to JSON file"""
         try:
@@ -305,15 +326,15 @@ class OptimizedExtractor:
 
                 if content and content.firecrawl_success:
                     if self.save_content(content):
-                        completed_urls.add(url)
+                        self.save_progress(url, 'completed')
                         batch_successful += 1
                         self.stats['successful'] += 1
                     else:
-                        failed_urls.add(url)
+                        self.save_progress(url, 'failed')
                         batch_failed += 1
                         self.stats['failed'] += 1
                 else:
-                    failed_urls.add(url)
+                    self.save_progress(url, 'failed')
                     batch_failed += 1
                     self.stats['failed'] += 1
 
@@ -325,8 +346,7 @@ class OptimizedExtractor:
                     print(f"⏸️  Waiting {delay:.1f}s...")
                     time.sleep(delay)
 
-            # Save progress after each batch
-            self.save_progress(completed_urls, failed_urls)
+            # Progress is journaled per URL; stats are refreshed per batch
             self.save_stats()
 
             print(f"\n📊 Batch {current_batch_number} Results:")
@@ -341,6 +361,105 @@ class OptimizedExtractor:
                 time.sleep(batch_delay)
 
         # Final summary
+        self.close_progress()
+        self._print_final_summary()
+
+    def run_async_extraction(self, urls_file: str, concurrency: int = 4, requests_per_minute: float = 20):
+        """Extract remaining URLs concurrently within the plan's request budget"""
+        print("🚀 Starting Async Extraction")
+
+        urls = self.load_urls(urls_file)
+        progress = self.load_progress()
+        completed_urls = progress['completed_urls']
+        failed_urls = progress['failed_urls']
+        remaining_urls = [u for u in urls if u['url'] not in completed_urls and u['url'] not in failed_urls]
+
+        print(f"📊 Total URLs: {len(urls)}")
+        print(f"📊 Remaining: {len(remaining_urls)}")
+        print(f"⚙️  Concurrency: {concurrency}, budget: {requests_per_minute:g} requests/min")
+
+        self.stats['total_urls'] = len(remaining_urls)
+        self.stats['started_at'] = datetime.now().isoformat()
+
+        engine = AsyncExtractionEngine(
+            lambda url_info, throttle: self._make_api_request(url_info['url'], url_info['content_type'], throttle),
+            requests_per_minute=requests_per_minute,
+            concurrency=concurrency,
+            max_retries=self.max_retries,
+            base_delay=self.base_delay,
+            max_delay=self.max_delay
+        )
+
+        def on_result(url_info: Dict, content: Optional[ExtractedContent], error: Optional[Exception]):
+            if content and content.firecrawl_success and self.save_content(content):
+                self.save_progress(url_info['url'], 'completed')
+                self.stats['successful'] += 1
+            else:
+                self.save_progress(url_info['url'], 'failed')
+                self.stats['failed'] += 1
+            self.stats['processed'] += 1
+
+            if self.stats['processed'] % 10 == 0 or self.stats['processed'] == len(remaining_urls):
+                self.stats['timeouts'] = engine.stats['timeouts']
+                self.stats['rate_limited'] = engine.stats['rate_limited']
+                self.save_stats()
+                print(f"📈 Progress: {self.stats['processed']}/{len(remaining_urls)}")
+
+        engine.run_sync(remaining_urls, on_result)
+        self.stats['timeouts'] = engine.stats['timeouts']
+        self.stats['rate_limited'] = engine.stats['rate_limited']
+        self.close_progress()
+        self.save_stats()
+        self._print_final_summary()
+
+    def run_incremental_extraction(self, urls_file: str, probe: bool = True, allow_full_run: bool = False):
+        """Re-extract only new or changed URLs and write the delta set for re-upload"""
+        print("🚀 Starting Optimized Incremental Refresh")
+
+        # Pages are re-extracted because they changed; fetch fresh but keep the cache current
+        self.cache.refresh = True
+        manifest = ExtractionManifest(self.output_dir / "extraction_manifest.json")
+        url_infos, removed = load_url_list(urls_file)
+        # An empty manifest is seeded from the pages earlier (non-incremental) runs saved
+        if not manifest.prepare_first_run(url_infos, [self.content_dir], allow_full_run):
+            return
+        plan = manifest.plan(url_infos, probe=probe, removed=removed)
+        manifest.print_plan(plan)
+
+        delta = DeltaSet(self.output_dir, source="firecrawl_api")
+        pending = plan['new'] + plan['changed']
+        self.stats['total_urls'] = len(pending)
+        self.stats['started_at'] = datetime.now().isoformat()
+
+        for i, url_info in enumerate(pending):
+            url = url_info['url']
+            print(f"\n📄 [{i+1}/{len(pending)}] Processing: {url}")
+
+            content = self.extract_content_with_retry(url, url_info['content_type'])
+            if content and content.firecrawl_success and self.save_content(content):
+                status = manifest.record(url_info, content.content)
+                delta.add(url, content.content, status)
+                self.stats['successful'] += 1
+            else:
+                # Not recorded, so the page is picked up again on the next run
+                self.stats['failed'] += 1
+            self.stats['processed'] += 1
+
+            if (i + 1) % 10 == 0:
+                manifest.save()
+                self.save_stats()
+
+            if i < len(pending) - 1:
+                delay = self.base_delay + random.uniform(0, 2)
+                print(f"⏸️  Waiting {delay:.1f}s...")
+                time.sleep(delay)
+
+        for url in plan['removed']:
+            delta.remove(url)
+            manifest.forget(url)
+        manifest.save()
+        self.save_stats()
+        delta.finish()
         self._print_final_summary()
 
     def _print_final_summary(self):
@@ -354,10 +473,28 @@ class OptimizedExtractor:
         print(f"Failed: {self.stats['failed']}")
         print(f"Timeouts: {self.stats['timeouts']}")
         print(f"Rate limited: {self.stats['rate_limited']}")
+        print(f"Response cache: {self.cache.summary()}")
         print(f"Content saved to: {self.content_dir}")
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Extract Essential Cardano pages with Firecrawl")
+    parser.add_argument("--urls-file", default="comprehensive_extraction/essential_cardano_urls.json",
+                        help="URL list (or sitemap diff, with --incremental) from sitemap_parser.py")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-extract new or changed pages and write a delta set")
+    parser.add_argument("--no-probe", action="store_true",
+                        help="Skip conditional HEAD checks for URLs without a sitemap lastmod")
+    parser.add_argument("--full-run", action="store_true",
+                        help="Let a first --incremental run with no earlier output extract every URL")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="Run the async engine with this many parallel requests (0 = serial)")
+    parser.add_argument("--requests-per-minute", type=float, default=20,
+                        help="Request budget for the async engine; match your Firecrawl plan")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Neither read nor write the raw response cache")
+    args = parser.parse_args()
+
     api_key = os.getenv("FIRECRAWL_API_KEY")
 
     if not api_key:
@@ -365,14 +502,23 @@ def main():
         return
 
     extractor = OptimizedExtractor(api_key)
+    extractor.cache.enabled = not args.no_cache
 
     # Check if URLs file exists
-    urls_file = "comprehensive_extraction/essential_cardano_urls.json"
+    urls_file = args.urls_file
     if not Path(urls_file).exists():
         print(f"❌ URLs file not found: {urls_file}")
         print("Please run sitemap_parser.py first")
         return
 
+    if args.incremental:
+        extractor.run_incremental_extraction(urls_file, probe=not args.no_probe, allow_full_run=args.full_run)
+        return
+
+    if args.concurrency > 0:
+        extractor.run_async_extraction(urls_file, args.concurrency, args.requests_per_minute)
+        return
+
     # Start with small batches to test rate limiting
     print("🎯 Starting with small batch size to test API limits...")
     extractor.run_batch_extraction(urls_file, batch_size=10, start_batch=0)
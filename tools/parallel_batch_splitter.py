@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Parallel Batch Splitter
+
+Splits the raw Tavily batch files of any site into individual files per URL,
+like the per-site splitters, but across a process pool. Filenames keep the
+site's readable URL-derived stem and add a short hash of the full URL, so
+they are deterministic and collision-free without probing the filesystem.
+--shard-depth spreads files over hashed subdirectories for very large sets.
+
+Usage: python parallel_batch_splitter.py iog_blog [--workers 8] [--shard-depth 1]
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from site_profiles import SITE_PROFILES, SiteProfile
+
+HASH_LENGTH = 12     # 48 bits of the URL's SHA-256
+MAX_STEM_LENGTH = 120  # Keeps names well under the 255-byte filename limit
+
+_splitter_modules = {}
+
+
+def splitter_module(profile: SiteProfile):
+    """The site's own splitter script, for its url_to_filename and README template"""
+    module_name = Path(profile.splitter_script).stem
+    if module_name not in _splitter_modules:
+        _splitter_modules[module_name] = importlib.import_module(module_name)
+    return _splitter_modules[module_name]
+
+
+def hashed_filename(url: str, profile: SiteProfile) -> Tuple[str, str]:
+    """(filename, url_hash): readable site stem plus a hash of the full URL"""
+    url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    stem = splitter_module(profile).url_to_filename(url)[:-len('.json')][:MAX_STEM_LENGTH]
+    return f"{stem}_{url_hash[:HASH_LENGTH]}.json", url_hash
+
+
+def shard_path(output_dir: Path, filename: str, url_hash: str, shard_depth: int) -> Path:
+    """output_dir/ab/cd/filename for shard_depth 2, output_dir/filename for 0"""
+    shards = [url_hash[2 * level:2 * level + 2] for level in range(shard_depth)]
+    return output_dir.joinpath(*shards, filename)
+
+
+def split_batch(batch_file: str, order: int, output_dir: str, site: str, shard_depth: int) -> Dict:
+    """
+    Worker: write every page of one batch file to a temporary name next to its
+    final path. The parent picks one winner per URL and renames it into place.
+    """
+    profile = SITE_PROFILES[site]
+    output_dir = Path(output_dir)
+    with open(batch_file, 'r', encoding='utf-8') as f:
+        batch_data = json.load(f)
+
+    batch_number = batch_data.get('batch_number', 'unknown')
+    written: Dict[str, Tuple[str, str]] = {}  # A URL repeated within a batch keeps its last copy
+    skipped = 0
+    duplicates = 0
+    created_dirs = set()
+
+    try:
+        for result in batch_data.get('response', {}).get('results', []):
+            url = result.get('url')
+            raw_content = result.get('raw_content', '')
+            if not url or not raw_content:
+                skipped += 1
+                continue
+
+            # Same minimal structure as the per-site splitters
+            individual_file = {
+                "url": url,
+                "content": raw_content,
+                "images": result.get('images', []),
+                "extraction_metadata": {
+                    "batch_number": batch_number,
+                    "extraction_timestamp": batch_data.get('timestamp'),
+                    "extraction_time": batch_data.get('extraction_time'),
+                    "source": "tavily_api_raw"
+                }
+            }
+
+            filename, url_hash = hashed_filename(url, profile)
+            final_path = shard_path(output_dir, filename, url_hash, shard_depth)
+            if final_path.parent not in created_dirs:
+                final_path.parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(final_path.parent)
+
+            duplicates += url in written
+            tmp_path = final_path.with_name(f"{final_path.name}.{order}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(individual_file, f, indent=2, ensure_ascii=False)
+            written[url] = (str(tmp_path), str(final_path))
+    except Exception:
+        for tmp_path, _ in written.values():
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+    return {
+        'batch_file': batch_file,
+        'order': order,
+        'written': [(url, tmp_path, final_path) for url, (tmp_path, final_path) in written.items()],
+        'skipped': skipped,
+        'duplicates': duplicates
+    }
+
+
+def split_batches_parallel(profile: SiteProfile, batch_files: List[Path], output_dir: Path,
+                           workers: Optional[int] = None, shard_depth: int = 0) -> Dict:
+    """
+    Split batch files in parallel. A URL found in several batch files keeps
+    the copy from the last one in sorted order (the most recent re-extraction),
+    whatever order the workers finish in.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    winners: Dict[str, Tuple[int, str, str]] = {}
+    stats = {'batch_files': len(batch_files), 'pages': 0, 'duplicates': 0, 'skipped': 0, 'failed_batches': []}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(split_batch, str(batch_file), order, str(output_dir), profile.name, shard_depth): batch_file
+            for order, batch_file in enumerate(batch_files)
+        }
+        for future in as_completed(futures):
+            batch_file = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error processing {batch_file.name}: {e}")
+                stats['failed_batches'].append(batch_file.name)
+                continue
+
+            stats['skipped'] += result['skipped']
+            stats['duplicates'] += result['duplicates']
+            for url, tmp_path, final_path in result['written']:
+                current = winners.get(url)
+                if current is None or result['order'] > current[0]:
+                    if current is not None:
+                        os.remove(current[1])
+                        stats['duplicates'] += 1
+                    winners[url] = (result['order'], tmp_path, final_path)
+                else:
+                    os.remove(tmp_path)
+                    stats['duplicates'] += 1
+            print(f"Processed {len(result['written'])} pages from {batch_file.name}")
+
+    for _, tmp_path, final_path in winners.values():
+        os.replace(tmp_path, final_path)
+    stats['pages'] = len(winners)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split raw Tavily batch files into per-URL files in parallel")
+    parser.add_argument("site", choices=sorted(SITE_PROFILES))
+    parser.add_argument("--output-dir", help="Dataset folder (default: <site>-dataset-<today>)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--shard-depth", type=int, default=0, choices=range(0, 4),
+                        help="Levels of 256-way hashed subdirectories (0 = flat, as Globant upload expects)")
+    args = parser.parse_args()
+
+    profile = SITE_PROFILES[args.site]
+    raw_extractions_dir = Path(profile.output_dir) / "raw_extractions"
+    today = datetime.now().strftime("%Y-%m-%d")
+    output_dir = Path(args.output_dir or f"{profile.dataset_prefix}{today}")
+
+    batch_files = sorted(raw_extractions_dir.glob(f"{profile.raw_prefix}batch_*.json"))
+    if not batch_files:
+        print(f"No {profile.display_name} batch files found in {raw_extractions_dir}/")
+        return
+
+    print(f"Found {len(batch_files)} {profile.display_name} batch files to process")
+    started = datetime.now()
+    stats = split_batches_parallel(profile, batch_files, output_dir, args.workers, args.shard_depth)
+    elapsed = (datetime.now() - started).total_seconds()
+
+    module = splitter_module(profile)
+    if hasattr(module, 'create_dataset_readme'):
+        module.create_dataset_readme(output_dir, stats['pages'], {'success_rate': 'TBD'})
+
+    print(f"\n✅ Individual page files: {stats['pages']} ({stats['pages'] / max(elapsed, 1e-9):.0f} pages/s)")
+    print(f"🔁 Duplicate URLs resolved: {stats['duplicates']}")
+    print(f"⏭️  Entries without URL or content: {stats['skipped']}")
+    if stats['failed_batches']:
+        print(f"❌ Failed batch files: {', '.join(stats['failed_batches'])}")
+    print(f"📁 Output directory: {output_dir}" + (f" (shard depth {args.shard_depth})" if args.shard_depth else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Append-only Extraction Progress Journal
+Each URL or batch result is one small JSONL line, flushed (and fsynced) as it
+happens, so a checkpoint costs the same at 100 URLs or 100k and a crash can at
+worst lose a half-written last line. Resume replays the journal; compaction
+rewrites it to one line per live entry when superseded lines pile up.
+"""
+
+import os
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+
+class ProgressJournal:
+    """Durable per-URL / per-batch progress for resumable extraction runs"""
+
+    def __init__(self, path: Path, legacy_file: Optional[Path] = None, fsync: bool = True,
+                 compact_min_lines: int = 10000, compact_ratio: float = 2.0):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.compact_min_lines = compact_min_lines
+        self.compact_ratio = compact_ratio
+
+        self.url_status: Dict[str, str] = {}
+        self.batches: Set[int] = set()
+        self.lines = 0
+        self.torn_lines = 0
+        self.unterminated = False  # Journal ends without a newline
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self._replay()
+        elif legacy_file and Path(legacy_file).exists():
+            self._import_legacy(Path(legacy_file))
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self.torn_lines:
+            self.compact()  # Drop the torn tail so appends start on a clean line
+        elif self.unterminated:
+            # The last entry parsed but its newline never hit the disk; end it before appending
+            self._file.write('\n')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    @property
+    def completed_urls(self) -> Set[str]:
+        return {url for url, status in self.url_status.items() if status == 'completed'}
+
+    @property
+    def failed_urls(self) -> Set[str]:
+        return {url for url, status in self.url_status.items() if status == 'failed'}
+
+    @property
+    def completed_batches(self) -> Set[int]:
+        return set(self.batches)
+
+    def _apply(self, entry: Dict):
+        if 'url' in entry:
+            self.url_status[entry['url']] = entry['status']
+        elif 'batch' in entry:
+            self.batches.add(entry['batch'])
+            for url in entry.get('urls', []):
+                self.url_status[url] = 'completed'
+
+    def _replay(self):
+        """Rebuild state from the journal; an unparseable line (torn write) is skipped"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self.unterminated = not line.endswith('\n')
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._apply(json.loads(line))
+                    self.lines += 1
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    self.torn_lines += 1
+        if self.torn_lines:
+            print(f"⚠️ Skipped {self.torn_lines} damaged line(s) in {self.path}")
+
+    def _import_legacy(self, legacy_file: Path):
+        """Carry over progress saved by the old whole-file JSON checkpoint"""
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            progress = json.load(f)
+        for url in progress.get('completed_urls', []):
+            self.url_status[url] = 'completed'
+        for url in progress.get('failed_urls', []):
+            self.url_status[url] = 'failed'
+        self.batches.update(progress.get('completed_batches', []))
+        print(f"📥 Imported {len(self.url_status)} URLs from {legacy_file}")
+        self._write_snapshot()
+
+    def _append(self, entry: Dict):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.lines += 1
+        if self.lines >= self.compact_min_lines and self.lines > self.compact_ratio * self.live_entries:
+            self.compact()
+
+    @property
+    def live_entries(self) -> int:
+        return len(self.url_status) + len(self.batches)
+
+    def record_url(self, url: str, status: str):
+        """Record one URL outcome ('completed' or 'failed'); the latest line wins on replay"""
+        self.url_status[url] = status
+        self._append({'url': url, 'status': status, 'at': datetime.now().isoformat()})
+
+    def record_batch(self, batch_number: int, urls: Iterable[str] = ()):
+        """Record a finished batch and mark its URLs completed, in a single line"""
+        entry = {'batch': batch_number, 'urls': list(urls), 'at': datetime.now().isoformat()}
+        self._apply(entry)
+        self._append(entry)
+
+    def _write_snapshot(self):
+        """Atomically replace the journal with one line per live entry"""
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for url, status in self.url_status.items():
+                f.write(json.dumps({'url': url, 'status': status}, ensure_ascii=False) + '\n')
+            for batch_number in sorted(self.batches):
+                f.write(json.dumps({'batch': batch_number}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(self.path)
+        self.lines = self.live_entries
+        self.torn_lines = 0
+
+    def compact(self):
+        """Rewrite the journal without superseded lines and reopen it for appending"""
+        self._file.close()
+        self._write_snapshot()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        if self.lines > self.live_entries:
+            self.compact()
+        self._file.close()
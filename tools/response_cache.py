@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Raw Extraction Response Cache
+On-disk cache of raw Firecrawl/Tavily page results, addressed by the SHA-256 of
+(provider, URL, request options) and stored gzip-compressed with a TTL. All
+extractors read through it, so re-running processing after a change to noise
+patterns or chunking replays cached pages instead of paying for the API again.
+Set EXTRACTION_CACHE_DIR / EXTRACTION_CACHE_TTL_DAYS to relocate or age it.
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = "extraction_cache"
+DEFAULT_TTL_DAYS = 30
+
+
+def cache_key(provider: str, url: str, options: Dict) -> str:
+    """Stable key: options are serialized with sorted keys so dict order never matters"""
+    identity = json.dumps([provider, url, options], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed, compressed, TTL-bound store of raw per-URL API results"""
+
+    def __init__(self, root: Path = Path(DEFAULT_CACHE_DIR), ttl_days: float = DEFAULT_TTL_DAYS,
+                 enabled: bool = True):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_days * 86400
+        self.enabled = enabled
+        self.refresh = False  # Write-only: fetch fresh but keep the cache current (incremental refresh)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls, enabled: bool = True) -> "ResponseCache":
+        return cls(
+            Path(os.getenv("EXTRACTION_CACHE_DIR", DEFAULT_CACHE_DIR)),
+            float(os.getenv("EXTRACTION_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS)),
+            enabled
+        )
+
+    def _path(self, provider: str, key: str) -> Path:
+        # Two-level fan-out keeps directories small at 100k+ entries
+        return self.root / provider / key[:2] / f"{key}.json.gz"
+
+    def get(self, provider: str, url: str, options: Dict) -> Optional[Dict]:
+        """Cached result, or None when missing, expired, unreadable or bypassed"""
+        if not self.enabled or self.refresh:
+            return None
+
+        path = self._path(provider, cache_key(provider, url, options))
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, EOFError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        if self.ttl_seconds and time.time() - entry.get('stored_at', 0) > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['result']
+
+    def put(self, provider: str, url: str, options: Dict, result: Dict):
+        """Store one raw result atomically (a crash never leaves a half-written entry)"""
+        if not self.enabled:
+            return
+
+        path = self._path(provider, cache_key(provider, url, options))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump({
+                'provider': provider,
+                'url': url,
+                'options': options,
+                'stored_at': time.time(),
+                'result': result
+            }, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    def prune(self) -> int:
+        """Delete expired entries; returns how many were removed"""
+        if not self.ttl_seconds or not self.root.exists():
+            return 0
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        for path in self.root.glob("*/*/*.json.gz"):
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = (self.hits / total) * 100 if total else 0
+        return f"{self.hits} hits / {self.misses} misses ({rate:.1f}% served from cache)"
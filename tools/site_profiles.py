@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Site Profiles
+Everything that differs between the crawled sites - sitemap, URL categories,
+exclusions, batch size and output naming - in one place, so the sitemap
+parsers and the shared Tavily extractor stay site-agnostic.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from url_classifier import URLClassifier
+
+
+@dataclass
+class SiteProfile:
+    """Per-site crawl configuration"""
+    name: str                       # Short key, also the output file prefix
+    display_name: str
+    source_site: str
+    sitemap_url: str
+    content_patterns: Dict[str, str]  # category -> path regex, first match wins; "other" is the catchall
+    excluded_patterns: List[str]
+    included_types: Optional[List[str]] = None  # Only keep these categories when set
+    batch_size: int = 20
+    output_dir: str = ""
+    raw_prefix: Optional[str] = None  # Raw batch file prefix; defaults to "<name>_"
+    splitter_script: str = ""
+
+    def __post_init__(self):
+        if not self.output_dir:
+            self.output_dir = f"{self.name}_comprehensive"
+        if self.raw_prefix is None:
+            self.raw_prefix = f"{self.name}_"
+        if not self.splitter_script:
+            self.splitter_script = f"{self.name}_batch_splitter.py"
+
+    @property
+    def urls_file(self) -> Path:
+        """Where the sitemap parser saves the filtered URL list"""
+        return Path("comprehensive_extraction") / f"{self.name}_urls.json"
+
+    @property
+    def dataset_prefix(self) -> str:
+        """Dataset folders are named <dataset_prefix><date>"""
+        return f"{self.name.replace('_', '-')}-dataset-"
+
+    def raw_batch_filename(self, batch_number: int) -> str:
+        return f"{self.raw_prefix}batch_{batch_number:03d}.json"
+
+    @cached_property
+    def classifier(self) -> URLClassifier:
+        """Category/exclusion rules compiled once for this site"""
+        return URLClassifier(self.content_patterns, self.excluded_patterns, self.included_types)
+
+    def categorize(self, url: str) -> str:
+        return self.classifier.category(url)
+
+    def is_excluded(self, url: str) -> bool:
+        return self.classifier.is_excluded(url)
+
+
+ESSENTIAL_CARDANO = SiteProfile(
+    name="essential_cardano",
+    display_name="Essential Cardano",
+    source_site="essentialcardano.io",
+    sitemap_url="https://www.essentialcardano.io/sitemap.xml",
+    content_patterns={
+        "faq": r"/faq",
+        "glossary": r"/glossary",
+        "article": r"/article",
+        "development_update": r"/development-update",
+        "developer": r"/developer",
+        "guides": r"/guide",
+        "videos": r"/video",
+        "infographics": r"/infographic",
+        "podcasts": r"/podcast",
+        "other": r".*"  # catchall
+    },
+    excluded_patterns=[
+        r'/profile',
+        r'/auth',
+        r'/api',
+        r'/admin',
+        r'\.xml$',
+        r'\.json$',
+        r'/tag/',
+        r'/category/',
+        r'/search',
+        r'/404'
+    ],
+    batch_size=20,  # Max URLs per request
+    output_dir="tavily_comprehensive",
+    raw_prefix="",  # simple_batch_splitter.py reads batch_*.json
+    splitter_script="simple_batch_splitter.py"
+)
+
+CARDANO_DOCS = SiteProfile(
+    name="cardano_docs",
+    display_name="Cardano Documentation",
+    source_site="docs.cardano.org",
+    sitemap_url="https://docs.cardano.org/sitemap.xml",
+    content_patterns={
+        "about_cardano": r"/about-cardano",
+        "developer_resources": r"/(smart-contracts|native-tokens|transaction-tutorials|scalability|release-notes)",
+        "stake_pool_operators": r"/stake-pool-course",
+        "testnets": r"/cardano-testnets",
+        "new_to_blockchain": r"/new-to-blockchain",
+        "governance": r"/governance",
+        "technical": r"/(plutus|marlowe|aiken|hydra|mithril)",
+        "other": r".*"  # catchall
+    },
+    excluded_patterns=[
+        r'/api',
+        r'/admin',
+        r'\.xml$',
+        r'\.json$',
+        r'/search',
+        r'/404',
+        r'/#'  # Hash anchors
+    ],
+    batch_size=15,  # Smaller batches for dense technical content
+)
+
+DEVELOPER_PORTAL = SiteProfile(
+    name="developer_portal",
+    display_name="Cardano Developer Portal",
+    source_site="developers.cardano.org",
+    sitemap_url="https://developers.cardano.org/sitemap.xml",
+    content_patterns={
+        "blog": r"/blog/",
+        "get_started": r"/docs/get-started",
+        "smart_contracts": r"/docs/smart-contracts",
+        "governance": r"/docs/governance",
+        "native_tokens": r"/docs/native-tokens",
+        "integrate_cardano": r"/docs/integrate-cardano",
+        "stake_pool": r"/docs/operate-a-stake-pool",
+        "transaction_metadata": r"/docs/transaction-metadata",
+        "tools": r"/tools",
+        "showcase": r"/showcase",
+        "other": r".*"  # catchall
+    },
+    excluded_patterns=[
+        r'/api',
+        r'/admin',
+        r'\.xml$',
+        r'\.json$',
+        r'/search',
+        r'/404',
+        r'/tags/',
+        r'/#',  # Hash anchors
+        r'/page/',  # Pagination pages
+    ],
+    batch_size=20,  # Moderate batches for mixed content types
+)
+
+IOG_BLOG = SiteProfile(
+    name="iog_blog",
+    display_name="IOG Blog",
+    source_site="iohk.io",
+    sitemap_url="https://iohk.io/sitemap.xml",
+    content_patterns={
+        "blog_post": r"/blog/posts/\d{4}/\d{2}/\d{2}/",
+        "blog_index": r"/blog/posts/page-\d+",
+        "research": r"/research/",
+        "other": r".*"  # catchall for non-blog content
+    },
+    excluded_patterns=[
+        r'/api',
+        r'/admin',
+        r'\.xml$',
+        r'\.json$',
+        r'/search',
+        r'/404',
+        r'/page-\d+',  # Exclude pagination pages
+        r'/#',  # Hash anchors
+        r'/author/',  # Author pages
+        r'/tag/',  # Tag pages
+        r'/jp/',  # Japanese language versions
+    ],
+    included_types=['blog_post', 'research'],  # Focus on blog posts and research content
+    batch_size=20,  # Moderate batches for blog posts
+)
+
+SITE_PROFILES: Dict[str, SiteProfile] = {
+    profile.name: profile
+    for profile in (ESSENTIAL_CARDANO, CARDANO_DOCS, DEVELOPER_PORTAL, IOG_BLOG)
+}
@@ -4,90 +4,32 @@ Essential Cardano Sitemap Parser
 Systematically extracts all URLs from the Essential Cardano sitemap for comprehensive content extraction
 """
 
-import requests
-import xml.etree.ElementTree as ET
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Set
-from urllib.parse import urlparse
-import re
+from typing import Dict, List, Set
+
+from site_profiles import ESSENTIAL_CARDANO
+from sitemap_snapshot import SitemapSnapshot, save_sitemap_diff
+from sitemap_stream import SitemapStreamReader, read_site_urls
 
 class SitemapParser:
     """Parser for Essential Cardano sitemap to get comprehensive URL list"""
 
     def __init__(self):
-        self.sitemap_url = "https://www.essentialcardano.io/sitemap.xml"
+        self.sitemap_url = ESSENTIAL_CARDANO.sitemap_url
         self.output_dir = Path("comprehensive_extraction")
         self.output_dir.mkdir(exist_ok=True)
+        self.snapshot = SitemapSnapshot(self.output_dir / f"{ESSENTIAL_CARDANO.name}_sitemap_snapshot.json")
+        self.reader = SitemapStreamReader(snapshot=self.snapshot)
 
         # Content type patterns based on URL structure
-        self.content_patterns = {
-            "faq": r"/faq",
-            "glossary": r"/glossary",
-            "article": r"/article",
-            "development_update": r"/development-update",
-            "developer": r"/developer",
-            "guides": r"/guide",
-            "videos": r"/video",
-            "infographics": r"/infographic",
-            "podcasts": r"/podcast",
-            "other": r".*"  # catchall
-        }
-
-    def fetch_sitemap(self) -> str:
-        """Fetch the sitemap XML content"""
-        try:
-            print(f"Fetching sitemap from {self.sitemap_url}")
-            response = requests.get(self.sitemap_url, timeout=30)
-            response.raise_for_status()
-            print(f"✅ Successfully fetched sitemap ({len(response.content)} bytes)")
-            return response.content
-        except Exception as e:
-            print(f"❌ Error fetching sitemap: {e}")
-            raise
-
-    def parse_sitemap_xml(self, xml_content: str) -> List[Dict]:
-        """Parse XML sitemap and extract URL information"""
-        try:
-            root = ET.fromstring(xml_content)
-
-            # Handle namespace
-            namespace = {'sitemap': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-
-            urls = []
-            for url_element in root.findall('sitemap:url', namespace):
-                loc = url_element.find('sitemap:loc', namespace)
-                lastmod = url_element.find('sitemap:lastmod', namespace)
-                changefreq = url_element.find('sitemap:changefreq', namespace)
-                priority = url_element.find('sitemap:priority', namespace)
-
-                if loc is not None:
-                    url_info = {
-                        'url': loc.text,
-                        'lastmod': lastmod.text if lastmod is not None else None,
-                        'changefreq': changefreq.text if changefreq is not None else None,
-                        'priority': priority.text if priority is not None else None,
-                        'content_type': self._categorize_url(loc.text)
-                    }
-                    urls.append(url_info)
-
-            print(f"✅ Parsed {len(urls)} URLs from sitemap")
-            return urls
-
-        except Exception as e:
-            print(f"❌ Error parsing sitemap XML: {e}")
-            raise
+        self.content_patterns = ESSENTIAL_CARDANO.content_patterns
+        self.classifier = ESSENTIAL_CARDANO.classifier
 
     def _categorize_url(self, url: str) -> str:
         """Categorize URL based on path patterns"""
-        path = urlparse(url).path.lower()
-
-        for category, pattern in self.content_patterns.items():
-            if category != "other" and re.search(pattern, path):
-                return category
-
-        return "other"
+        return self.classifier.category(url)
 
     def analyze_urls(self, urls: List[Dict]) -> Dict:
         """Analyze URL distribution and provide statistics"""
@@ -124,36 +66,7 @@ class SitemapParser:
 
     def filter_urls_for_extraction(self, urls: List[Dict]) -> List[Dict]:
         """Filter URLs to exclude non-content pages"""
-        excluded_patterns = [
-            r'/profile',
-            r'/auth',
-            r'/api',
-            r'/admin',
-            r'\.xml$',
-            r'\.json$',
-            r'/tag/',
-            r'/category/',
-            r'/search',
-            r'/404'
-        ]
-
-        filtered_urls = []
-        excluded_count = 0
-
-        for url_info in urls:
-            url = url_info['url']
-
-            # Check if URL should be excluded
-            should_exclude = False
-            for pattern in excluded_patterns:
-                if re.search(pattern, url, re.IGNORECASE):
-                    should_exclude = True
-                    break
-
-            if not should_exclude:
-                filtered_urls.append(url_info)
-            else:
-                excluded_count += 1
+        filtered_urls, excluded_count = self.classifier.filter(urls)
 
         print(f"✅ Filtered URLs: {len(filtered_urls)} included, {excluded_count} excluded")
         return filtered_urls
@@ -220,9 +133,8 @@ class SitemapParser:
         """Run complete sitemap analysis and prepare for extraction"""
         print("🚀 Starting Essential Cardano Sitemap Analysis")
 
-        # Fetch and parse sitemap
-        xml_content = self.fetch_sitemap()
-        all_urls = self.parse_sitemap_xml(xml_content)
+        # Stream and parse sitemap
+        all_urls = read_site_urls(self.reader, self.sitemap_url, self.classifier)
 
         # Analyze all URLs
         all_stats = self.analyze_urls(all_urls)
@@ -241,6 +153,8 @@ class SitemapParser:
 
         # Save URLs for extraction
         urls_file = self.save_urls(filtered_urls)
+        diff_file = save_sitemap_diff(self.snapshot, filtered_urls, self.classifier,
+                                      self.output_dir, ESSENTIAL_CARDANO.name, self.sitemap_url)
 
         # Create extraction batches
         batches = self.create_extraction_batches(filtered_urls, batch_size=50)
@@ -270,12 +184,15 @@ class SitemapParser:
 
         print(f"\n🎯 READY FOR EXTRACTION:")
         print(f"  URLs file: {urls_file}")
+        if diff_file:
+            print(f"  Diff file: {diff_file} (extract with --incremental --urls-file)")
         print(f"  Batch file: {batch_file}")
         print(f"  Total URLs: {len(filtered_urls)}")
         print(f"  Batches: {len(batches)}")
 
         return {
             'urls_file': urls_file,
+            'diff_file': diff_file,
             'batch_file': batch_file,
             'total_urls': len(filtered_urls),
             'batches': len(batches),
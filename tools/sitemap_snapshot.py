@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Sitemap Snapshots
+Remembers the ETag/Last-Modified and parsed entries of every sitemap in a
+tree, so the next run sends conditional requests and replays unchanged
+(304) sitemaps from disk. Comparing the previous and current URL records
+gives a URL-level diff - added, removed, lastmod-bumped - in one pass, which
+is all the incremental extractors need to see.
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from url_classifier import URLClassifier
+
+
+class SitemapSnapshot:
+    """Per-sitemap validators and entries from the previous fetch of a sitemap tree"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.previous: Dict[str, Dict] = {}
+        self.taken_at: Optional[str] = None
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.previous = data.get('sitemaps', {})
+            self.taken_at = data.get('taken_at')
+        self.current: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def exists(self) -> bool:
+        return self.taken_at is not None
+
+    def request_headers(self, location: str) -> Dict[str, str]:
+        """Conditional request headers for a sitemap we fetched before"""
+        entry = self.previous.get(location, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def cached_entries(self, location: str) -> Optional[List]:
+        """Entries stored for a sitemap, or None when there is nothing to replay"""
+        entry = self.previous.get(location)
+        return entry['entries'] if entry else None
+
+    def keep(self, location: str):
+        """Sitemap answered 304: carry its previous state into this snapshot"""
+        with self._lock:
+            self.current[location] = self.previous[location]
+
+    def store(self, location: str, etag: Optional[str], last_modified: Optional[str], entries: List):
+        with self._lock:
+            self.current[location] = {'etag': etag, 'last_modified': last_modified, 'entries': entries}
+
+    def previous_urls(self) -> List[Dict]:
+        """URL records from the previous snapshot, in sitemap order"""
+        return [record for entry in self.previous.values()
+                for kind, record in entry['entries'] if kind == 'url']
+
+    def save(self):
+        """Atomically replace the snapshot with the sitemaps seen this run"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'taken_at': datetime.now().isoformat(), 'sitemaps': self.current}, f, ensure_ascii=False)
+        tmp_path.replace(self.path)
+
+
+def diff_url_records(previous: Iterable[Dict], current: Iterable[Dict]) -> Dict[str, List]:
+    """Added and lastmod-bumped records (from current) and removed URLs, in linear time"""
+    previous_lastmod = {record['url']: record.get('lastmod') for record in previous}
+    diff = {'added': [], 'updated': [], 'removed': []}
+    seen = set()
+
+    for record in current:
+        url = record['url']
+        seen.add(url)
+        if url not in previous_lastmod:
+            diff['added'].append(record)
+        elif record.get('lastmod') != previous_lastmod[url]:
+            diff['updated'].append(record)
+
+    diff['removed'] = [url for url in previous_lastmod if url not in seen]
+    return diff
+
+
+def save_url_diff(filepath: Path, sitemap_url: str, diff: Dict[str, List], previous_at: Optional[str]) -> Path:
+    """Write a diff in the sitemap parser URL-file format, plus the removed URLs"""
+    urls = diff['added'] + diff['updated']
+    save_data = {
+        'extracted_at': datetime.now().isoformat(),
+        'sitemap_url': sitemap_url,
+        'previous_snapshot_at': previous_at,
+        'total_urls': len(urls),
+        'added': len(diff['added']),
+        'updated': len(diff['updated']),
+        'urls': urls,
+        'removed': diff['removed']
+    }
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(save_data, f, indent=2, ensure_ascii=False)
+
+    print(f"✅ Sitemap diff: {len(diff['added'])} added, {len(diff['updated'])} lastmod-bumped, "
+          f"{len(diff['removed'])} removed -> {filepath}")
+    return filepath
+
+
+def save_sitemap_diff(snapshot: SitemapSnapshot, urls: List[Dict], classifier: URLClassifier,
+                      output_dir: Path, site_name: str, sitemap_url: str) -> Optional[Path]:
+    """
+    Diff a site's filtered URLs against the previous snapshot and save the
+    snapshot; returns <site_name>_urls_diff.json, or None on the first run.
+    """
+    if not snapshot.exists:
+        print("📸 First sitemap snapshot saved - the next run will produce a diff")
+        snapshot.save()
+        return None
+
+    # Filter the previous records with today's rules, so a rule change is not reported as removals
+    previous_urls = [
+        url_info for url_info in snapshot.previous_urls()
+        if classifier.accepts(url_info['url'], classifier.category(url_info['url']))
+    ]
+    diff = diff_url_records(previous_urls, urls)
+    snapshot.save()
+    return save_url_diff(Path(output_dir) / f"{site_name}_urls_diff.json", sitemap_url, diff, snapshot.taken_at)
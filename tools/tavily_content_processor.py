@@ -7,9 +7,50 @@ Experiment with processing Tavily's raw content to create clean, usable content
 import re
 import json
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+SPACE_RUNS = re.compile(r'[ \t]{2,}|\t')
+RESULTS_LINE = re.compile(r'\d+\s+Results?')
+NAVIGATION_LABELS = ('all', 'articles', 'videos', 'faqs', 'infographics')
+
+# Non-ASCII letters that re.IGNORECASE matches against ASCII ones but str.lower() leaves alone
+CASE_FOLD_EXTRAS = (('\u0130', 'i'), ('\u0131', 'i'), ('\u017f', 's'))
+
+
+def literal_anchors(pattern: str) -> Optional[Tuple[str, ...]]:
+    """Lowercased literal runs every match of pattern must contain, or None if unknown"""
+    runs, current = [], []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            escaped = pattern[i + 1:i + 2]
+            if escaped.isalnum() or not escaped:
+                runs.append(''.join(current))
+                current = []
+            else:
+                current.append(escaped)
+            i += 2
+            continue
+        if char in '|(':  # Alternatives and groups: no single required literal we can trust
+            return None
+        if char in '*?{' and current:  # Previous character is optional
+            current.pop()
+        if char in '.^$*+?{}[])':
+            runs.append(''.join(current))
+            current = []
+            if char == '[':
+                i = pattern.index(']', i + 2) if ']' in pattern[i + 2:] else len(pattern)
+            elif char == '{':
+                i = pattern.index('}', i) if '}' in pattern[i:] else len(pattern)
+        else:
+            current.append(char)
+        i += 1
+    runs.append(''.join(current))
+    anchors = tuple(run.lower() for run in runs if run)
+    return anchors or None
+
 @dataclass
 class ProcessedContent:
     """Cleaned and structured content from Tavily extraction"""
@@ -38,6 +79,7 @@ class TavilyContentProcessor:
             r"Resources\s*Legal\s*Subscribe to our newsletter",
             r"Refine by:\s*Sort by:",
         ]
+        self._compile_noise_patterns()
 
         # Content patterns to identify valuable sections
         self.content_patterns = {
@@ -106,33 +148,57 @@ class TavilyContentProcessor:
         else:
             return 'other'
 
+    def _compile_noise_patterns(self):
+        """Precompile noise_patterns with their literal anchors, so a document is
+        only run through the patterns that can match it, in a single alternation.
+        Call again after changing noise_patterns on an existing processor."""
+        self._noise_anchors = [literal_anchors(pattern) for pattern in self.noise_patterns]
+        self._noise_regexes = {}
+
+    def _noise_regex_for(self, raw_content: str) -> Optional[re.Pattern]:
+        """Combined regex of the patterns whose anchors all occur in the document, or None"""
+        folded = raw_content
+        if not folded.isascii():
+            for char, ascii_char in CASE_FOLD_EXTRAS:
+                if char in folded:
+                    folded = folded.replace(char, ascii_char)
+        folded = folded.lower()
+        active = tuple(
+            index for index, anchors in enumerate(self._noise_anchors)
+            if anchors is None or all(anchor in folded for anchor in anchors)
+        )
+        if not active:
+            return None
+        regex = self._noise_regexes.get(active)
+        if regex is None:
+            regex = re.compile(
+                '|'.join(f'(?:{self.noise_patterns[index]})' for index in active),
+                re.IGNORECASE | re.DOTALL
+            )
+            self._noise_regexes[active] = regex
+        return regex
+
     def _clean_raw_content(self, raw_content: str) -> str:
         """Remove noise and UI elements from raw content"""
-        cleaned = raw_content
-
-        # Remove noise patterns
-        for pattern in self.noise_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE | re.DOTALL)
+        # Remove noise patterns (leftmost match wins, one pass over the document)
+        noise_regex = self._noise_regex_for(raw_content)
+        cleaned = noise_regex.sub('', raw_content) if noise_regex else raw_content
+        cleaned = SPACE_RUNS.sub(' ', cleaned)
 
-        # Remove excessive whitespace
-        cleaned = re.sub(r'\n\s*\n\s*\n+', '\n\n', cleaned)
-        cleaned = re.sub(r'[ \t]+', ' ', cleaned)
-
-        # Remove navigation menu items (but keep main content links)
-        lines = cleaned.split('\n')
+        # Strip lines, dropping blanks (collapses blank-line runs), navigation and filter lines
         filtered_lines = []
-
-        for line in lines:
+        for line in cleaned.split('\n'):
             line = line.strip()
+            if not line:
+                continue
             # Skip lines that are just navigation
-            if (line.startswith('[') and line.endswith(']') and
-                any(nav in line.lower() for nav in ['all', 'articles', 'videos', 'faqs', 'infographics'])):
+            if (line[0] == '[' and line[-1] == ']' and
+                any(nav in line.lower() for nav in NAVIGATION_LABELS)):
                 continue
             # Skip pagination and filter lines
-            if re.match(r'^\d+\s+Results?$', line) or 'Refine by:' in line or 'Sort by:' in line:
+            if 'Refine by:' in line or 'Sort by:' in line or RESULTS_LINE.fullmatch(line):
                 continue
-            if line:
-                filtered_lines.append(line)
+            filtered_lines.append(line)
 
         return '\n'.join(filtered_lines)
 
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Tavily Site Extractor
+One extraction pipeline for every crawled site; what differs per site lives in
+site_profiles.py. Serial, async (token-bucket) and incremental runs are
+implemented here once, and sites that post-process results override
+handle_batch().
+Usage: python tavily_site_extractor.py cardano_docs [--incremental | --concurrency 4]
+"""
+
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple, Type
+from pathlib import Path
+from dotenv import load_dotenv
+from tavily import TavilyClient
+
+from site_profiles import SiteProfile, SITE_PROFILES
+from extraction_manifest import ExtractionManifest, DeltaSet, load_url_list
+from async_extraction_engine import AsyncExtractionEngine
+from progress_journal import ProgressJournal
+from response_cache import ResponseCache
+
+# Load environment variables
+load_dotenv()
+
+
+class TavilySiteExtractor:
+    """Complete Tavily-based extraction pipeline for one site profile"""
+
+    def __init__(self, profile: SiteProfile, api_key: str):
+        self.profile = profile
+        self.api_key = api_key
+        self.tavily_client = TavilyClient(api_key=api_key)
+
+        # Output directories
+        self.output_dir = Path(profile.output_dir)
+        self.raw_dir = self.output_dir / "raw_extractions"
+        self.progress_dir = self.output_dir / "progress"
+
+        # Create directories
+        for directory in [self.raw_dir, self.progress_dir]:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        # Progress tracking
+        self.progress_file = self.progress_dir / "extraction_progress.jsonl"
+        self.legacy_progress_file = self.progress_dir / "extraction_progress.json"  # Pre-journal checkpoints
+        self.journal = None
+        self.stats_file = self.progress_dir / "extraction_stats.json"
+
+        # Tavily batch settings
+        self.batch_size = profile.batch_size
+        self.request_delay = 3  # Seconds between requests
+        self.max_retries = 3
+        self.extract_options = {"include_images": False, "extract_depth": "basic"}  # Use basic for speed and cost
+
+        # Raw per-URL results are cached so reprocessing never pays for the API twice
+        self.cache = ResponseCache.from_env()
+
+        # Statistics
+        self.stats = {
+            'total_urls': 0,
+            'batches_processed': 0,
+            'successful_extractions': 0,
+            'failed_extractions': 0,
+            'started_at': None,
+            'last_update': None
+        }
+
+    def load_urls(self, urls_file: str) -> List[Dict]:
+        """Load URLs from sitemap parser output"""
+        with open(urls_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('urls', [])
+
+    def load_progress(self) -> Dict:
+        """Replay the progress journal (importing an old JSON checkpoint on first use)"""
+        if self.journal is None:
+            self.journal = ProgressJournal(self.progress_file, legacy_file=self.legacy_progress_file)
+
+        return {
+            'completed_batches': self.journal.completed_batches,
+            'completed_urls': self.journal.completed_urls
+        }
+
+    def save_progress(self, batch_number: int, batch_urls: List[str]):
+        """Durably record one finished batch - a single appended journal line"""
+        self.journal.record_batch(batch_number, batch_urls)
+
+    def close_progress(self):
+        """Compact and close the journal at the end of a run"""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def save_stats(self):
+        """Save extraction statistics"""
+        self.stats['last_update'] = datetime.now().isoformat()
+        with open(self.stats_file, 'w', encoding='utf-8') as f:
+            json.dump(self.stats, f, indent=2, ensure_ascii=False)
+
+    def _request_batch(self, urls: List[str], batch_number: int, raw_dir: Path = None,
+                       throttle: Callable[[], None] = None) -> Dict:
+        """
+        Single Tavily extract call for the URLs not already cached (throttle() runs
+        just before it); the merged raw response is saved as soon as it arrives.
+        """
+        start_time = time.time()
+
+        cached = {}
+        for url in urls:
+            result = self.cache.get("tavily", url, self.extract_options)
+            if result is not None:
+                cached[url] = result
+        misses = [url for url in urls if url not in cached]
+
+        response = {'results': [], 'failed_results': []}
+        if misses:
+            if throttle:
+                throttle()
+            # Use Tavily's batch extraction
+            response = self.tavily_client.extract(urls=misses, **self.extract_options)
+            requested = set(misses)
+            for result in response.get('results', []):
+                if result.get('url') in requested and result.get('raw_content'):
+                    self.cache.put("tavily", result['url'], self.extract_options, result)
+        response['results'] = [cached[url] for url in urls if url in cached] + response.get('results', [])
+
+        elapsed = time.time() - start_time
+        print(f"⏱️  Batch {batch_number} completed in {elapsed:.2f} seconds"
+              + (f" ({len(cached)} from cache)" if cached else ""))
+
+        # Save raw response
+        raw_file = (raw_dir or self.raw_dir) / self.profile.raw_batch_filename(batch_number)
+        with open(raw_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'batch_number': batch_number,
+                'urls': urls,
+                'extraction_time': elapsed,
+                'timestamp': datetime.now().isoformat(),
+                'response': response
+            }, f, indent=2, ensure_ascii=False)
+
+        return response
+
+    def load_raw_results(self) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """
+        (url -> result with content, url -> failed_results entry) from the raw batch
+        dumps already on disk; later files win, and any success outranks a failure
+        """
+        raw_results, raw_failures = {}, {}
+        for raw_file in sorted(self.raw_dir.glob(f"{self.profile.raw_prefix}batch_*.json")):
+            try:
+                with open(raw_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Skipping unreadable raw batch {raw_file.name}: {e}")
+                continue
+            response = data.get('response', {})
+            for result in response.get('results', []):
+                if result.get('url') and result.get('raw_content'):
+                    raw_results[result['url']] = result
+                    raw_failures.pop(result['url'], None)
+            for failure in response.get('failed_results', []):
+                if failure.get('url') and failure['url'] not in raw_results:
+                    raw_failures[failure['url']] = failure
+        return raw_results, raw_failures
+
+    def _rebuild_batch(self, urls: List[str], raw_results: Dict[str, Dict],
+                       raw_failures: Dict[str, Dict]) -> Tuple[Dict, List[str]]:
+        """
+        Offline response for a batch from the cache, falling back to the raw batch
+        dumps (including the URLs Tavily reported as failed); returns (response,
+        URLs found in neither). Nothing is written.
+        """
+        results = []
+        failed_results = []
+        missing = []
+        for url in urls:
+            result = self.cache.get("tavily", url, self.extract_options) or raw_results.get(url)
+            if result is not None:
+                results.append(result)
+            elif url in raw_failures:
+                failed_results.append(raw_failures[url])
+            else:
+                missing.append(url)
+        return {'results': results, 'failed_results': failed_results}, missing
+
+    def extract_batch(self, urls: List[str], batch_number: int, raw_dir: Path = None) -> Dict:
+        """Extract a batch of URLs using Tavily"""
+        for attempt in range(self.max_retries):
+            try:
+                print(f"📡 Extracting batch {batch_number} ({len(urls)} URLs) - Attempt {attempt + 1}")
+                return self._request_batch(urls, batch_number, raw_dir)
+
+            except Exception as e:
+                print(f"❌ Batch {batch_number} attempt {attempt + 1} failed: {e}")
+                if attempt < self.max_retries - 1:
+                    delay = (attempt + 1) * 5  # Exponential backoff
+                    print(f"⏸️  Retrying in {delay} seconds...")
+                    time.sleep(delay)
+
+        print(f"💥 Batch {batch_number} failed after {self.max_retries} attempts")
+        return None
+
+    def handle_batch(self, response: Dict, batch_number: int, batch_urls: List[str]) -> int:
+        """Account for one extracted batch; returns the number of pages with content"""
+        successful_in_batch = len([r for r in response.get('results', []) if r.get('raw_content')])
+        self.stats['successful_extractions'] += successful_in_batch
+        self.stats['failed_extractions'] += len(batch_urls) - successful_in_batch
+        self.stats['batches_processed'] += 1
+        return successful_in_batch
+
+    def _pending_batches(self, all_urls: List[Dict], completed_batches: Set[int]) -> List:
+        """(batch number, urls) for every batch not yet completed"""
+        return [
+            (i // self.batch_size + 1, [u['url'] for u in all_urls[i:i + self.batch_size]])
+            for i in range(0, len(all_urls), self.batch_size)
+            if i // self.batch_size + 1 not in completed_batches
+        ]
+
+    def _print_plan(self, all_urls: List[Dict]):
+        # Group URLs by type for better organization
+        url_groups = {}
+        for url_info in all_urls:
+            url_groups.setdefault(url_info['content_type'], []).append(url_info['url'])
+
+        print(f"📊 URL DISTRIBUTION:")
+        for content_type, urls in url_groups.items():
+            print(f"   {content_type}: {len(urls)} URLs")
+
+        total_urls = len(all_urls)
+        print(f"\n📊 EXTRACTION PLAN:")
+        print(f"   Total URLs: {total_urls}")
+        print(f"   Batch size: {self.batch_size}")
+        print(f"   Estimated batches: {(total_urls + self.batch_size - 1) // self.batch_size}")
+        print(f"   Estimated cost: ${(total_urls/5) * 0.0016:.2f}")
+
+    def run_comprehensive_extraction(self, urls_file: str = None):
+        """Run complete extraction of all URLs, one batch at a time"""
+        print(f"🚀 Starting {self.profile.display_name} Tavily Extraction")
+        print(f"=" * 60)
+
+        # Load URLs and progress
+        all_urls = self.load_urls(urls_file or self.profile.urls_file)
+        progress = self.load_progress()
+        self._print_plan(all_urls)
+
+        # Initialize stats
+        total_urls = len(all_urls)
+        total_batches = (total_urls + self.batch_size - 1) // self.batch_size
+        self.stats['total_urls'] = total_urls
+        self.stats['started_at'] = datetime.now().isoformat()
+
+        pending = self._pending_batches(all_urls, progress['completed_batches'])
+        if len(pending) < total_batches:
+            print(f"⏭️  Skipping {total_batches - len(pending)} completed batches")
+
+        for batch_number, batch_urls in pending:
+            start = (batch_number - 1) * self.batch_size
+            print(f"\n🔄 Processing Batch {batch_number}/{total_batches}")
+            print(f"   URLs: {start + 1}-{start + len(batch_urls)} of {total_urls}")
+
+            # Extract batch
+            response = self.extract_batch(batch_urls, batch_number)
+
+            if response:
+                successful_in_batch = self.handle_batch(response, batch_number, batch_urls)
+
+                # Update progress
+                self.save_progress(batch_number, batch_urls)
+
+                print(f"   ✅ Successful: {successful_in_batch}")
+                print(f"   ❌ Failed: {len(batch_urls) - successful_in_batch}")
+
+            else:
+                print(f"   💥 Batch failed completely")
+                self.stats['failed_extractions'] += len(batch_urls)
+
+            self.save_stats()
+
+            # Delay between batches
+            if batch_number < total_batches:
+                print(f"⏸️  Batch delay: {self.request_delay} seconds...")
+                time.sleep(self.request_delay)
+
+        # Final summary
+        self.close_progress()
+        self._print_final_summary()
+
+    def run_async_extraction(self, urls_file: str = None, concurrency: int = 4, requests_per_minute: float = 20):
+        """Extract all pending batches concurrently within the API's request budget"""
+        print(f"🚀 Starting {self.profile.display_name} Tavily Async Extraction")
+        print(f"=" * 60)
+
+        all_urls = self.load_urls(urls_file or self.profile.urls_file)
+        progress = self.load_progress()
+        pending = self._pending_batches(all_urls, progress['completed_batches'])
+
+        self.stats['total_urls'] = len(all_urls)
+        self.stats['started_at'] = datetime.now().isoformat()
+        print(f"📊 Batches: {len(pending)} pending of {(len(all_urls) + self.batch_size - 1) // self.batch_size}")
+        print(f"⚙️  Concurrency: {concurrency}, budget: {requests_per_minute:g} requests/min")
+
+        engine = AsyncExtractionEngine(
+            lambda batch, throttle: self._request_batch(batch[1], batch[0], throttle=throttle),
+            requests_per_minute=requests_per_minute,
+            concurrency=concurrency,
+            max_retries=self.max_retries
+        )
+
+        def on_result(batch, response: Optional[Dict], error: Optional[Exception]):
+            batch_number, batch_urls = batch
+            if not response:
+                print(f"   💥 Batch {batch_number} failed completely")
+                self.stats['failed_extractions'] += len(batch_urls)
+                return
+
+            successful_in_batch = self.handle_batch(response, batch_number, batch_urls)
+            self.save_progress(batch_number, batch_urls)
+            self.save_stats()
+            print(f"   ✅ Batch {batch_number}: {successful_in_batch}/{len(batch_urls)} extracted "
+                  f"({self.stats['batches_processed']} batches done)")
+
+        engine.run_sync(pending, on_result)
+        self.close_progress()
+        self.save_stats()
+        self._print_final_summary()
+
+    def run_reprocess(self, urls_file: str = None):
+        """
+        Rebuild every batch's outputs offline from the response cache, falling back
+        to the raw batch dumps. Raw dumps are never rewritten, and a batch with any
+        URL missing from both is left untouched rather than regenerated without it.
+        """
+        print(f"🚀 Reprocessing {self.profile.display_name} from the response cache and raw batches")
+        print(f"=" * 60)
+
+        all_urls = self.load_urls(urls_file or self.profile.urls_file)
+        raw_results, raw_failures = self.load_raw_results()
+        self.stats['total_urls'] = len(all_urls)
+        self.stats['started_at'] = datetime.now().isoformat()
+        incomplete = []
+
+        for batch_number, batch_urls in self._pending_batches(all_urls, set()):
+            response, missing = self._rebuild_batch(batch_urls, raw_results, raw_failures)
+            if missing:
+                print(f"⚠️ Batch {batch_number}: {len(missing)}/{len(batch_urls)} URLs neither cached nor "
+                      f"recorded in raw batches - existing outputs left untouched")
+                incomplete.append(batch_number)
+                continue
+            self.handle_batch(response, batch_number, batch_urls)
+
+        self.save_stats()
+        print(f"\n💾 Cache: {self.cache.summary()} ({len(raw_results)} URLs available from raw batches, "
+              f"{len(raw_failures)} recorded as failed)")
+        if incomplete:
+            print(f"⚠️ {len(incomplete)} batches skipped as incomplete ({', '.join(map(str, incomplete))}) "
+                  f"- run a normal extraction to fetch them")
+        self._print_final_summary()
+
+    def existing_output_dirs(self) -> List[Path]:
+        """Earlier output an empty manifest can be seeded from: raw batches and dataset folders"""
+        search_dirs = {Path.cwd(), Path(__file__).resolve().parent.parent}  # tools/ and the repo root
+        dataset_dirs = sorted({path.resolve() for base in search_dirs
+                               for path in base.glob(f"{self.profile.dataset_prefix}*") if path.is_dir()})
+        return [self.raw_dir] + dataset_dirs
+
+    def run_incremental_extraction(self, urls_file: str = None, probe: bool = True, allow_full_run: bool = False):
+        """Re-extract only new or changed URLs and write the delta set for re-upload"""
+        print(f"🚀 Starting {self.profile.display_name} Incremental Refresh")
+        print(f"=" * 60)
+
+        # Pages are re-extracted because they changed; fetch fresh but keep the cache current
+        self.cache.refresh = True
+        manifest = ExtractionManifest(self.output_dir / "extraction_manifest.json")
+        url_infos, removed = load_url_list(urls_file or self.profile.urls_file)
+        if not manifest.prepare_first_run(url_infos, self.existing_output_dirs(), allow_full_run):
+            return
+        plan = manifest.plan(url_infos, probe=probe, removed=removed)
+        manifest.print_plan(plan)
+
+        delta = DeltaSet(self.output_dir, source="tavily_api_raw")
+        pending = plan['new'] + plan['changed']
+        self.stats['total_urls'] = len(pending)
+        self.stats['started_at'] = datetime.now().isoformat()
+        print(f"   Estimated cost: ${(len(pending)/5) * 0.0016:.2f}")
+
+        total_batches = (len(pending) + self.batch_size - 1) // self.batch_size
+        for batch_number, i in enumerate(range(0, len(pending), self.batch_size), 1):
+            batch = pending[i:i + self.batch_size]
+            print(f"\n🔄 Processing Batch {batch_number}/{total_batches}")
+
+            response = self.extract_batch([u['url'] for u in batch], batch_number, raw_dir=delta.root)
+            if not response:
+                print(f"   💥 Batch failed completely - pages stay pending for the next run")
+                self.stats['failed_extractions'] += len(batch)
+                continue
+
+            by_url = {u['url']: u for u in batch}
+            successful_in_batch = 0
+            for result in response.get('results', []):
+                url_info = by_url.get(result.get('url'))
+                if url_info and result.get('raw_content'):
+                    status = manifest.record(url_info, result['raw_content'])
+                    delta.add(url_info['url'], result['raw_content'], status, result.get('images'))
+                    successful_in_batch += 1
+            self.stats['successful_extractions'] += successful_in_batch
+            self.stats['failed_extractions'] += len(batch) - successful_in_batch
+            self.stats['batches_processed'] += 1
+
+            # Save after each batch so an interrupted refresh resumes where it stopped
+            manifest.save()
+            self.save_stats()
+
+            if batch_number < total_batches:
+                print(f"⏸️  Batch delay: {self.request_delay} seconds...")
+                time.sleep(self.request_delay)
+
+        for url in plan['removed']:
+            delta.remove(url)
+            manifest.forget(url)
+        manifest.save()
+        delta.finish()
+
+    def _print_final_summary(self):
+        """Print final extraction summary"""
+        success_rate = (self.stats['successful_extractions'] / self.stats['total_urls']) * 100 if self.stats['total_urls'] > 0 else 0
+        total_time = datetime.now() - datetime.fromisoformat(self.stats['started_at'])
+
+        print(f"\n🎉 {self.profile.display_name.upper()} TAVILY EXTRACTION COMPLETE!")
+        print(f"=" * 60)
+        print(f"📊 FINAL STATISTICS:")
+        print(f"   Total URLs: {self.stats['total_urls']}")
+        print(f"   Batches processed: {self.stats['batches_processed']}")
+        print(f"   Successfully extracted: {self.stats['successful_extractions']} ({success_rate:.1f}%)")
+        print(f"   Failed extractions: {self.stats['failed_extractions']}")
+        print(f"   Total time: {total_time}")
+        print(f"   Response cache: {self.cache.summary()}")
+        if self.stats['total_urls']:
+            print(f"   Average time per URL: {total_time.total_seconds() / self.stats['total_urls']:.2f} seconds")
+
+        print(f"\n📁 OUTPUT DIRECTORIES:")
+        print(f"   Raw extractions: {self.raw_dir}")
+        print(f"   Progress tracking: {self.progress_dir}")
+
+        # Count raw extraction files
+        raw_files = list(self.raw_dir.glob(f"{self.profile.raw_prefix}batch_*.json"))
+        print(f"\n🎯 READY FOR BATCH SPLITTING:")
+        print(f"   Raw batch files created: {len(raw_files)}")
+        print(f"   Next step: Run {self.profile.splitter_script}")
+
+
+def run_cli(profile: SiteProfile, extractor_class: Type[TavilySiteExtractor] = None, argv: List[str] = None):
+    """Shared command line for the per-site extractor scripts"""
+    parser = argparse.ArgumentParser(description=f"Extract {profile.display_name} pages with the Tavily API")
+    add_extraction_arguments(parser)
+    run_from_args(profile, parser.parse_args(argv), extractor_class)
+
+
+def add_extraction_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--urls-file",
+                        help="URL list (or sitemap diff, with --incremental) from the sitemap parser "
+                             "(defaults to the site's)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-extract new or changed pages and write a delta set")
+    parser.add_argument("--no-probe", action="store_true",
+                        help="Skip conditional HEAD checks for URLs without a sitemap lastmod")
+    parser.add_argument("--full-run", action="store_true",
+                        help="Let a first --incremental run with no earlier output extract every URL")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="Run the async engine with this many parallel batch requests (0 = serial)")
+    parser.add_argument("--requests-per-minute", type=float, default=20,
+                        help="Request budget for the async engine; match your Tavily plan")
+    # Reprocessing reads the cache, so it cannot run with the cache switched off
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument("--no-cache", action="store_true",
+                            help="Neither read nor write the raw response cache")
+    cache_mode.add_argument("--reprocess", action="store_true",
+                            help="Rebuild all batches from the response cache and raw batch files "
+                                 "without calling the API")
+
+
+def run_from_args(profile: SiteProfile, args: argparse.Namespace,
+                  extractor_class: Type[TavilySiteExtractor] = None):
+    api_key = os.getenv("TAVILY_API_KEY")
+
+    if not api_key:
+        print("❌ TAVILY_API_KEY environment variable not set")
+        return
+
+    # Check if URLs file exists
+    urls_file = args.urls_file or str(profile.urls_file)
+    if not Path(urls_file).exists():
+        print(f"❌ URLs file not found: {urls_file}")
+        print(f"Please run the {profile.display_name} sitemap parser first")
+        return
+
+    if extractor_class is None:
+        extractor = TavilySiteExtractor(profile, api_key)
+    else:
+        extractor = extractor_class(api_key)
+
+    extractor.cache.enabled = not args.no_cache
+
+    if args.reprocess:
+        extractor.run_reprocess(urls_file)
+    elif args.incremental:
+        extractor.run_incremental_extraction(urls_file, probe=not args.no_probe, allow_full_run=args.full_run)
+    elif args.concurrency > 0:
+        extractor.run_async_extraction(urls_file, args.concurrency, args.requests_per_minute)
+    else:
+        extractor.run_comprehensive_extraction(urls_file)
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Extract a site's pages with the Tavily API")
+    parser.add_argument("site", choices=sorted(SITE_PROFILES), help="Site profile to extract")
+    add_extraction_arguments(parser)
+    args = parser.parse_args()
+
+    # Sites with their own post-processing keep their extractor class
+    extractor_class = None
+    if args.site == "essential_cardano":
+        from tavily_comprehensive_extractor import TavilyComprehensiveExtractor
+        extractor_class = TavilyComprehensiveExtractor
+
+    run_from_args(SITE_PROFILES[args.site], args, extractor_class)
+
+
+if __name__ == "__main__":
+    main()
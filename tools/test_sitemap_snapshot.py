@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test conditional sitemap fetching and snapshot diffs against a local HTTP stand-in
+(no network access or API keys needed)
+"""
+
+import os
+import gzip
+import tempfile
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from extraction_manifest import ExtractionManifest, load_url_list
+from sitemap_parser import SitemapParser
+
+NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+class SitemapHandler(BaseHTTPRequestHandler):
+    """Serves server.documents with ETag/Last-Modified and honours conditional requests"""
+
+    def do_GET(self):
+        document = self.server.documents.get(self.path)
+        if document is None:
+            self.send_error(404)
+            return
+        body, version = document
+        self.server.requests.append(self.path)
+
+        etag = f'"{self.path}-{version}"'
+        last_modified = formatdate(1700000000 + version * 3600, usegmt=True)
+        if self.headers.get('If-None-Match') == etag:
+            self.server.not_modified.append(self.path)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def urlset(entries):
+    urls = ''.join(f'<url><loc>{url}</loc><lastmod>{lastmod}</lastmod><changefreq>weekly</changefreq>'
+                   f'<priority>0.7</priority></url>' for url, lastmod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="{NAMESPACE}">{urls}</urlset>'.encode()
+
+
+def sitemap_index(base, children):
+    sitemaps = ''.join(f'<sitemap><loc>{base}{child}</loc></sitemap>' for child in children)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="{NAMESPACE}">{sitemaps}</sitemapindex>'.encode()
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SitemapHandler)
+    server.documents = {}
+    server.requests = []
+    server.not_modified = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_parser(base):
+    parser = SitemapParser()
+    parser.sitemap_url = f"{base}/sitemap.xml"
+    return parser.run_comprehensive_analysis()
+
+
+def test_sitemap_snapshot_diff():
+    """First run snapshots, an unchanged rerun is all 304s, a changed child yields a URL-level diff"""
+    server = start_server()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    site = "https://www.essentialcardano.io"
+
+    articles = [(f"{site}/article/post-{i}", "2025-09-01") for i in range(5)]
+    faqs = [(f"{site}/faq/question-{i}", "2025-09-01") for i in range(3)]
+    server.documents = {
+        '/sitemap.xml': (sitemap_index(base, ['/articles.xml.gz', '/faqs.xml']), 1),
+        '/articles.xml.gz': (gzip.compress(urlset(articles)), 1),
+        '/faqs.xml': (urlset(faqs), 1),
+    }
+
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            print("\n🧪 Run 1: first fetch")
+            result = run_parser(base)
+            assert result['total_urls'] == 8, result['total_urls']
+            assert result['diff_file'] is None
+            assert not server.not_modified
+
+            print("\n🧪 Run 2: nothing changed")
+            server.requests.clear()
+            result = run_parser(base)
+            assert sorted(server.not_modified) == sorted(server.documents), server.not_modified
+            assert result['total_urls'] == 8
+            urls, removed = load_url_list(result['diff_file'])
+            assert urls == [] and removed == [], (urls, removed)
+
+            print("\n🧪 Run 3: one child sitemap changed")
+            server.not_modified.clear()
+            faqs = [(f"{site}/faq/question-0", "2025-10-01"),       # lastmod bumped
+                    (f"{site}/faq/question-1", "2025-09-01"),       # unchanged
+                    (f"{site}/faq/question-3", "2025-10-01")]       # added; question-2 removed
+            server.documents['/faqs.xml'] = (urlset(faqs), 2)
+            result = run_parser(base)
+            assert sorted(server.not_modified) == ['/articles.xml.gz', '/sitemap.xml'], server.not_modified
+            urls, removed = load_url_list(result['diff_file'])
+            assert [u['url'] for u in urls] == [f"{site}/faq/question-3", f"{site}/faq/question-0"], urls
+            assert all(u['content_type'] == 'faq' for u in urls)
+            assert removed == [f"{site}/faq/question-2"], removed
+
+            print("\n🧪 Incremental plan from the diff")
+            manifest = ExtractionManifest(Path(workdir) / "manifest.json")
+            for url, lastmod in articles + [(f"{site}/faq/question-{i}", "2025-09-01") for i in range(3)]:
+                manifest.record({'url': url, 'lastmod': lastmod}, f"content of {url}")
+            plan = manifest.plan(urls, probe=False, removed=removed)
+            assert [u['url'] for u in plan['new']] == [f"{site}/faq/question-3"], plan
+            assert [u['url'] for u in plan['changed']] == [f"{site}/faq/question-0"], plan
+            assert plan['removed'] == [f"{site}/faq/question-2"], plan  # Articles are not "removed"
+        finally:
+            os.chdir(original_cwd)
+            server.shutdown()
+
+    print("\n✅ Conditional sitemap fetching and snapshot diff work")
+
+
+if __name__ == "__main__":
+    test_sitemap_snapshot_diff()